@@ -0,0 +1,294 @@
+"""Benchmark of the read paths of the drivers over simulated buses.
+
+Every driver runs its real code on top of the simulated interfaces (see
+:meth:`Device.simulate`), so a sample is one ``read()`` (``write()`` for
+actuators) with the cost of the bus transfers that it makes. For every
+driver the script reports:
+
+- the p50/p90/p99 latency of a sample in us,
+- the i2c/spi transfers (ioctls) and the bytes on the bus per sample,
+  counted by the :class:`SimBus` of the simulated interfaces,
+- the bytes allocated per sample, the peak of :mod:`tracemalloc` during a
+  sample in a separate pass.
+
+By default the buses take no time, so the latencies are the python overhead
+of the drivers. ``--i2c-clock`` and ``--spi-clock`` add the time of the
+transfers on a bus with that clock (see :class:`BusLatency`).
+
+The results can be saved as a baseline and later runs compared against it.
+Transfers, bytes and allocations are deterministic and any increase is a
+regression. Latencies depend on the machine and its load, only the median
+is compared and it is allowed ``--threshold`` of noise. The script exits
+with 1 if a case regressed. ``benchmarks/baseline.json`` is the baseline of
+the default run.
+
+Usage:
+    python benchmarks/drivers.py [--cases bme680,icm_20948] [--samples N]
+        [--i2c-clock 400e3] [--spi-clock 1e6] [--save baseline.json]
+        [--compare baseline.json] [--threshold 0.5]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pidevices.devices import Device  # noqa: E402
+from pidevices.stats import RunningStats  # noqa: E402
+from pidevices.hardware_interfaces.gpio_implementations import (  # noqa: E402
+    Mcp23017GPIO, SimGPIO)
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C  # noqa: E402
+from pidevices.hardware_interfaces.spi_implementations import SimSPI  # noqa: E402
+from pidevices.hardware_interfaces.sim_devices import BusLatency  # noqa: E402
+from pidevices.actuators.pca9685 import PCA9685  # noqa: E402
+from pidevices.sensors.bme680 import BME680  # noqa: E402
+from pidevices.sensors.cytron_line_sensor_lss05 import (  # noqa: E402
+    CytronLfLSS05Mcp23017)
+from pidevices.sensors.hc_sr04 import HcSr04RPiGPIO  # noqa: E402
+from pidevices.sensors.icm_20948_imu import ICM_20948  # noqa: E402
+from pidevices.sensors.mcp3002 import Mcp3002  # noqa: E402
+
+I2C_BUS = 1
+SPI_PORT, SPI_DEVICE = 0, 1
+
+TRIGGER_PIN, ECHO_PIN = 5, 6
+ECHO_DELAY = 0.0005         # From the trigger to the start of the echo
+ECHO_DURATION = 0.0029      # An obstacle at 50cm
+
+# Metrics where any increase is a regression.
+EXACT_METRICS = ("transfers", "bytes", "alloc_bytes")
+TIME_METRICS = ("p50_us",)
+
+
+def bme680():
+    bme = BME680(I2C_BUS, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                 iir_coef=3, gas_status=1)
+    # The model measures as long as the chip, a sample includes the wait.
+    model = SimI2C.sim_bus(I2C_BUS).device(bme.BME_ADDRESS)
+    model.conversion_time = bme.measurement_duration()
+    return bme.read, bme.stop
+
+
+def icm_20948():
+    icm = ICM_20948(I2C_BUS)
+    return icm.read, icm.stop
+
+
+def pca9685():
+    pca = PCA9685(I2C_BUS, frequency=50)
+    channels = list(range(16))
+    values = [i / 16. for i in channels]
+    return lambda: pca.write(channels, values), pca.stop
+
+
+def mcp23x17_gpio():
+    gpio = Mcp23017GPIO(bus=I2C_BUS, address=0x20, inp="A_0", out="B_0")
+    gpio.init_input("inp", "up")
+    gpio.init_output("out", 0)
+    return lambda: gpio.read("inp"), gpio.close
+
+
+def cytron_lss05():
+    sensor = CytronLfLSS05Mcp23017("A_0", "A_1", "A_2", "A_3", "A_4",
+                                   bus=I2C_BUS, address=0x22)
+    return sensor.read, sensor.stop
+
+
+def mcp3002():
+    adc = Mcp3002(port=SPI_PORT, device=SPI_DEVICE)
+    SimSPI.sim_bus(SPI_PORT, SPI_DEVICE).device(0).set_voltage(1, 1.65)
+    return lambda: adc.read(1), adc.stop
+
+
+def hc_sr04():
+    # The sensor answers the falling edge of the trigger with an echo pulse.
+    responder = SimGPIO(trigger=TRIGGER_PIN)
+    responder.init_input("trigger", "down")
+    responder.set_pin_edge("trigger", "falling")
+
+    def echo():
+        SimGPIO.set_level(ECHO_PIN, 1)
+        time.sleep(ECHO_DURATION)
+        SimGPIO.set_level(ECHO_PIN, 0)
+
+    responder.set_pin_event("trigger", lambda: threading.Timer(ECHO_DELAY,
+                                                               echo).start())
+
+    sonar = HcSr04RPiGPIO(TRIGGER_PIN, ECHO_PIN)
+    sonar.start()
+
+    def stop():
+        sonar.stop()
+        responder.close()
+
+    return sonar.read, stop
+
+
+# name: (setup, default samples), setup returns the sample function and the
+# function that stops the driver.
+CASES = {
+    "bme680": (bme680, 50),
+    "icm_20948": (icm_20948, 500),
+    "pca9685": (pca9685, 500),
+    "mcp23x17_gpio": (mcp23x17_gpio, 2000),
+    "cytron_lss05": (cytron_lss05, 1000),
+    "mcp3002": (mcp3002, 20),
+    "hc_sr04": (hc_sr04, 20),
+}
+
+
+def buses(i2c_clock, spi_clock):
+    """Fresh simulated buses with the latency of their clocks."""
+
+    SimI2C.reset()
+    SimSPI.reset()
+    SimGPIO.reset()
+
+    i2c = SimI2C.sim_bus(I2C_BUS)
+    spi = SimSPI.sim_bus(SPI_PORT, SPI_DEVICE)
+    if i2c_clock:
+        i2c.latency = BusLatency.for_clock(i2c_clock)
+    if spi_clock:
+        spi.latency = BusLatency.for_clock(spi_clock, bits_per_byte=8)
+
+    return [i2c, spi]
+
+
+def counters(sim_buses):
+    return (sum(bus.transfers for bus in sim_buses),
+            sum(bus.bytes for bus in sim_buses))
+
+
+def run_case(setup, samples, sim_buses, warmup=5):
+    """Measure a case.
+
+    Returns:
+        dict: The metrics of the case.
+    """
+
+    sample, stop = setup()
+    try:
+        for _ in range(warmup):
+            sample()
+
+        stats = RunningStats(window=samples)
+        transfers, byte_num = counters(sim_buses)
+        clock = time.perf_counter
+        for _ in range(samples):
+            start = clock()
+            sample()
+            stats.add(clock() - start)
+        transfers_end, byte_num_end = counters(sim_buses)
+
+        # Allocations in a second pass, tracing slows down the samples.
+        allocated = 0
+        tracemalloc.start()
+        try:
+            for _ in range(samples):
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                sample()
+                allocated += tracemalloc.get_traced_memory()[1] - current
+        finally:
+            tracemalloc.stop()
+    finally:
+        stop()
+
+    return {
+        "samples": samples,
+        "p50_us": stats.percentile(50) * 1e6,
+        "p90_us": stats.percentile(90) * 1e6,
+        "p99_us": stats.percentile(99) * 1e6,
+        "transfers": (transfers_end - transfers) / float(samples),
+        "bytes": (byte_num_end - byte_num) / float(samples),
+        "alloc_bytes": allocated / float(samples),
+    }
+
+
+def regressions(results, baseline, threshold):
+    """Compare the results with a baseline.
+
+    Returns:
+        list: Strings describing every regression.
+    """
+
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in EXACT_METRICS + TIME_METRICS:
+            if metric not in base:
+                continue
+            limit = base[metric]
+            if metric in TIME_METRICS:
+                limit *= 1 + threshold
+            # Allocations may move a little with the interpreter state.
+            elif metric == "alloc_bytes":
+                limit = limit * 1.05 + 64
+            if metrics[metric] > limit:
+                found.append("{}: {} {:.2f} > {:.2f}".format(
+                    name, metric, metrics[metric], base[metric]))
+
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--samples", type=int, default=None,
+                        help="Samples of every case, overrides the defaults")
+    parser.add_argument("--i2c-clock", type=float, default=0)
+    parser.add_argument("--spi-clock", type=float, default=0)
+    parser.add_argument("--save", help="Write the results to a json file")
+    parser.add_argument("--compare", help="Baseline json file")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Allowed median latency increase, 0.5 is 50%%")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error("Unknown cases: {}".format(", ".join(unknown)))
+
+    Device.simulate()
+    results = {}
+    print("{:<14} {:>9} {:>9} {:>9} {:>10} {:>9} {:>11}".format(
+        "case", "p50 us", "p90 us", "p99 us", "transfers", "bytes",
+        "alloc bytes"))
+    for name in names:
+        setup, samples = CASES[name]
+        sim_buses = buses(args.i2c_clock, args.spi_clock)
+        metrics = run_case(setup, args.samples or samples, sim_buses)
+        results[name] = metrics
+        print("{:<14} {p50_us:>9.1f} {p90_us:>9.1f} {p99_us:>9.1f} "
+              "{transfers:>10.1f} {bytes:>9.1f} {alloc_bytes:>11.0f}".format(
+                  name, **metrics))
+    Device.simulate(False)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "i2c_clock": args.i2c_clock,
+                       "spi_clock": args.spi_clock,
+                       "cases": results}, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline["cases"], args.threshold)
+        for regression in found:
+            print("REGRESSION " + regression)
+        if found:
+            sys.exit(1)
+        print("No regressions against {}".format(args.compare))
+
+
+if __name__ == "__main__":
+    main()
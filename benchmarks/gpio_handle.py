@@ -0,0 +1,111 @@
+"""Micro-benchmark of GPIO.write/read against the pin handles.
+
+Compares the checked path, ``gpio.write(name, value)`` and
+``gpio.read(name)``, with the bound calls of :meth:`GPIO.handle` on:
+
+- PiGPIO: the pigpio connection is replaced by a stand in whose read and
+  write return at once, so the numbers are the python overhead of the paths.
+- SimGPIO: the simulated pins.
+- Mcp23017GPIO: the expander on the simulated i2c bus, that takes no time.
+- RPiGPIO: only on a pi with RPi.GPIO installed, the real pins.
+
+Usage:
+    python benchmarks/gpio_handle.py [--number N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pidevices.devices import Device  # noqa: E402
+from pidevices.hardware_interfaces.hardware_interfaces import GPIO  # noqa: E402
+from pidevices.hardware_interfaces.gpio_implementations import (  # noqa: E402
+    Mcp23017GPIO, PiGPIO, RPIGPIO, RPiGPIO, SimGPIO)
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C  # noqa: E402
+
+
+class NullPi(object):
+    """Stand in for pigpio.pi that answers at once."""
+
+    def read(self, gpio):
+        return 0
+
+    def write(self, gpio, level):
+        return 0
+
+
+def make_pigpio():
+    gpio = PiGPIO.__new__(PiGPIO)
+    GPIO.__init__(gpio, out=23, inp=24)
+    gpio.gpio = NullPi()
+    gpio.pins["out"].function = "output"
+    gpio.pins["inp"].function = "input"
+    return gpio
+
+
+def make_sim():
+    SimGPIO.reset()
+    gpio = SimGPIO(out=23, inp=24)
+    gpio.init_output("out", 0)
+    gpio.init_input("inp", "down")
+    return gpio
+
+
+def make_mcp():
+    SimI2C.reset()
+    gpio = Mcp23017GPIO(out="A_0", inp="A_1")
+    gpio.init_output("out", 0)
+    gpio.init_input("inp", "down")
+    return gpio
+
+
+def make_rpigpio():
+    gpio = RPiGPIO(out=23, inp=24)
+    gpio.init_output("out", 0)
+    gpio.init_input("inp", "down")
+    return gpio
+
+
+def cases(gpio):
+    out = gpio.handle("out")
+    inp = gpio.handle("inp")
+    return {
+        "write": lambda: gpio.write("out", 1),
+        "handle write": lambda: out.write(1),
+        "read": lambda: gpio.read("inp"),
+        "handle read": lambda: inp.read(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Device.simulate()
+    backends = [("PiGPIO", make_pigpio), ("SimGPIO", make_sim),
+                ("Mcp23017GPIO", make_mcp)]
+    if RPIGPIO is not None:
+        backends.append(("RPiGPIO", make_rpigpio))
+
+    print("{:<13} {:<13} {:>10} {:>9}".format("gpio", "path", "ns/call",
+                                              "speedup"))
+    for backend, make in backends:
+        gpio = make()
+        base = None
+        for name, func in cases(gpio).items():
+            best = min(timeit.repeat(func, number=args.number,
+                                     repeat=args.repeat)) / args.number
+            if not name.startswith("handle"):
+                base = best
+            print("{:<13} {:<13} {:>10.0f} {:>8.1f}x".format(
+                backend, name, best * 1e9, base / best))
+    Device.simulate(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Micro-benchmark of the SMBus2 block read paths.
+
+The bus is replaced by an in-memory stand in that fills the read messages
+with one memmove, so the numbers are the python overhead of every path
+without the time on the wire. Compared paths:
+
+- ord list: the former ``[ord(read.buf[i]) for i in range(n)]`` of
+  read_i2c and read_write.
+- read: :meth:`SMBus2.read_i2c`, now a bytearray converted to a list.
+- readinto: :meth:`SMBus2.readinto` into a preallocated bytearray.
+- readinto numpy: :meth:`SMBus2.readinto` into a preallocated numpy array.
+
+Usage:
+    python benchmarks/i2c_read.py [--sizes 12,32,512,4096] [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from ctypes import memset
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smbus2 import i2c_msg  # noqa: E402
+from pidevices.hardware_interfaces.i2c_implementations import SMBus2  # noqa: E402
+from pidevices.hardware_interfaces.bus_arbiter import BusArbiter  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ADDRESS = 0x69
+REGISTER = 0x72
+
+
+class MemoryBus(object):
+    """Stand in for smbus2.SMBus that answers reads from memory."""
+
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            if msg.flags:
+                memset(msg.buf, 0xA5, msg.len)
+
+
+def make_smbus2():
+    i2c = SMBus2.__new__(SMBus2)
+    i2c._smbus = MemoryBus()
+    i2c._lock = BusArbiter().client()
+    return i2c
+
+
+def ord_list(i2c, size):
+    """The per byte conversion that read_i2c used before readinto."""
+
+    read = i2c_msg.read(ADDRESS, size)
+    with i2c.lock:
+        i2c._smbus.i2c_rdwr(read)
+    return [ord(read.buf[i]) for i in range(size)]
+
+
+def cases(i2c, size):
+    buf = bytearray(size)
+    cases = {
+        "ord list": lambda: ord_list(i2c, size),
+        "read": lambda: i2c.read_i2c(ADDRESS, size),
+        "readinto": lambda: i2c.readinto(ADDRESS, REGISTER, buf),
+    }
+    if numpy is not None:
+        array = numpy.empty(size, dtype=numpy.uint8)
+        cases["readinto numpy"] = lambda: i2c.readinto(ADDRESS, REGISTER,
+                                                       array)
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="12,32,512,4096")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    i2c = make_smbus2()
+    print("{:>6}  {:<16} {:>10} {:>10}".format("bytes", "path", "us/read",
+                                               "speedup"))
+    for size in (int(s) for s in args.sizes.split(",")):
+        base = None
+        for name, func in cases(i2c, size).items():
+            best = min(timeit.repeat(func, number=args.number,
+                                     repeat=args.repeat)) / args.number
+            base = best if base is None else base
+            print("{:>6}  {:<16} {:>10.2f} {:>9.1f}x".format(
+                size, name, best * 1e6, base / best))
+
+
+if __name__ == "__main__":
+    main()
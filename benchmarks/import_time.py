@@ -0,0 +1,80 @@
+"""Import time benchmark of the pidevices package.
+
+Every case runs in a fresh interpreter so nothing is cached between them.
+The script reports the best wall time of ``import pidevices`` alone and of
+importing the package and accessing a single driver, together with the
+cumulative times of ``python -X importtime`` for the package's modules.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "import pidevices": "import pidevices",
+    "access Device": "import pidevices; pidevices.Device",
+    "access SMBus2": "import pidevices; pidevices.SMBus2",
+    "access MCP23017": "import pidevices; pidevices.MCP23017",
+}
+
+TIMER = ("import time; _t = time.perf_counter(); {code}; "
+         "print(time.perf_counter() - _t)")
+
+
+def time_case(code, repeat):
+    """Best wall time in seconds of code over repeat fresh interpreters."""
+
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)],
+                             cwd=ROOT, check=True,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL,
+                             universal_newlines=True)
+        elapsed = float(out.stdout.split()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def import_profile(code):
+    """Cumulative import time in us of every pidevices module."""
+
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         cwd=ROOT, check=True,
+                         stdout=subprocess.DEVNULL,
+                         stderr=subprocess.PIPE,
+                         universal_newlines=True)
+    profile = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if module.strip().startswith("pidevices") and cumulative.strip().isdigit():
+            profile.append((module.strip(), int(cumulative)))
+
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, code in CASES.items():
+        print("{:<20} {:8.2f} ms".format(name,
+                                         time_case(code, args.repeat) * 1e3))
+
+    print("\npython -X importtime -c 'import pidevices' (cumulative us)")
+    for module, cumulative in import_profile("import pidevices"):
+        print("    {:<45} {:>8}".format(module, cumulative))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Interrupt latency of the mcp23017 with i2c polling and with INT lines.
+
+The expander runs on the simulated i2c bus with the time of a real bus, its
+INTA output is wired to a simulated gpio pin. A pin of the expander toggles
+and the script measures the time until its interrupt handler is called, and
+the i2c transfers per second while there are no interrupts, for both modes:
+
+- polling: :meth:`MCP23017.poll_int` reading the INTF registers over i2c
+  with the adaptive :class:`IntPoller`, ``--poll-latency`` is its bound.
+- int line: the same after :meth:`MCP23017.set_int_lines`, the flags are
+  read only after an edge of INTA.
+
+Usage:
+    python benchmarks/mcp23017_interrupts.py [--samples N] [--i2c-clock 400e3]
+        [--poll-latency 0.002]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pidevices.devices import Device  # noqa: E402
+from pidevices.mcp23017 import MCP23017  # noqa: E402
+from pidevices.stats import RunningStats  # noqa: E402
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO  # noqa: E402
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C  # noqa: E402
+from pidevices.hardware_interfaces.sim_devices import BusLatency  # noqa: E402
+
+ADDRESS = 0x20
+PIN = "A_0"
+INTA = 17
+
+
+def measure(int_line, samples, clock, idle, poll_latency):
+    SimI2C.reset()
+    SimGPIO.reset()
+    bus = SimI2C.sim_bus(1)
+    bus.latency = BusLatency.for_clock(clock)
+    model = bus.device(ADDRESS)
+    model.on_interrupt = lambda port, level: SimGPIO.set_level(INTA, level)
+
+    mcp = MCP23017(1, ADDRESS)
+    mcp.poll_latency = poll_latency
+    if int_line:
+        mcp.set_int_lines(INTA)
+    mcp.set_pin_dir(PIN, 1)
+    mcp.set_pin_int(PIN, 1)
+    mcp.set_pin_debounce(PIN, 0)
+
+    called = threading.Event()
+    handled = [0.0]
+
+    def handler():
+        handled[0] = time.perf_counter()
+        called.set()
+
+    mcp.set_int_handl_func(PIN, handler)
+    mcp.poll_int_async([PIN])
+    time.sleep(0.05)
+
+    bus.reset_counters()
+    time.sleep(idle)
+    idle_rate = bus.transfers / idle
+
+    stats = RunningStats(window=samples)
+    level = 0
+    for _ in range(samples):
+        level ^= 1
+        called.clear()
+        start = time.perf_counter()
+        model.set_pin(PIN, level)
+        if not called.wait(1):
+            continue
+        stats.add(handled[0] - start)
+        # Let the handler read INTCAP before the next edge
+        time.sleep(0.002)
+
+    mcp.stop()
+
+    return stats, idle_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--i2c-clock", type=float, default=400e3)
+    parser.add_argument("--idle", type=float, default=0.5,
+                        help="Seconds without interrupts")
+    parser.add_argument("--poll-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    Device.simulate()
+    print("{:<10} {:>9} {:>9} {:>9} {:>8} {:>14}".format(
+        "mode", "p50 us", "p99 us", "max us", "missed", "idle xfers/s"))
+    for name, int_line in (("polling", False), ("int line", True)):
+        stats, idle_rate = measure(int_line, args.samples, args.i2c_clock,
+                                   args.idle, args.poll_latency)
+        print("{:<10} {:>9.1f} {:>9.1f} {:>9.1f} {:>8} {:>14.0f}".format(
+            name, stats.percentile(50) * 1e6, stats.percentile(99) * 1e6,
+            stats.max * 1e6, args.samples - stats.count, idle_rate))
+    Device.simulate(False)
+
+
+if __name__ == "__main__":
+    main()
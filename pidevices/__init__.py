@@ -1,8 +1,42 @@
-from .sensors import *
-from .actuators import *
-from .hardware_interfaces import *
-from .devices import *
-from .mcp23x17 import *
-from .mcp23017 import *
+"""Pidevices package.
+
+Every driver and hardware interface is importable from the top level package,
+but its module is only imported when the name is first accessed. That keeps
+``import pidevices`` cheap, a program that uses one button doesn't pay for
+the camera, audio and touch screen libraries.
+"""
+
+from .lazy_import import lazy_attributes
+from . import sensors, actuators, hardware_interfaces
+
+_EXPORTS = {}
+_EXPORTS.update({name: ('.sensors', name) for name in sensors.__all__})
+_EXPORTS.update({name: ('.actuators', name) for name in actuators.__all__})
+_EXPORTS.update({name: ('.hardware_interfaces', name)
+                 for name in hardware_interfaces.__all__})
+_EXPORTS.update({
+    'Device': '.devices',
+    'Sensor': '.devices',
+    'Actuator': '.devices',
+    'Composite': '.devices',
+    'ArrayRingBuffer': '.ring_buffer',
+    'Dispatcher': '.dispatcher',
+    'EdgeQueue': '.edge_queue',
+    'EdgeRecorder': '.edge_recorder',
+    'DifferentialOdometry': '.odometry',
+    'OdometryState': '.odometry',
+    'IntPoller': '.int_poller',
+    'SoftPWM': '.soft_pwm',
+    'CalibrationCache': '.calibration_cache',
+    'RegisterCache': '.register_cache',
+    'RegisterMap': '.register_map',
+    'Field': '.register_map',
+    'Value': '.register_map',
+    'MCP23x17': '.mcp23x17',
+    'MCP23017': '.mcp23017',
+})
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPORTS)
 
 name = 'pidevices'
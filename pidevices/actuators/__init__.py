@@ -1,12 +1,32 @@
-"""Import all actuators"""
-
-from .dfrobot_motor_controller_pigpio import *
-from .dfrobot_motor_controller import *
-from .dfrobot_motor_controller_pca9685 import *
-from .motor_controller import *
-from .neopixel_rgb import *
-from .pca9685 import *
-from .servo_driver import *
-from .speaker import *
-from .touch_screen import *
-from .safe_speaker import *
\ No newline at end of file
+"""Import all actuators
+
+The actuator modules are imported lazily, the first time one of their names
+is accessed.
+"""
+
+from ..lazy_import import lazy_attributes
+
+_EXPORTS = {
+    'DfrobotMotorControllerPiGPIO': '.dfrobot_motor_controller_pigpio',
+    'ChannelPos': '.dfrobot_motor_controller_pigpio',
+    'Pin': '.dfrobot_motor_controller_pigpio',
+    'DfrobotMotorController': '.dfrobot_motor_controller',
+    'Motor': '.dfrobot_motor_controller',
+    'DfrobotMotorControllerPCA': '.dfrobot_motor_controller_pca9685',
+    'Channel': '.dfrobot_motor_controller_pca9685',
+    'MotorController': '.motor_controller',
+    'LedController': '.neopixel_rgb',
+    'PCA9685': '.pca9685',
+    'ServoDriver': '.servo_driver',
+    'SpeakerError': '.speaker',
+    'Speaker': '.speaker',
+    'TouchScreen': '.touch_screen',
+    'MsgType': '.safe_speaker',
+    'ResponeType': '.safe_speaker',
+    'Msg': '.safe_speaker',
+    'SpeakerConsumer': '.safe_speaker',
+    'SafeSpeaker': '.safe_speaker',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPORTS)
@@ -144,17 +144,15 @@ class DfrobotMotorController(MotorController):
         self.hardware_interfaces[pwm].duty_cycle = 0
         self.hardware_interfaces[pwm].enable = 1
 
-    def _write_motor(self, channel, direction, speed, RPM):
-        """Drive one motor writting to direction and pwm.
+    def _write_motor(self, channel, speed, RPM):
+        """Drive the pwm of one motor.
         
         Args:
             channel: Named tuple that has the direction pin name and the 
                 hpwm index.
-            direction: Direction value.
             speed: Speed value.
             RPM: Flag for choosing speed type.
         """
-        self.hardware_interfaces[self._gpio].write(channel.M, direction)
 
         # Translate rpm to pwm duty cycle.
         if RPM:
@@ -175,13 +173,21 @@ class DfrobotMotorController(MotorController):
                 to :data:`False`.
         """
 
-        if speed_1 is not None:
-            direction = int(speed_1 >= 0)
-            self._write_motor(self._channel_1, direction, abs(speed_1), RPM)
+        speeds = [(channel, speed)
+                  for channel, speed in ((self._channel_1, speed_1),
+                                         (self._channel_2, speed_2))
+                  if speed is not None]
 
-        if speed_2 is not None:
-            direction = int(speed_2 >= 0)
-            self._write_motor(self._channel_2, direction, abs(speed_2), RPM)
+        # Both direction pins change with one gpio access.
+        self.hardware_interfaces[self._gpio].write_many(
+            {channel.M: int(speed >= 0) for channel, speed in speeds})
+
+        for channel, speed in speeds:
+            self._write_motor(channel, abs(speed), RPM)
+
+        self.directions = tuple(
+            previous if speed is None else (1 if speed >= 0 else -1)
+            for previous, speed in zip(self.directions, (speed_1, speed_2)))
 
     def stop(self):
         """Clear hardware and os resources."""
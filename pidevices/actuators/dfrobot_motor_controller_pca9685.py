@@ -180,6 +180,10 @@ class DfrobotMotorControllerPCA(MotorController):
             direction = int(speed_2 >= 0)
             self._write_motor(self._channel_2, direction, abs(speed_2), RPM)
 
+        self.directions = tuple(
+            previous if speed is None else (1 if speed >= 0 else -1)
+            for previous, speed in zip(self.directions, (speed_1, speed_2)))
+
     def stop(self):
         """Clear hardware and os resources."""
         self._device.stop()
@@ -113,6 +113,9 @@ class DfrobotMotorControllerPiGPIO(MotorController):
         if not self._is_init:
             return
 
+        self.directions = (1 if pwm_left >= 0 else -1,
+                           1 if pwm_right >= 0 else -1)
+
         if pwm_left == 0.0 and pwm_right == 0.0:
             self._write_channel(self._channel_left, 0.0, self.MotionDir['FORWARD'])
             self._write_channel(self._channel_right, 0.0, self.MotionDir['BACKWARD'])
@@ -2,5 +2,11 @@ from ..devices import Actuator
 
 
 class MotorController(Actuator):
-    """Abstract class representing motor controllers."""
-    pass
+    """Abstract class representing motor controllers.
+
+    Implementations keep the sign of the last speed of each motor in
+    :attr:`directions`, 1 forward and -1 backward, for the odometry of
+    encoders that don't sense the direction.
+    """
+
+    directions = (1, 1)
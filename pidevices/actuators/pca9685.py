@@ -2,6 +2,7 @@
 
 from .servo_driver import ServoDriver
 from ..exceptions import MoreValuesThanChannels
+from ..register_cache import RegisterCache
 import time
 
 
@@ -16,6 +17,8 @@ class PCA9685(ServoDriver):
         bus (int): I2C bus.
         frequency: PWM frequency of the module.
         oe (int): The bcm pin number of enable pin. 
+        cache_registers (bool): Keep a shadow copy of the mode and prescale
+            registers, so changing them needs only writes.
     """
 
     LED_OFFSET = 4
@@ -41,6 +44,7 @@ class PCA9685(ServoDriver):
     # Values for mode_1
     ALLCALL = 0x01
     SLEEP = 0x10
+    RESTART = 0x80
 
     # Values for mode_2
     OUTDRV = 0x04
@@ -55,13 +59,16 @@ class PCA9685(ServoDriver):
     SWRST = 0x00
     RESET = 0x06
 
-    def __init__(self, bus, frequency=None, oe=None, name="", max_data_length=1):
+    def __init__(self, bus, frequency=None, oe=None, name="", max_data_length=1,
+                 cache_registers=False):
         """Constructor"""
 
         super(PCA9685, self).__init__(name, max_data_length)
         self._frequency = frequency
         self._oe = oe
         self._bus = bus
+        self._cache_registers = cache_registers
+        self._cache = None
         self.start()
 
     @property
@@ -93,31 +100,27 @@ class PCA9685(ServoDriver):
         """
         prescaler = int(round(self.OSC_CLOCK/(self.TICKS*freq) - 1))
 
-        # Save previous mode 1 value and then activate sleep bit
-        old_mode = self.hardware_interfaces[self._i2c].read(self.PCA_ADDRESS,
-                                                            self.MODE_1)
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  self.MODE_1,
-                                                  old_mode & 0x7F | self.SLEEP)
+        # The register accesses hold the bus, no other thread may change
+        # mode 1 while the oscillator is asleep.
+        with self.hardware_interfaces[self._i2c].lock:
+            # Save previous mode 1 value and then activate sleep bit
+            old_mode = self._read_register(self.MODE_1)
+            self._write_register(self.MODE_1, old_mode & 0x7F | self.SLEEP)
 
-        # Write prescaler value
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  self.PRESCALE,
-                                                  prescaler)
+            # Write prescaler value
+            self._write_register(self.PRESCALE, prescaler)
 
-        # Restore mode_1
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  self.MODE_1,
-                                                  old_mode)
+            # Restore mode_1
+            self._write_register(self.MODE_1, old_mode)
+
+        # The oscillator runs again, the other devices use the bus while it
+        # settles.
         self._settle_osc()
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  self.MODE_1,
-                                                  old_mode | 0x80)
+        self._write_register(self.MODE_1, old_mode | self.RESTART)
 
     def _get_frequency(self):
         """Maybe read prescaler value than having an extra variable."""
-        prescaler = self.hardware_interfaces[self._i2c].read(self.PCA_ADDRESS,
-                                                             self.PRESCALE)
+        prescaler = self._read_register(self.PRESCALE)
         return int(self.OSC_CLOCK / ((prescaler + 1)*self.TICKS))
 
     frequency = property(_get_frequency, _set_frequency, doc="""
@@ -130,14 +133,18 @@ class PCA9685(ServoDriver):
         self._i2c = self.init_interface("i2c", bus=self.bus)
         if self.oe:
             self._gpio = self.init_interface("gpio", oe=self.oe)
+        if self._cache_registers:
+            self._cache = RegisterCache.shared(
+                self.hardware_interfaces[self._i2c], self.PCA_ADDRESS)
 
         # Init modes of pca
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS, 
-                                                  self.MODE_2,
-                                                  self.OUTDRV)
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS, 
-                                                  self.MODE_1,
-                                                  self.ALLCALL)
+        self.hardware_interfaces[self._i2c].transaction(self.PCA_ADDRESS)\
+            .write(self.MODE_2, self.OUTDRV)\
+            .write(self.MODE_1, self.ALLCALL)\
+            .execute()
+        if self._cache is not None:
+            self._cache.put(self.MODE_2, self.OUTDRV)
+            self._cache.put(self.MODE_1, self.ALLCALL)
         self._settle_osc()
         
         # Change frequency
@@ -145,12 +152,53 @@ class PCA9685(ServoDriver):
             self.frequency = self._frequency
 
         # Write 0 to sleep bit
-        mode = self.hardware_interfaces[self._i2c].read(self.PCA_ADDRESS,
-                                                        self.MODE_1)
+        mode = self._read_register(self.MODE_1)
         mode = mode & (self.SLEEP ^ 0xFF)
+        self._write_register(self.MODE_1, mode)
+
+    @property
+    def register_cache(self):
+        """The :class:`RegisterCache` of the chip or None if it is disabled."""
+        return self._cache
+
+    def resync_registers(self):
+        """Read again the cached registers from the chip."""
+        if self._cache is not None:
+            self._cache.resync(self._bus_read)
+
+    def _bus_read(self, register):
+        """Read a register from the bus, without the restart status bit."""
+
+        value = self.hardware_interfaces[self._i2c].read(self.PCA_ADDRESS,
+                                                         register)
+        # Restart is a status bit, it is cleared when the chip restarts.
+        if register == self.MODE_1 and self._cache is not None:
+            value &= ~self.RESTART
+
+        return value
+
+    def _read_register(self, register):
+        """Read a register, from the register cache if it has it."""
+
+        cache = self._cache
+        value = None if cache is None else cache.get(register)
+        if value is None:
+            value = self._bus_read(register)
+            if cache is not None:
+                cache.put(register, value)
+
+        return value
+
+    def _write_register(self, register, value):
+        """Write a register and record it in the register cache."""
+
         self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  self.MODE_1,
-                                                  mode)
+                                                  register,
+                                                  value)
+        if self._cache is not None:
+            if register == self.MODE_1:
+                value &= ~self.RESTART
+            self._cache.put(register, value)
 
     def write(self, channels, values, degrees=False, delay=0):
         """Drive pwm channels.
@@ -181,6 +229,9 @@ class PCA9685(ServoDriver):
 
         values_len = len(values)
 
+        # Every register write of every channel goes in one bus transaction.
+        transaction = self.hardware_interfaces[self._i2c].transaction(
+            self.PCA_ADDRESS)
         for i, channel in enumerate(channels):
             value = values[i % values_len]
             duty_cycle = self._angle_to_dc(value) if degrees else value 
@@ -189,8 +240,10 @@ class PCA9685(ServoDriver):
             # overflowing self.TICKS
             led_on, led_off = self._compute_on_off(duty_cycle, delay)
 
-            self._set_register(self.LED + 4*channel, led_on)
-            self._set_register(self.LED + 4*channel + 2, led_off)
+            self._set_register(self.LED + 4*channel, led_on, transaction)
+            self._set_register(self.LED + 4*channel + 2, led_off, transaction)
+
+        transaction.execute()
 
     def _compute_on_off(self, duty_cycle, delay):
         """Compute the value in registers.
@@ -215,19 +268,28 @@ class PCA9685(ServoDriver):
 
         return led_on, led_off
 
-    def _set_register(self, register, value):
+    def _set_register(self, register, value, transaction=None):
         """Write to a 2 bytes register a 10bit value. The registers are 
            first low and then high bytes.
+
+        Args:
+            register: The address of the low byte.
+            value: The value.
+            transaction: Optional :class:`I2CTransaction` to queue the writes
+                to. If it is None the writes are sent immediately.
         """
 
         low = value & 0xFF 
         h = value >> 8
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  register,
-                                                  low)
-        self.hardware_interfaces[self._i2c].write(self.PCA_ADDRESS,
-                                                  register + 1,
-                                                  h)
+        tx = transaction
+        if tx is None:
+            tx = self.hardware_interfaces[self._i2c].transaction(
+                self.PCA_ADDRESS)
+
+        tx.write(register, low).write(register + 1, h)
+
+        if transaction is None:
+            tx.execute()
 
     def _write_all(self, value):
         """Privete function for writting to all registers
@@ -241,6 +303,9 @@ class PCA9685(ServoDriver):
         """Free hardware and os resources."""
         self.write(list(range(16)), 0)
         self.hardware_interfaces[self._i2c].close()
+        if self._cache is not None:
+            RegisterCache.release(self._cache)
+            self._cache = None
 
     def _settle_osc(self):
         time.sleep(0.005)
@@ -0,0 +1,182 @@
+"""calibration_cache.py"""
+
+import json
+import os
+import threading
+
+# The file of the default cache, the environment variable overrides it.
+DEFAULT_PATH = os.path.join("~", ".cache", "pidevices", "calibration.json")
+
+
+class CalibrationCache(object):
+    """On-disk cache of the calibration and identity data of chips.
+
+    Drivers that read a lot of constant data at start, like the factory
+    calibration of a sensor, store it once and on the next start of the
+    program only check that it still belongs to the chip on the bus. The
+    entries are keyed by the driver, the bus, the address and the chip id,
+    see :meth:`key`, and every entry keeps a ``check``, a few values that
+    the driver reads cheaply to tell that it talks to the same chip. An
+    entry whose check doesn't match is a miss, the driver reads the data
+    again and replaces it with :meth:`put`.
+
+    The cache is a json file that is loaded on the first access and
+    rewritten atomically on every change. A missing or corrupted file is an
+    empty cache and a file that can't be written only loses the
+    persistence, the drivers never fail because of their cache.
+
+    Args:
+        path (str): The json file. Defaults to the environment variable
+            PIDEVICES_CALIBRATION_CACHE or
+            ``~/.cache/pidevices/calibration.json``.
+    """
+
+    VERSION = 1
+
+    _default = None
+    _default_mutex = threading.Lock()
+
+    def __init__(self, path=None):
+        """Constructor"""
+
+        if path is None:
+            path = os.environ.get("PIDEVICES_CALIBRATION_CACHE") or \
+                DEFAULT_PATH
+        self.path = os.path.expanduser(path)
+        self._mutex = threading.Lock()
+        self._entries = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls):
+        """Get the cache of the default path, shared by the drivers.
+
+        Returns:
+            :class:`CalibrationCache`
+        """
+
+        with cls._default_mutex:
+            if cls._default is None:
+                cls._default = cls()
+
+            return cls._default
+
+    @classmethod
+    def resolve(cls, cache):
+        """The cache of the calibration_cache argument of a driver.
+
+        Args:
+            cache: None or False for no cache, True for :meth:`default`, a
+                path or a :class:`CalibrationCache`.
+
+        Returns:
+            :class:`CalibrationCache` or None.
+        """
+
+        if cache is None or cache is False:
+            return None
+        if cache is True:
+            return cls.default()
+        if isinstance(cache, CalibrationCache):
+            return cache
+
+        return cls(cache)
+
+    @staticmethod
+    def key(driver, bus, address, chip_id):
+        """The key of a chip.
+
+        Args:
+            driver (str): The name of the driver.
+            bus (int): The i2c bus.
+            address (int): The address of the slave.
+            chip_id (int): The id register of the chip.
+
+        Returns:
+            str
+        """
+
+        return "{}:{}:0x{:02X}:0x{:02X}".format(driver, bus, address, chip_id)
+
+    def get(self, key, check=None):
+        """Get the data of a chip.
+
+        Args:
+            key (str): See :meth:`key`.
+            check (list): The values that were stored with the data, json
+                types only.
+
+        Returns:
+            The data or None if there isn't an entry or its check doesn't
+            match.
+        """
+
+        with self._mutex:
+            entry = self._load().get(key)
+            if not isinstance(entry, dict) or "data" not in entry or \
+                    entry.get("check") != check:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry["data"]
+
+    def put(self, key, data, check=None):
+        """Store the data of a chip and save the file.
+
+        Args:
+            key (str): See :meth:`key`.
+            data: The data, json types only.
+            check (list): The values that :meth:`get` expects.
+        """
+
+        with self._mutex:
+            self._load()[key] = {"check": check, "data": data}
+            self._save()
+
+    def invalidate(self, key=None):
+        """Remove an entry, all of them if key is None, and save the file."""
+
+        with self._mutex:
+            entries = self._load()
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+            self._save()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    content = json.load(f)
+            except (OSError, ValueError):
+                content = None
+
+            if isinstance(content, dict) and \
+                    content.get("version") == self.VERSION and \
+                    isinstance(content.get("entries"), dict):
+                self._entries = content["entries"]
+            else:
+                self._entries = {}
+
+        return self._entries
+
+    def _save(self):
+        # Write a temporary file and rename it, so a reader never sees half
+        # of a file.
+        tmp = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": self.VERSION, "entries": self._entries},
+                          f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
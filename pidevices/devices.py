@@ -1,9 +1,14 @@
 """devices.py"""
 
+import atexit
+import os
 from itertools import islice
 from collections import deque
 from importlib import import_module
 from .exceptions import NotSupportedInterface, NotInstalledInterface
+from .ring_buffer import ArrayRingBuffer
+from .hardware_interfaces.bus_pool import BusPool
+from .hardware_interfaces.trace import TraceWriter, RecordedInterface, Replay
 
 
 class Device(object):
@@ -16,6 +21,14 @@ class Device(object):
     Args:
         name (str): The optional name of the device.
         max_data_length (int): The max length of the data deque.
+        data_dtype: Optional numpy dtype of the samples. If it is given the
+            data are stored in a preallocated :class:`ArrayRingBuffer` 
+            instead of a deque and :meth:`get_data` returns numpy views.
+            Sensors whose readings are fixed-shape numbers, like ICM_20948,
+            BME680 and the wheel encoders, take it too. Defaults to
+            :data:`None`.
+        data_shape (tuple): Optional shape of every sample when data_dtype is
+            used. Defaults to :data:`()`.
 
     Raises:
         TypeError: Invalid name type, or invalid max_data_length type.
@@ -41,7 +54,33 @@ class Device(object):
         'HPWM': "pidevices.hardware_interfaces.hpwm_implementations"
     }
 
-    def __init__(self, name="", max_data_length=100):
+    # Simulated implementations that replace the library ones when the
+    # simulation is enabled, see simulate().
+    _SIMULATIONS = {
+        'RPiGPIO': "SimGPIO",
+        'PiGPIO': "SimGPIO",
+        'SPIimplementation': "SimSPI",
+        'SMBus2': "SimI2C",
+        'HPWMPeriphery': "SimHPWM"
+    }
+
+    # Set from the PIDEVICES_SIMULATE environment variable or simulate().
+    _simulation = os.environ.get("PIDEVICES_SIMULATE", "") not in ("", "0")
+
+    # Trace of the interface calls, see record() and replay(). A recording
+    # starts with the first interface if PIDEVICES_RECORD is a path.
+    _record_path = os.environ.get("PIDEVICES_RECORD") or None
+    _recorder = None
+    _replay = None
+
+    # Interfaces whose connections are shared between devices, see BusPool.
+    _SHARED_INTERFACES = ('I2C', 'SPI')
+
+    # Priority of the device on shared buses, higher values get the bus first.
+    BUS_PRIORITY = 0
+
+    def __init__(self, name="", max_data_length=100,
+                 data_dtype=None, data_shape=()):
         """Constructor of the class."""
 
         if not isinstance(name, str):
@@ -51,11 +90,86 @@ class Device(object):
 
         self._id = name
         self._max_data_length = max_data_length
-        self.data = deque(maxlen = max_data_length)
+        if data_dtype is None:
+            self.data = deque(maxlen = max_data_length)
+        else:
+            self.data = ArrayRingBuffer(max_data_length, data_dtype, data_shape)
 
         # A list with the hardware interfaces objects.
         self._hardware_interfaces = []  
 
+    @staticmethod
+    def simulate(enable=True):
+        """Use the simulated hardware interfaces for every device.
+
+        Devices created afterwards get SimGPIO, SimSPI, SimI2C and SimHPWM
+        instead of the library implementations, also when they ask for one
+        by name, so the drivers run on any machine against the models of
+        :mod:`pidevices.hardware_interfaces.sim_devices`. The mcp23017 gpio
+        implementation stays, over the simulated i2c bus. Setting the
+        environment variable PIDEVICES_SIMULATE=1 enables it at import.
+
+        Args:
+            enable (bool): Enable or disable the simulation. Defaults to
+                :data:`True`.
+        """
+
+        Device._simulation = bool(enable)
+
+    @staticmethod
+    def record(path):
+        """Record the calls of the hardware interfaces to a trace file.
+
+        Interfaces created afterwards are wrapped in a
+        :class:`RecordedInterface`, every call with its arguments, result
+        and timestamps is written to the trace and it can be replayed later
+        with :meth:`replay`. Setting the environment variable
+        PIDEVICES_RECORD to a path records from the first interface.
+
+        Args:
+            path (str): The trace file, None stops the current recording.
+
+        Returns:
+            :class:`TraceWriter`: The trace or None.
+        """
+
+        if Device._recorder is not None:
+            Device._recorder.close()
+        Device._record_path = path
+        Device._recorder = None
+        if path is not None:
+            Device._recorder = TraceWriter(path)
+            # Buffered records are written at exit
+            atexit.register(Device._recorder.close)
+
+        return Device._recorder
+
+    @staticmethod
+    def replay(path, speed=None, strict=False):
+        """Replay a trace of :meth:`record` instead of using the hardware.
+
+        Interfaces created afterwards are :class:`ReplayedInterface` objects
+        matched to the recorded ones by type and arguments, the drivers get
+        the recorded data without the hardware or its libraries.
+
+        Args:
+            path (str): The trace file, None stops the current replay.
+            speed (float): None replays as fast as possible, 1.0 with the
+                original timing. Defaults to :data:`None`.
+            strict (bool): Check the arguments of the calls too. Defaults to
+                :data:`False`.
+
+        Returns:
+            :class:`Replay`: The replay session or None.
+        """
+
+        if Device._replay is not None:
+            Device._replay.close()
+        Device._replay = Replay(path, speed, strict) \
+            if path is not None else None
+
+        return Device._replay
+
     @property
     def hardware_interfaces(self):
         """A list with the objects of the device's used hardware interfaces."""
@@ -91,19 +205,26 @@ class Device(object):
         """Choose an implementation for an interface.
         
         Basically using the impl parameter finds the implemented class and 
-        creates a new instance of that class. 
+        creates a new instance of that class. I2C and SPI connections are 
+        shared with the other devices on the same bus through the 
+        :class:`BusPool`, so the device gets a handle that is closed with the
+        last device that uses the bus.
 
         Args:
             interface (str): String representing the hardware interface type,
                 it should be GPIO/gpio, SPI/spi, UART/uart, I2C/i2c or HPWM/hpwm.
             impl (str): The specific implementation to be used. If it is none the 
                 first that is installed will be used. Currently supported values
-                  - GPIO: "RPiGPIO", "Mcp23017GPIO"
-                  - SPI: "SPIimplementation"
+                  - GPIO: "RPiGPIO", "PiGPIO", "Mcp23017GPIO", "SimGPIO"
+                  - SPI: "SPIimplementation", "SimSPI"
                   - UART: 
-                  - I2C: "SMBus2"
-                  - HPWM: "HPWMPeriphery"
-                The above list has the form interface: implementation.
+                  - I2C: "SMBus2", "SimI2C"
+                  - HPWM: "HPWMPeriphery", "SimHPWM"
+                The above list has the form interface: implementation. With
+                :meth:`simulate` enabled the library implementations are
+                replaced by the simulated ones. With :meth:`record` the
+                interface is wrapped in a :class:`RecordedInterface` and
+                with :meth:`replay` it is a :class:`ReplayedInterface`.
             **kwargs: Keyword arguments for the constructor of the chosen 
                 interface.
 
@@ -126,16 +247,33 @@ class Device(object):
             raise NotSupportedInterface("{} is invalid name "
                                         "for interface.".format(interface))
 
+        if Device._replay is not None:
+            self._hardware_interfaces.append(
+                Device._replay.open(interface, kwargs))
+            return len(self._hardware_interfaces) - 1
+
         module = import_module(self._MODULES[interface])
         obj = None
+        if impl is not None and Device._simulation:
+            impl = self._SIMULATIONS.get(impl, impl)
+
         if impl is not None:
-            obj = getattr(module, impl)(**kwargs)
+            obj = self._create_interface(interface, getattr(module, impl),
+                                         **kwargs)
         else:
-            for impls in self._IMPLEMENTATIONS[interface]:
+            impls_list = self._IMPLEMENTATIONS[interface]
+            if Device._simulation:
+                impls_list = [self._SIMULATIONS.get(name, name)
+                              for name in impls_list]
+
+            for impls in impls_list:
                 try:
-                    obj = getattr(module, impls)(**kwargs)
+                    obj = self._create_interface(interface,
+                                                 getattr(module, impls),
+                                                 **kwargs)
                 except ImportError:
                     continue
+                break
 
             if obj is None:
                 # Raise not installed error.
@@ -143,14 +281,34 @@ class Device(object):
                                             " for the {}"
                                             " interface".format(interface))
 
+        if Device._record_path is not None and Device._recorder is None:
+            Device.record(Device._record_path)
+        if Device._recorder is not None:
+            channel = Device._recorder.channel(interface, type(obj), kwargs)
+            obj = RecordedInterface(obj, Device._recorder, channel)
+
         self._hardware_interfaces.append(obj)
 
         return len(self._hardware_interfaces) - 1
 
+    def _create_interface(self, interface, impl, **kwargs):
+        """Create an interface object or get a shared bus handle."""
+
+        if interface in self._SHARED_INTERFACES:
+            handle = BusPool.acquire(interface, impl, **kwargs)
+            handle._lock.priority = self.BUS_PRIORITY
+            handle._lock.name = self.id or type(self).__name__
+            return handle
+
+        return impl(**kwargs)
+
     def update_data(self, value):
         """Insert an element to the end of the data deque."""
 
-        if len(self.data) < self.max_data_length:
+        if isinstance(self.data, ArrayRingBuffer):
+            # Written in place, the oldest sample is overwritten when full.
+            self.data.append(value)
+        elif len(self.data) < self.max_data_length:
             self.data.append(value)
         else:
             _ = self.data.popleft()
@@ -167,9 +325,18 @@ class Device(object):
             end (int): End index of data.
 
         Returns:
-            list: That has the 
+            list: That has the requested data. If the device uses an array 
+            ring buffer a read only numpy view is returned instead.
         """
-        
+
+        if isinstance(self.data, ArrayRingBuffer):
+            # Same indexing as the deque, a negative end includes the last.
+            end = end if end >= 0 else len(self.data) + (end+1)
+            try:
+                return self.data.window(start, end)
+            except IndexError as e:
+                raise RuntimeError(str(e))
+
         if abs(start) > len(self.data):
             raise RuntimeError("Empty data queue.")
 
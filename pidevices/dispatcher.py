@@ -0,0 +1,184 @@
+"""dispatcher.py"""
+
+import threading
+import time
+import traceback
+from collections import deque
+from .stats import RunningStats
+
+
+class Dispatcher(object):
+    """Fixed pool of worker threads that calls handlers in order per key.
+
+    Calls submitted with the same key, e.x. the interrupts of one pin, run
+    one at a time in submission order, calls of different keys run in
+    parallel on the workers. If a key already has max_pending calls
+    waiting behind the running one, new calls are coalesced, they are
+    dropped because the waiting call will see the same state. The total of
+    waiting calls is bounded by max_queue, calls above it are rejected, so a
+    flood of events can't create threads or memory without limit.
+
+    Args:
+        workers (int): The number of worker threads. Defaults to :data:`2`.
+        max_pending (int): Waiting calls per key. Defaults to :data:`1`.
+        max_queue (int): Waiting calls of all keys. Defaults to
+            :data:`64`.
+        name (str): Prefix of the worker thread names.
+    """
+
+    def __init__(self, workers=2, max_pending=1, max_queue=64,
+                 name="dispatcher"):
+        """Constructor"""
+
+        if workers < 1 or max_pending < 1 or max_queue < 1:
+            raise ValueError("workers, max_pending and max_queue must be "
+                             "positive.")
+
+        self.max_pending = max_pending
+        self.max_queue = max_queue
+        self._condition = threading.Condition()
+        self._ready = deque()       # Keys with waiting calls and no worker
+        self._pending = {}          # key: deque of (function, args, time)
+        self._running = set()
+        self._depth = 0
+        self._closed = False
+
+        self._submitted = 0
+        self._coalesced = 0
+        self._rejected = 0
+        self._completed = 0
+        self._errors = 0
+        self._max_depth = 0
+        self._wait = RunningStats()
+
+        self._workers = [threading.Thread(target=self._work, daemon=True,
+                                          name="{}-{}".format(name, i))
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key, function, *args):
+        """Queue a call of function(*args).
+
+        Args:
+            key: Calls with equal keys run in order, one at a time.
+            function: The function.
+            *args: Its arguments.
+
+        Returns:
+            bool: If the call was queued, False when it was coalesced or
+            rejected.
+        """
+
+        with self._condition:
+            if self._closed:
+                return False
+            self._submitted += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = deque()
+            if len(pending) >= self.max_pending:
+                self._coalesced += 1
+                return False
+            if self._depth >= self.max_queue:
+                self._rejected += 1
+                return False
+
+            pending.append((function, args, time.perf_counter()))
+            self._depth += 1
+            self._max_depth = max(self._max_depth, self._depth)
+            if key not in self._running and len(pending) == 1:
+                self._ready.append(key)
+                self._condition.notify()
+
+        return True
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._ready and not self._closed:
+                    self._condition.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                function, args, submitted = self._pending[key].popleft()
+                self._depth -= 1
+                self._running.add(key)
+                self._wait.add(time.perf_counter() - submitted)
+
+            try:
+                function(*args)
+            except Exception:
+                with self._condition:
+                    self._errors += 1
+                traceback.print_exc()
+
+            with self._condition:
+                self._running.discard(key)
+                self._completed += 1
+                if self._pending[key]:
+                    self._ready.append(key)
+                    self._condition.notify()
+                else:
+                    del self._pending[key]
+                self._condition.notify_all()
+
+    @property
+    def depth(self):
+        """The number of waiting calls."""
+        return self._depth
+
+    def join(self, timeout=None):
+        """Wait until every queued call has run.
+
+        Args:
+            timeout (float): Max seconds to wait, None waits forever.
+
+        Returns:
+            bool: False if the timeout expired.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._depth and not self._running, timeout)
+
+    def statistics(self):
+        """Counters of the dispatcher.
+
+        Returns:
+            dict: The submitted, coalesced, rejected, completed and failed
+            calls, the current and max number of waiting calls and the
+            statistics of the seconds from submission to start in "wait",
+            see :meth:`RunningStats.as_dict`.
+        """
+
+        with self._condition:
+            return {"submitted": self._submitted,
+                    "coalesced": self._coalesced,
+                    "rejected": self._rejected,
+                    "completed": self._completed,
+                    "errors": self._errors,
+                    "depth": self._depth,
+                    "max_depth": self._max_depth,
+                    "wait": self._wait.as_dict()}
+
+    def close(self, wait=True):
+        """Stop the workers, the waiting calls are dropped.
+
+        Args:
+            wait (bool): Wait for the running calls to finish. Defaults to
+                :data:`True`.
+        """
+
+        with self._condition:
+            self._closed = True
+            self._ready.clear()
+            self._pending = {key: deque() for key in self._running}
+            self._depth = 0
+            self._condition.notify_all()
+
+        if wait:
+            current = threading.current_thread()
+            for worker in self._workers:
+                if worker is not current:
+                    worker.join()
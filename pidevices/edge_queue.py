@@ -0,0 +1,212 @@
+"""edge_queue.py"""
+
+import threading
+from array import array
+
+# pigpio ticks are microseconds in an unsigned 32 bit counter.
+_TICK_MASK = 0xFFFFFFFF
+
+
+class EdgeQueue(object):
+    """Preallocated single producer, single consumer queue of gpio edges.
+
+    The producer, e.x. the callback thread of pigpio, only stores the level
+    and the tick of an edge in two preallocated arrays and moves the tail
+    index, it never takes a lock and never runs user code, so a slow consumer
+    can't delay the edges of other pins. Edges closer than bounce
+    microseconds to the last queued edge are dropped, comparing the ticks
+    with wrap around. When the queue is full new edges are dropped and
+    counted as overflows.
+
+    The consumer drains the queue from one thread or asyncio task, see
+    :meth:`drain`, :meth:`wait` and :meth:`wait_async`, or polls it.
+
+    Args:
+        capacity (int): The max number of waiting edges. Defaults to
+            :data:`256`.
+        bounce (int): The debounce time in microseconds. Defaults to
+            :data:`0`.
+        gpio (bool): Store the bcm numbers too, for queues of many pins like
+            the :class:`EdgeRecorder`. Defaults to :data:`False`.
+    """
+
+    def __init__(self, capacity=256, bounce=0, gpio=False):
+        """Constructor"""
+
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Invalid capacity, should be a positive integer.")
+
+        self._capacity = capacity
+        self._gpios = array('B', bytes(capacity)) if gpio else None
+        self._levels = array('B', bytes(capacity))
+        self._ticks = array('I', [0]) * capacity
+        self._head = 0          # Edges taken by the consumer
+        self._tail = 0          # Edges stored by the producer
+        self._last = None       # Tick of the last queued edge
+        self.bounce = bounce
+
+        self._waiting = False
+        self._wake = threading.Event()
+        self._loop = None
+        self._async_wake = None
+        self._closed = False
+
+        self.pushed = 0
+        self.debounced = 0
+        self.overflows = 0
+        self.max_depth = 0
+
+    @property
+    def capacity(self):
+        """The max number of waiting edges."""
+        return self._capacity
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def push(self, gpio, level, tick):
+        """Queue an edge, it has the signature of the pigpio callbacks.
+
+        Args:
+            gpio (int): The bcm number, stored only by queues created with
+                gpio.
+            level (int): The level after the edge.
+            tick (int): The pigpio tick of the edge in microseconds.
+        """
+
+        last = self._last
+        if last is not None and (tick - last) & _TICK_MASK < self.bounce:
+            self.debounced += 1
+            return
+
+        tail = self._tail
+        depth = tail - self._head
+        if depth >= self._capacity:
+            self.overflows += 1
+            return
+
+        self._last = tick
+        index = tail % self._capacity
+        if self._gpios is not None:
+            self._gpios[index] = gpio
+        self._levels[index] = level
+        self._ticks[index] = tick & _TICK_MASK
+        self._tail = tail + 1
+        self.pushed += 1
+        if depth >= self.max_depth:
+            self.max_depth = depth + 1
+        if self._waiting:
+            self._notify()
+
+    def drain(self, max_edges=None):
+        """Take the waiting edges.
+
+        Args:
+            max_edges (int): The max number of edges. Defaults to all.
+
+        Returns:
+            list: (level, tick) tuples, oldest first.
+        """
+
+        _, levels, ticks = self._take(max_edges)
+        return list(zip(levels, ticks))
+
+    def _take(self, max_edges=None):
+        """Take the waiting edges as copies of the columns of the ring.
+
+        Args:
+            max_edges (int): The max number of edges. Defaults to all.
+
+        Returns:
+            list: The gpio, level and tick arrays, oldest first. The gpio is
+            None if the queue doesn't store it.
+        """
+
+        head = self._head
+        tail = self._tail
+        if max_edges is not None:
+            tail = min(tail, head + max_edges)
+
+        # At most two slices, before and after the end of the ring.
+        capacity = self._capacity
+        start = head % capacity
+        end = start + tail - head
+        columns = []
+        for column in (self._gpios, self._levels, self._ticks):
+            if column is None:
+                columns.append(None)
+            elif end <= capacity:
+                columns.append(column[start:end])
+            else:
+                columns.append(column[start:] + column[:end - capacity])
+        self._head = tail
+
+        return columns
+
+    def wait(self, timeout=None):
+        """Wait for an edge.
+
+        Args:
+            timeout (float): Max seconds to wait, None waits forever.
+
+        Returns:
+            bool: If there are waiting edges, False after a timeout or when
+            the queue is closed and empty.
+        """
+
+        if self._tail == self._head and not self._closed:
+            self._wake.clear()
+            self._waiting = True
+            # The producer checks the flag after it moves the tail.
+            if self._tail == self._head and not self._closed:
+                self._wake.wait(timeout)
+            self._waiting = False
+
+        return self._tail != self._head
+
+    async def wait_async(self):
+        """Wait for an edge from an asyncio task.
+
+        Returns:
+            bool: If there are waiting edges, False when the queue is closed
+            and empty.
+        """
+
+        import asyncio
+
+        if self._tail == self._head and not self._closed:
+            self._async_wake = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._waiting = True
+            if self._tail == self._head and not self._closed:
+                await self._async_wake.wait()
+            self._waiting = False
+            self._loop = None
+
+        return self._tail != self._head
+
+    def _notify(self):
+        self._wake.set()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._async_wake.set)
+
+    def statistics(self):
+        """Counters of the queue.
+
+        Returns:
+            dict: The queued, debounced and overflowed edges, the current and
+            the max number of waiting edges.
+        """
+
+        return {"pushed": self.pushed,
+                "debounced": self.debounced,
+                "overflows": self.overflows,
+                "depth": self._tail - self._head,
+                "max_depth": self.max_depth}
+
+    def close(self):
+        """Wake the consumer, the waits return False once it is empty."""
+
+        self._closed = True
+        self._notify()
@@ -0,0 +1,189 @@
+"""edge_recorder.py"""
+
+import struct
+import time
+from array import array
+from collections import namedtuple
+from .edge_queue import EdgeQueue, _TICK_MASK
+
+# Magic, format version and number of edges of a saved recording.
+_HEADER = struct.Struct("<8sHI")
+_MAGIC = b"PDEDGES\x00"
+_VERSION = 1
+
+
+def tick_us():
+    """Microsecond tick from the monotonic clock, wrapping like pigpio's.
+
+    Used by the gpio libraries without hardware timestamps.
+    """
+    return int(time.perf_counter() * 1000000) & _TICK_MASK
+
+
+class EdgeBatch(namedtuple("EdgeBatch", ["gpio", "level", "tick"])):
+    """Edges read from an :class:`EdgeRecorder`, three equal length
+    :class:`array.array` columns, the bcm numbers and the levels as bytes and
+    the microsecond ticks as unsigned ints.
+    """
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.tick)
+
+    def to_numpy(self):
+        """The batch as a numpy structured array.
+
+        Returns:
+            numpy.ndarray: With the fields gpio (u1), level (u1) and tick
+            (u4).
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+
+        # Imported here, numpy is heavy and optional.
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("failed to import numpy")
+
+        edges = numpy.empty(len(self), dtype=[("gpio", "u1"), ("level", "u1"),
+                                              ("tick", "u4")])
+        edges["gpio"] = numpy.frombuffer(self.gpio, dtype="u1")
+        edges["level"] = numpy.frombuffer(self.level, dtype="u1")
+        edges["tick"] = numpy.frombuffer(self.tick, dtype=self.tick.typecode)
+
+        return edges
+
+    def save(self, path):
+        """Write the batch to a binary file, see :meth:`load`.
+
+        Args:
+            path (str): The file path.
+        """
+
+        ticks = array('I', self.tick) if self.tick.typecode != 'I' \
+            else self.tick
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self)))
+            self.gpio.tofile(f)
+            self.level.tofile(f)
+            ticks.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a batch written by :meth:`save`.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            :class:`EdgeBatch`
+
+        Raises:
+            ValueError: The file isn't a saved batch.
+        """
+
+        with open(path, "rb") as f:
+            magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Not an edge recording: {}".format(path))
+            gpio, level, tick = array('B'), array('B'), array('I')
+            gpio.fromfile(f, count)
+            level.fromfile(f, count)
+            tick.fromfile(f, count)
+
+        return cls(gpio, level, tick)
+
+
+class EdgeRecorder(EdgeQueue):
+    """Capture of the edges of many gpio pins with microsecond ticks.
+
+    The gpio library thread calls :meth:`record` for every edge, it only
+    stores the bcm number, the level and the tick in the preallocated ring
+    of an :class:`EdgeQueue`, without locks or allocations, so it keeps up
+    with edges at tens of kHz as long as the library delivers them. With
+    pigpio the ticks come from the daemon and have microsecond accuracy,
+    other libraries stamp the edges with :func:`tick_us` when their callback
+    runs. When the ring is full new edges are dropped and counted.
+
+    The edges are consumed in batches with :meth:`read` or :meth:`stream`
+    by one consumer, e.x. a driver or a diagnostic tool, and exported with
+    :meth:`EdgeBatch.to_numpy` or :meth:`EdgeBatch.save`. Recorders are
+    created with the record_edges method of the gpio implementations.
+
+    Args:
+        capacity (int): The max number of edges waiting in the ring.
+            Defaults to :data:`65536`.
+    """
+
+    def __init__(self, capacity=65536):
+        """Constructor"""
+
+        super(EdgeRecorder, self).__init__(capacity, gpio=True)
+        self._cancels = []
+
+    @property
+    def closed(self):
+        """If the recording stopped."""
+        return self._closed
+
+    @property
+    def recorded(self):
+        """The number of recorded edges."""
+        return self.pushed
+
+    # Store an edge, record(gpio, level, tick) with the signature of the
+    # pigpio callbacks. Without bounce nothing is dropped but overflows.
+    record = EdgeQueue.push
+
+    def read(self, max_edges=None):
+        """Take the waiting edges.
+
+        Args:
+            max_edges (int): The max number of edges. Defaults to all.
+
+        Returns:
+            :class:`EdgeBatch`: The edges, oldest first.
+        """
+
+        return EdgeBatch(*self._take(max_edges))
+
+    def stream(self, batch_size=1024, timeout=None):
+        """Iterate over the edges in batches until the recording stops.
+
+        Args:
+            batch_size (int): The max edges of a batch. Defaults to
+                :data:`1024`.
+            timeout (float): Max seconds to wait for an edge, the iteration
+                ends after it. None waits until :meth:`close`.
+
+        Yields:
+            :class:`EdgeBatch`
+        """
+
+        while self.wait(timeout):
+            yield self.read(batch_size)
+
+    def statistics(self):
+        """The recorded and dropped edges and the waiting ones."""
+
+        return {"recorded": self.pushed,
+                "overflows": self.overflows,
+                "depth": self._tail - self._head}
+
+    def on_close(self, function):
+        """Call function when the recording stops, used by the gpio
+        implementations to remove their callbacks."""
+        self._cancels.append(function)
+
+    def close(self):
+        """Stop the recording, the edges already recorded can still be read."""
+
+        if self._closed:
+            return
+        for cancel in self._cancels:
+            cancel()
+        del self._cancels[:]
+        super(EdgeRecorder, self).close()
@@ -51,3 +51,12 @@ class NotModZero(PidevicesError):
 class OutOfRange(PidevicesError):
     """Error when a distance sensor returns a measurment out of it's range."""
     pass
+
+
+class ReplayError(PidevicesError):
+    """Error when the calls of a replayed interface don't match the trace."""
+
+
+class StalePinHandle(PidevicesError):
+    """Error when a pin handle is used after its pin changed or was removed."""
+    pass
@@ -1,7 +1,41 @@
-"""Import all hardware interfaces"""
+"""Import all hardware interfaces
 
-from .gpio_implementations import *
-from .hardware_interfaces import *
-from .hpwm_implementations import *
-from .i2c_implementations import *
-from .spi_implementations import *
+The implementation modules are imported lazily, so the libraries of unused
+interfaces are never imported.
+"""
+
+from ..lazy_import import lazy_attributes
+
+_EXPORTS = {
+    'PiGPIO': '.gpio_implementations',
+    'RPiGPIO': '.gpio_implementations',
+    'Mcp23x17GPIO': '.gpio_implementations',
+    'Mcp23017GPIO': '.gpio_implementations',
+    'SimGPIO': '.gpio_implementations',
+    'Timers': '.gpio_implementations',
+    'HardwareInterface': '.hardware_interfaces',
+    'GPIOPin': '.hardware_interfaces',
+    'GPIO': '.hardware_interfaces',
+    'PinHandle': '.hardware_interfaces',
+    'SPI': '.hardware_interfaces',
+    'HPWM': '.hardware_interfaces',
+    'I2C': '.hardware_interfaces',
+    'I2CTransaction': '.hardware_interfaces',
+    'HPWMPeriphery': '.hpwm_implementations',
+    'SimHPWM': '.hpwm_implementations',
+    'SMBus2': '.i2c_implementations',
+    'SimI2C': '.i2c_implementations',
+    'SPIimplementation': '.spi_implementations',
+    'SimSPI': '.spi_implementations',
+    'BusLatency': '.sim_devices',
+    'SimBus': '.sim_devices',
+    'TraceWriter': '.trace',
+    'TraceReader': '.trace',
+    'Replay': '.trace',
+    'BusPool': '.bus_pool',
+    'BusArbiter': '.bus_arbiter',
+    'BusClient': '.bus_arbiter',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPORTS)
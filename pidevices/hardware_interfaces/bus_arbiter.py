@@ -0,0 +1,171 @@
+"""bus_arbiter.py"""
+
+import heapq
+import itertools
+import threading
+import time
+from ..stats import RunningStats
+
+
+class BusArbiter(object):
+    """Priority arbitration of a bus between threads.
+
+    Only one thread uses the bus at a time. When the bus is released it is
+    handed to the waiting thread with the highest priority, threads with the
+    same priority get it in arrival order. So a high priority device, like
+    an imu, waits at most one transaction of a lower priority device and
+    never a whole burst of them.
+
+    The bus is held by a :class:`BusClient`, that is a context manager
+    carrying the priority and the name of a device. The arbiter is reentrant
+    for the thread that holds it, so a client can wrap several single
+    transactions in one atomic block.
+
+    For every client name the arbiter keeps statistics of the time spent
+    waiting for the bus and the time holding it.
+    """
+
+    def __init__(self):
+        """Constructor"""
+
+        self._mutex = threading.Lock()
+        self._owner = None      # Thread ident that holds the bus
+        self._depth = 0
+        self._hold_start = 0
+        self._hold_name = None
+        self._waiters = []      # Heap of (-priority, seq, lock, ident)
+        self._seq = itertools.count()
+        self._wait_stats = {}
+        self._hold_stats = {}
+
+    def client(self, priority=0, name=None):
+        """Create a client of the bus.
+
+        Args:
+            priority (int): Higher values get the bus first. Defaults to 0.
+            name (str): Name for the statistics. Defaults to None.
+
+        Returns:
+            :class:`BusClient`
+        """
+
+        return BusClient(self, priority, name)
+
+    def acquire(self, priority=0, name=None):
+        """Acquire the bus, blocking until it is granted.
+
+        Args:
+            priority (int): The priority of the request.
+            name (str): Name for the statistics.
+        """
+
+        me = threading.get_ident()
+        with self._mutex:
+            if self._owner == me:
+                self._depth += 1
+                return
+
+            if self._owner is None and not self._waiters:
+                self._grant(me, name)
+                self._stats(self._wait_stats, name).add(0.0)
+                return
+
+            t_s = time.monotonic()
+            waiter = threading.Lock()
+            waiter.acquire()
+            heapq.heappush(self._waiters,
+                           (-priority, next(self._seq), waiter, me, name))
+
+        # The releasing thread grants the bus and then unlocks the waiter.
+        waiter.acquire()
+        with self._mutex:
+            self._stats(self._wait_stats, name).add(time.monotonic() - t_s)
+
+    def release(self):
+        """Release the bus, handing it to the highest priority waiter."""
+
+        with self._mutex:
+            self._depth -= 1
+            if self._depth:
+                return
+
+            self._stats(self._hold_stats, self._hold_name).add(
+                time.monotonic() - self._hold_start)
+
+            if self._waiters:
+                _, _, waiter, ident, name = heapq.heappop(self._waiters)
+                self._grant(ident, name)
+                waiter.release()
+            else:
+                self._owner = None
+
+    @property
+    def waiting(self):
+        """Number of threads waiting for the bus."""
+        return len(self._waiters)
+
+    def statistics(self):
+        """Wait and hold time statistics in seconds per client name.
+
+        Returns:
+            dict: In the form {name: {"wait": {...}, "hold": {...}}} where
+            the inner dictionaries come from :meth:`RunningStats.as_dict`.
+        """
+
+        with self._mutex:
+            names = set(self._wait_stats) | set(self._hold_stats)
+            return {name: {"wait": self._stats(self._wait_stats, name).as_dict(),
+                           "hold": self._stats(self._hold_stats, name).as_dict()}
+                    for name in names}
+
+    def reset_statistics(self):
+        """Clear the statistics."""
+
+        with self._mutex:
+            self._wait_stats.clear()
+            self._hold_stats.clear()
+
+    def _grant(self, ident, name):
+        self._owner = ident
+        self._depth = 1
+        self._hold_name = name
+        self._hold_start = time.monotonic()
+
+    def _stats(self, stats, name):
+        if name not in stats:
+            stats[name] = RunningStats()
+        return stats[name]
+
+
+class BusClient(object):
+    """A device's access to an arbitrated bus.
+
+    It is used as a context manager, the block holds the bus.
+
+    Args:
+        arbiter (BusArbiter): The arbiter of the bus.
+        priority (int): The priority of the device.
+        name (str): The name of the device for the statistics.
+    """
+
+    __slots__ = ("_arbiter", "priority", "name")
+
+    def __init__(self, arbiter, priority=0, name=None):
+        """Constructor"""
+
+        self._arbiter = arbiter
+        self.priority = priority
+        self.name = name
+
+    @property
+    def arbiter(self):
+        """The :class:`BusArbiter` of the bus."""
+        return self._arbiter
+
+    def __enter__(self):
+        self._arbiter.acquire(self.priority, self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self._arbiter.release()
+        return False
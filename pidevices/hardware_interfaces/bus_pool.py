@@ -0,0 +1,133 @@
+"""bus_pool.py"""
+
+import copy
+import threading
+from .bus_arbiter import BusArbiter
+
+
+class BusPool(object):
+    """Process wide pool of shared bus connections.
+
+    Devices on the same bus share one connection, for example every i2c device
+    on bus 1 uses the same /dev/i2c-1 file descriptor. The first
+    :meth:`acquire` for a key creates the implementation object and every
+    call returns a new handle, a shallow copy of it. So the handles share the
+    underlying library object and the bus arbiter but each device can keep
+    its own attributes on its handle. The connection is closed when the last
+    handle is released.
+
+    The pool owns a :class:`BusArbiter` per connection and every handle gets
+    its own :class:`BusClient` of it as its lock, so the priority of a device
+    is set on its handle's lock.
+
+    The key of a connection is the interface, the implementation and its
+    constructor arguments e.x. ("I2C", "SMBus2", bus=1) or
+    ("SPI", "SPIimplementation", port=0, device=1).
+    """
+
+    class _Entry:
+        """A pooled connection with its reference count."""
+
+        def __init__(self, master):
+            self.master = master
+            self.arbiter = BusArbiter()
+            self.refs = 0
+
+    _mutex = threading.Lock()
+    _entries = {}
+
+    @classmethod
+    def acquire(cls, interface, impl, **kwargs):
+        """Get a handle to a shared connection, creating it if needed.
+
+        Args:
+            interface (str): The interface name e.x. I2C or SPI.
+            impl: The implementation class.
+            **kwargs: Keyword arguments for the constructor of impl. They
+                identify the connection.
+
+        Returns:
+            A handle of type impl.
+        """
+
+        key = cls._key(interface, impl, kwargs)
+        with cls._mutex:
+            entry = cls._entries.get(key)
+            if entry is None:
+                entry = cls._Entry(impl(**kwargs))
+                cls._entries[key] = entry
+
+            handle = copy.copy(entry.master)
+            handle._lock = entry.arbiter.client(name=impl.__name__)
+            handle._pool_key = key
+            handle._pool_released = False
+            entry.refs += 1
+
+        return handle
+
+    @classmethod
+    def release(cls, handle):
+        """Release a handle.
+
+        Args:
+            handle: A handle from :meth:`acquire` or an implementation
+                object that doesn't belong to the pool.
+
+        Returns:
+            bool: True if the caller should free the hardware resources, that
+            is when the last handle of a connection is released or the object
+            is not pooled.
+        """
+
+        key = getattr(handle, "_pool_key", None)
+        if key is None:
+            return True
+
+        with cls._mutex:
+            if handle._pool_released:
+                return False
+            handle._pool_released = True
+
+            entry = cls._entries[key]
+            entry.refs -= 1
+            if entry.refs > 0:
+                return False
+
+            del cls._entries[key]
+            return True
+
+    @classmethod
+    def references(cls, interface, impl, **kwargs):
+        """Number of handles in use of a connection.
+
+        Args:
+            interface (str): The interface name.
+            impl: The implementation class.
+            **kwargs: The constructor arguments of the connection.
+
+        Returns:
+            int: The reference count, 0 if there isn't such connection.
+        """
+
+        with cls._mutex:
+            entry = cls._entries.get(cls._key(interface, impl, kwargs))
+            return entry.refs if entry is not None else 0
+
+    @classmethod
+    def statistics(cls):
+        """Bus usage statistics of every connection in the pool.
+
+        Returns:
+            dict: Maps the key of every connection to the
+            :meth:`BusArbiter.statistics` of its arbiter.
+        """
+
+        with cls._mutex:
+            arbiters = {key: entry.arbiter
+                        for key, entry in cls._entries.items()}
+
+        return {key: arbiter.statistics() for key, arbiter in arbiters.items()}
+
+    @staticmethod
+    def _key(interface, impl, kwargs):
+        return (interface.upper(), impl.__name__, tuple(sorted(kwargs.items())))
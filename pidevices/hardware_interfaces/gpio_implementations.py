@@ -2,9 +2,14 @@
 
 from .hardware_interfaces import GPIO, GPIOPin
 from ..exceptions import NotInputPin, NotOutputPin, NotPwmPin
+from ..soft_pwm import SoftPWM
+from ..edge_queue import EdgeQueue
+from ..edge_recorder import EdgeRecorder, tick_us
 import threading 
 import time
+import traceback
 from collections import namedtuple
+from functools import partial
 
 try:
     import RPi.GPIO as RPIGPIO
@@ -23,32 +28,37 @@ except ImportError:
 
 
 class PiGPIO(GPIO):
-    PIGPIO_FUNCTIONS = {
-        'input': PIGPIO.INPUT,
-        'output': PIGPIO.OUTPUT,
-        'alt_0': PIGPIO.ALT0,
-        'alt_1': PIGPIO.ALT1,
-        'alt_2': PIGPIO.ALT2,
-        'alt_3': PIGPIO.ALT3,
-        'alt_4': PIGPIO.ALT4,
-        'alt_5': PIGPIO.ALT5
-    }
-
-    PIGPIO_PULLS = {
-        'up': PIGPIO.PUD_UP,
-        'dowm': PIGPIO.PUD_DOWN,
-        'floating': PIGPIO.PUD_OFF
-    }
-
-    PIGPIO_EDGES = {
-        'rising': PIGPIO.RISING_EDGE,
-        'falling': PIGPIO.FALLING_EDGE,
-        'both': PIGPIO.EITHER_EDGE
-    }
+    # The constants of the library, the module imports without it.
+    if PIGPIO is not None:
+        PIGPIO_FUNCTIONS = {
+            'input': PIGPIO.INPUT,
+            'output': PIGPIO.OUTPUT,
+            'alt_0': PIGPIO.ALT0,
+            'alt_1': PIGPIO.ALT1,
+            'alt_2': PIGPIO.ALT2,
+            'alt_3': PIGPIO.ALT3,
+            'alt_4': PIGPIO.ALT4,
+            'alt_5': PIGPIO.ALT5
+        }
+
+        PIGPIO_PULLS = {
+            'up': PIGPIO.PUD_UP,
+            'dowm': PIGPIO.PUD_DOWN,
+            'floating': PIGPIO.PUD_OFF
+        }
+
+        PIGPIO_EDGES = {
+            'rising': PIGPIO.RISING_EDGE,
+            'falling': PIGPIO.FALLING_EDGE,
+            'both': PIGPIO.EITHER_EDGE
+        }
 
     PWM_FREQUENCY = 10000
     PWM_RANGE = 1000
 
+    # Edges that wait for the event of a pin before they are dropped.
+    EDGE_QUEUE_SIZE = 256
+
     def __init__(self, **kwargs):
         """Contstructor"""
         if PIGPIO is None:
@@ -63,8 +73,9 @@ class PiGPIO(GPIO):
         if not self.gpio.connected:
             raise ImportError("pigpio not found.")
 
-        self._lock = threading.Lock()
-        
+        self._edges = {}    # pin name: (EdgeQueue, pigpio callback, thread)
+        self._recorders = []
+
     def set_pin_function(self, pin, function):
         if function not in self.PIGPIO_FUNCTIONS:
             raise TypeError("Invalid function name should be input or output or alt_func.")
@@ -91,6 +102,39 @@ class PiGPIO(GPIO):
 
         return self.gpio.read(pin.pin_num)
 
+    def _handle_read(self, name, pin):
+        return partial(self.gpio.read, pin.pin_num)
+
+    def _handle_write(self, name, pin):
+        if pin.pwm:
+            return partial(self.write, name)
+        return partial(self.gpio.write, pin.pin_num)
+
+    def pulse(self, pin, width, level=1):
+        """Send a pulse timed by the pigpio daemon, see :meth:`GPIO.pulse`.
+
+        The call returns after queueing the pulse, its width has the
+        accuracy of the daemon and isn't stretched by python.
+
+        Args:
+            pin (str): The pin's name.
+            width (int): The width of the pulse in microseconds, 1 to 100.
+            level (int): The level of the pulse. Defaults to :data:`1`.
+
+        Raises:
+            NotOutputPin: Try to pulse an input pin.
+        """
+
+        pin = self.pins[pin]
+        if pin.function != 'output':
+            raise NotOutputPin("Can't write to a non output pin.")
+
+        self.gpio.gpio_trigger(pin.pin_num, width, level)
+
+    def tick(self):
+        """The current tick of the pigpio daemon in microseconds."""
+        return self.gpio.get_current_tick()
+
     def write(self, pin, value):
         if isinstance(value, int):
             value = float(value)
@@ -123,6 +167,45 @@ class PiGPIO(GPIO):
         else:
             raise NotOutputPin("Can't write to a non output pin.")
 
+    def read_many(self, pins):
+        """Read many input pins with one read of bank 1, the bcm pins 0-31."""
+
+        nums = []
+        for name in pins:
+            pin = self.pins[name]
+            if pin.function != "input":
+                raise NotInputPin("Can't read from non input pin.")
+            nums.append(pin.pin_num)
+
+        levels = self.gpio.read_bank_1()
+
+        return [(levels >> num) & 1 for num in nums]
+
+    def write_many(self, values):
+        """Write many output pins with one set and one clear of bank 1.
+
+        Pwm pins are written one by one.
+        """
+
+        set_bits = 0
+        clear_bits = 0
+        for name, value in values.items():
+            pin = self.pins[name]
+            if pin.function != 'output':
+                raise NotOutputPin("Can't write to a non output pin.")
+            if pin.pwm:
+                self.write(name, value)
+            elif value == 1:
+                set_bits |= 1 << pin.pin_num
+            elif value == 0:
+                clear_bits |= 1 << pin.pin_num
+            else:
+                raise TypeError("The value should be equal to 0 or 1.")
+
+        if set_bits:
+            self.gpio.set_bank_1(set_bits)
+        if clear_bits:
+            self.gpio.clear_bank_1(clear_bits)
 
     def set_pin_pwm(self, pin, pwm):
         if not isinstance(pwm, bool):
@@ -192,37 +275,146 @@ class PiGPIO(GPIO):
     def set_pin_bounce(self, pin, bounce):
         self.pins[pin].bounce = bounce
 
-    def set_pin_event(self, pin, event, *args):
-        # The function which needs the arguments
+        # The queue of the pin debounces the edges from now on.
+        entry = self._edges.get(pin)
+        if entry is not None:
+            entry[0].bounce = (bounce or 0) * 1000
+
+    def edge_queue(self, pin, capacity=None):
+        """Queue the edges of an input pin for polling or a consumer thread.
+
+        The pigpio callback thread only stores the level and the tick of
+        every edge in the preallocated :class:`EdgeQueue`, debounced with the
+        bounce time of the pin on the pigpio ticks. It replaces the event of
+        the pin.
+
+        Args:
+            pin (str): Pin name.
+            capacity (int): The max number of waiting edges. Defaults to
+                :data:`EDGE_QUEUE_SIZE`.
+
+        Returns:
+            :class:`EdgeQueue`
+
+        Raises:
+            NotInputPin: Try to queue the edges of a non input pin.
+        """
+
+        name = pin
         pin = self.pins[pin]
-        pin.tick = 0
-        
-        def cbf(gpio, level, tick):
-            with self._lock:
-                if pin.bounce is None:
-                    event(gpio, level, tick, *args)
-                else:
-                    if (tick - pin.tick) >= pin.bounce * 1000:
-                        pin.tick = tick
-                        event(gpio, level, tick, *args)
-        
-        if pin.function is 'input':
-            self.gpio.callback(pin.pin_num, pin.edge, cbf)
-            pin.event = event
-        else:
-            # Raise exception output pin
+        if pin.function != 'input':
             raise NotInputPin("Can's set event to a non input pin.")
 
+        self._cancel_edges(name)
+        queue = EdgeQueue(capacity or self.EDGE_QUEUE_SIZE,
+                          bounce=(pin.bounce or 0) * 1000)
+        callback = self.gpio.callback(pin.pin_num, pin.edge, queue.push)
+        self._edges[name] = (queue, callback, None)
+
+        return queue
+
+    def set_pin_event(self, pin, event, *args):
+        """Set the function that will be called with a new edge.
+
+        The edges are queued by :meth:`edge_queue` and every pin has its own
+        thread that calls event(gpio, level, tick, *args), so a slow event
+        delays only the edges of its pin.
+
+        Args:
+            pin (str): Pin name.
+            event (function): The function.
+            *args: The arguments of the function.
+
+        Raises:
+            NotInputPin: Try to set event to a non input pin.
+        """
+
+        queue = self.edge_queue(pin, self.EDGE_QUEUE_SIZE)
+        gpio_pin = self.pins[pin]
+        thread = threading.Thread(target=self._consume_edges,
+                                  args=(queue, event, gpio_pin.pin_num, args),
+                                  name="pigpio-edges-{}".format(
+                                      gpio_pin.pin_num),
+                                  daemon=True)
+        self._edges[pin] = self._edges[pin][:2] + (thread,)
+        thread.start()
+        gpio_pin.event = event
+
+    @staticmethod
+    def _consume_edges(queue, event, gpio, args):
+        while queue.wait():
+            for level, tick in queue.drain():
+                try:
+                    event(gpio, level, tick, *args)
+                except Exception:
+                    traceback.print_exc()
+
+    def edge_statistics(self, pin):
+        """The counters of the edge queue of a pin, see
+        :meth:`EdgeQueue.statistics`."""
+
+        return self._edges[pin][0].statistics()
+
+    def record_edges(self, pins, capacity=65536):
+        """Record both edges of input pins with the pigpio ticks.
+
+        Every pin gets a pigpio callback that stores the bcm number, the
+        level and the microsecond tick of the daemon in the ring of an
+        :class:`EdgeRecorder`, without debouncing and next to the events and
+        the edge queues of the pins. Closing the recorder cancels the
+        callbacks.
+
+        Args:
+            pins (list): Pin names.
+            capacity (int): The max number of edges waiting in the recorder.
+                Defaults to :data:`65536`.
+
+        Returns:
+            :class:`EdgeRecorder`
+
+        Raises:
+            NotInputPin: Try to record the edges of a non input pin.
+        """
+
+        pins = [self.pins[pin] for pin in pins]
+        if any(pin.function != 'input' for pin in pins):
+            raise NotInputPin("Can't record the edges of a non input pin.")
+
+        recorder = EdgeRecorder(capacity)
+        for pin in pins:
+            callback = self.gpio.callback(pin.pin_num, PIGPIO.EITHER_EDGE,
+                                          recorder.record)
+            recorder.on_close(callback.cancel)
+        recorder.on_close(partial(self._recorders.remove, recorder))
+        self._recorders.append(recorder)
+
+        return recorder
+
+    def _cancel_edges(self, pin):
+        """Stop the edge callback and the event thread of a pin."""
+
+        entry = self._edges.pop(pin, None)
+        if entry is None:
+            return
+
+        queue, callback, thread = entry
+        callback.cancel()
+        queue.close()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
     def remove_pins(self, *args):
         for pin in args:
             if self.pins[pin].pwm:
                 self.set_pin_pwm(pin, False)
-            
-            del self.pins[pin]
+            self._cancel_edges(pin)
+            self._forget_pin(pin)
 
     def close(self):
         """Close interface.input"""
 
+        for recorder in list(self._recorders):
+            recorder.close()
         self.remove_pins(*self.pins.keys())
         self.gpio.stop()
 
@@ -237,22 +429,23 @@ class RPiGPIO(GPIO):
     """
 
     # Maybe make them class attributes and with inheritance change the values
-    RPIGPIO_FUNCTIONS = {
-        'input': RPIGPIO.IN,
-        'output': RPIGPIO.OUT
-    }
-
-    RPIGPIO_PULLS = {
-        'up': RPIGPIO.PUD_UP,
-        'down': RPIGPIO.PUD_DOWN,
-        'floating': RPIGPIO.PUD_OFF
-    }
-
-    RPIGPIO_EDGES = {
-        'rising': RPIGPIO.RISING,
-        'falling': RPIGPIO.FALLING,
-        'both': RPIGPIO.BOTH
-    }
+    if RPIGPIO is not None:
+        RPIGPIO_FUNCTIONS = {
+            'input': RPIGPIO.IN,
+            'output': RPIGPIO.OUT
+        }
+
+        RPIGPIO_PULLS = {
+            'up': RPIGPIO.PUD_UP,
+            'down': RPIGPIO.PUD_DOWN,
+            'floating': RPIGPIO.PUD_OFF
+        }
+
+        RPIGPIO_EDGES = {
+            'rising': RPIGPIO.RISING,
+            'falling': RPIGPIO.FALLING,
+            'both': RPIGPIO.BOTH
+        }
 
     def __init__(self, **kwargs):
         """Contstructor"""
@@ -264,6 +457,7 @@ class RPiGPIO(GPIO):
 
         # Specific pwm pin instances of RPi.GPIO library.
         self._pwm_pins = {}
+        self._recorders = []
 
     @property
     def pwm_pins(self):
@@ -283,6 +477,14 @@ class RPiGPIO(GPIO):
 
         return RPIGPIO.input(pin.pin_num)
 
+    def _handle_read(self, name, pin):
+        return partial(RPIGPIO.input, pin.pin_num)
+
+    def _handle_write(self, name, pin):
+        if pin.pwm:
+            return partial(self.write, name)
+        return partial(RPIGPIO.output, pin.pin_num)
+
     def write(self, pin, value):
         if isinstance(value, int):
             value = float(value)
@@ -315,7 +517,7 @@ class RPiGPIO(GPIO):
             if self.pins[pin].pwm:
                 self.set_pin_pwm(pin, False)
             RPIGPIO.cleanup(self.pins[pin].pin_num)
-            del self.pins[pin]
+            self._forget_pin(pin)
 
     def set_pin_function(self, pin, function):
         if function not in self.RPIGPIO_FUNCTIONS:
@@ -405,6 +607,52 @@ class RPiGPIO(GPIO):
             # Raise exception output pin
             raise NotInputPin("Can's set event to a non input pin.")
 
+    def record_edges(self, pins, capacity=65536):
+        """Record the edges of input pins, best effort.
+
+        RPi.GPIO has no timestamps, the edges are stamped with
+        :func:`tick_us` and read their level when its callback thread runs,
+        so the ticks have the latency of the thread and close edges can be
+        missed or recorded with the same level. Pins with an event keep its
+        edge detection and record only its edges, the others detect both
+        edges until the recorder is closed.
+
+        Args:
+            pins (list): Pin names.
+            capacity (int): The max number of edges waiting in the recorder.
+                Defaults to :data:`65536`.
+
+        Returns:
+            :class:`EdgeRecorder`
+
+        Raises:
+            NotInputPin: Try to record the edges of a non input pin.
+        """
+
+        pins = [self.pins[pin] for pin in pins]
+        if any(pin.function != 'input' for pin in pins):
+            raise NotInputPin("Can't record the edges of a non input pin.")
+
+        recorder = EdgeRecorder(capacity)
+
+        def callback(channel):
+            if not recorder.closed:
+                recorder.record(channel, RPIGPIO.input(channel), tick_us())
+
+        for pin in pins:
+            if pin.event is None:
+                RPIGPIO.add_event_detect(pin.pin_num, RPIGPIO.BOTH,
+                                         callback=callback)
+                recorder.on_close(partial(RPIGPIO.remove_event_detect,
+                                          pin.pin_num))
+            else:
+                # RPi.GPIO can't remove a single callback, it stays silent.
+                RPIGPIO.add_event_callback(pin.pin_num, callback)
+        recorder.on_close(partial(self._recorders.remove, recorder))
+        self._recorders.append(recorder)
+
+        return recorder
+
     def wait_pin_for_edge(self, pin, timeout=None):
         """Wait pin for an edge detection.
 
@@ -425,9 +673,296 @@ class RPiGPIO(GPIO):
     def close(self):
         """Close interface.input"""
 
+        for recorder in list(self._recorders):
+            recorder.close()
         self.remove_pins(*self.pins.keys())
 
 
+class SimGPIO(GPIO):
+    """Simulated gpio pins with the behavior of :class:`RPiGPIO`, extends
+    :class:`GPIO`.
+
+    The levels of the bcm pins are shared by every instance of the process,
+    an output pin drives the inputs on the same number and signals from
+    outside are applied with :meth:`set_level`. Edge events call their
+    function in the thread that changed the level, after the bounce time in
+    ms like RPi.GPIO.
+    """
+
+    SIM_FUNCTIONS = ('input', 'output')
+    SIM_PULLS = {'up': 1, 'down': 0, 'floating': 0}
+    SIM_EDGES = ('rising', 'falling', 'both')
+
+    _levels = {}        # bcm number: level driven by an output or set_level
+    _instances = []
+    _condition = threading.Condition(threading.RLock())
+
+    def __init__(self, **kwargs):
+        """Constructor"""
+
+        super(SimGPIO, self).__init__(**kwargs)
+        self.initialize()
+
+    def initialize(self):
+        self._event_args = {}
+        self._recorders = []    # (bcm numbers, EdgeRecorder)
+        with self._condition:
+            self._instances.append(self)
+
+    @classmethod
+    def set_level(cls, pin_num, level, tick=None):
+        """Drive a bcm pin from outside, triggering the edge events.
+
+        Args:
+            pin_num (int): The bcm number.
+            level (int): 0 or 1, None removes the signal and the pin
+                follows its pull resistor.
+            tick (int): The tick of the edge for the edge recorders, like
+                the tick of a pigpio callback. Defaults to :func:`tick_us`.
+        """
+
+        with cls._condition:
+            before = {gpio: gpio._level(pin_num) for gpio in cls._instances}
+            if level is None:
+                cls._levels.pop(pin_num, None)
+            else:
+                cls._levels[pin_num] = int(bool(level))
+
+            for gpio, previous in before.items():
+                gpio._edge(pin_num, previous, tick)
+            cls._condition.notify_all()
+
+    @classmethod
+    def get_level(cls, pin_num):
+        """The level driven on a bcm pin or None."""
+        return cls._levels.get(pin_num)
+
+    @classmethod
+    def reset(cls):
+        """Forget every level and instance."""
+
+        with cls._condition:
+            cls._levels.clear()
+            del cls._instances[:]
+
+    def _level(self, pin_num):
+        """The level this instance reads on a bcm pin."""
+
+        level = self._levels.get(pin_num)
+        if level is not None:
+            return level
+        for pin in self.pins.values():
+            if pin.pin_num == pin_num and pin.pull is not None:
+                return self.SIM_PULLS[pin.pull]
+
+        return 0
+
+    def _edge(self, pin_num, previous, tick=None):
+        """Call the event of the input pins of pin_num on an edge."""
+
+        level = self._level(pin_num)
+        if level == previous:
+            return
+
+        if self._recorders:
+            if tick is None:
+                tick = tick_us()
+            for pin_nums, recorder in self._recorders:
+                if pin_num in pin_nums:
+                    recorder.record(pin_num, level, tick)
+
+        edge = "rising" if level else "falling"
+        now = time.time()
+        for name, pin in list(self.pins.items()):
+            if pin.pin_num != pin_num or pin.function != 'input' or\
+                    pin.event is None or pin.edge not in (edge, 'both'):
+                continue
+            if pin.bounce is not None and pin.tick is not None and\
+                    (now - pin.tick) * 1000 < pin.bounce:
+                continue
+            pin.tick = now
+            pin.event(*self._event_args.get(name, ()))
+
+    def read(self, pin):
+        pin = self.pins[pin]
+        if pin.function != "input":
+            raise NotInputPin("Can't read from non input pin.")
+
+        with self._condition:
+            return self._level(pin.pin_num)
+
+    def _handle_read(self, name, pin):
+        condition = self._condition
+        level = partial(self._level, pin.pin_num)
+
+        def read():
+            with condition:
+                return level()
+
+        return read
+
+    def _handle_write(self, name, pin):
+        if pin.pwm:
+            return partial(self.write, name)
+        return partial(self.set_level, pin.pin_num)
+
+    def write(self, pin, value):
+        if isinstance(value, int):
+            value = float(value)
+
+        if not isinstance(value, float):
+            raise TypeError("Invalid value type, should be float or int.")
+
+        if value < 0:
+            raise TypeError("The value should be positive.")
+
+        if value > 1:
+            raise TypeError("The value should be less or equal than 1.")
+
+        pin = self.pins[pin]
+        if pin.function != 'output':
+            raise NotOutputPin("Can't write to a non output pin.")
+
+        if pin.pwm:
+            pin.duty_cycle = value
+        else:
+            self.set_level(pin.pin_num, int(round(value)))
+
+    def remove_pins(self, *args):
+        for pin in args:
+            self._event_args.pop(pin, None)
+            self._forget_pin(pin)
+
+    def set_pin_function(self, pin, function):
+        if function not in self.SIM_FUNCTIONS:
+            raise TypeError("Invalid function name should be input or output.")
+
+        self.pins[pin].function = function
+
+    def set_pin_pull(self, pin, pull):
+        if pull not in self.SIM_PULLS:
+            raise TypeError("Invalid pull name, should be up, dowm or floating.")
+
+        pin = self.pins[pin]
+        if pin.function == 'input':
+            pin.pull = pull
+        else:
+            raise NotInputPin("Can't set pull up resistor to a non input pin.")
+
+    def set_pin_pwm(self, pin, pwm):
+        if not isinstance(pwm, bool):
+            raise TypeError("Invalid pwm type, should be boolean.")
+
+        pin = self.pins[pin]
+        if pin.function != 'output':
+            raise NotOutputPin("Can't set pwm to a non output pin.")
+
+        if not pin.pwm and pwm:
+            pin.frequency = 1
+            pin.duty_cycle = 0
+        elif pin.pwm and not pwm:
+            pin.frequency = None
+            pin.duty_cycle = None
+
+        pin.pwm = pwm
+
+    def set_pin_frequency(self, pin, frequency):
+        pin = self.pins[pin]
+        if pin.pwm:
+            pin.frequency = frequency
+        else:
+            raise NotPwmPin("Can't set frequency to a non pwm pin.")
+
+    def set_pin_edge(self, pin, edge):
+        pin = self.pins[pin]
+        if edge not in self.SIM_EDGES:
+            raise TypeError("Wrong edge name, should be rising, falling or both")
+        if pin.function == 'input':
+            pin.edge = edge
+        else:
+            raise NotInputPin("Can't set edge to a non input pin.")
+
+    def set_pin_bounce(self, pin, bounce):
+        self.pins[pin].bounce = bounce
+
+    def set_pin_event(self, pin, event, *args):
+        pin_name = pin
+        pin = self.pins[pin]
+        if pin.function == 'input':
+            self._event_args[pin_name] = args
+            pin.event = event
+        else:
+            raise NotInputPin("Can's set event to a non input pin.")
+
+    def record_edges(self, pins, capacity=65536):
+        """Record both edges of input pins, stamped with :func:`tick_us`
+        in the thread that changed the level.
+
+        Args:
+            pins (list): Pin names.
+            capacity (int): The max number of edges waiting in the recorder.
+                Defaults to :data:`65536`.
+
+        Returns:
+            :class:`EdgeRecorder`
+
+        Raises:
+            NotInputPin: Try to record the edges of a non input pin.
+        """
+
+        pins = [self.pins[pin] for pin in pins]
+        if any(pin.function != 'input' for pin in pins):
+            raise NotInputPin("Can't record the edges of a non input pin.")
+
+        recorder = EdgeRecorder(capacity)
+        entry = (frozenset(pin.pin_num for pin in pins), recorder)
+        with self._condition:
+            self._recorders.append(entry)
+        recorder.on_close(partial(self._stop_recording, entry))
+
+        return recorder
+
+    def _stop_recording(self, entry):
+        with self._condition:
+            self._recorders.remove(entry)
+
+    def wait_pin_for_edge(self, pin, timeout=None):
+        """Wait pin for an edge detection.
+
+        Args:
+            pin (str): Pin name.
+            timeout (int): The time in ms until it stops waiting for an edge
+                signal.
+
+        Returns:
+            bool: True if an edge occured before the timeout.
+        """
+
+        pin = self.pins[pin]
+        if pin.function != 'input':
+            raise NotInputPin("Can's wait for an event to a non input pin.")
+
+        # The levels after each edge
+        levels = {'rising': (1,), 'falling': (0,), 'both': (0, 1)}
+        with self._condition:
+            start = self._level(pin.pin_num)
+            targets = [level for level in levels[pin.edge or 'both']
+                       if level != start]
+            return self._condition.wait_for(
+                lambda: self._level(pin.pin_num) in targets,
+                None if timeout is None else timeout / 1000.0)
+
+    def close(self):
+        """Close interface."""
+
+        for _, recorder in list(self._recorders):
+            recorder.close()
+        self.remove_pins(*list(self.pins.keys()))
+        with self._condition:
+            if self in self._instances:
+                self._instances.remove(self)
+
+
 Timers = namedtuple("Timers", ["t_on", "t_off"])
 
 
@@ -514,9 +1049,8 @@ class Mcp23x17GPIO(GPIO):
         self._int_pins = []
         self.add_pins(**kwargs)
 
-        # Pwm timers
-        self._pwm_timers = {}
-        self._spwm_mutex = threading.Lock()
+        # One thread generates the software pwm of every pin
+        self._soft_pwm = SoftPWM(self._write_pwm_port, name="mcp23x17-pwm")
 
         self.initialize()
 
@@ -542,6 +1076,14 @@ class Mcp23x17GPIO(GPIO):
 
         return self._device.read(self.PIN_NUMBER_MAP[pin.pin_num])
 
+    def _handle_read(self, name, pin):
+        return partial(self._device.read, self.PIN_NUMBER_MAP[pin.pin_num])
+
+    def _handle_write(self, name, pin):
+        if pin.pwm:
+            return partial(self.write, name)
+        return partial(self._device.write, self.PIN_NUMBER_MAP[pin.pin_num])
+
     def write(self, pin, value):
         if isinstance(value, int):
             value = float(value)
@@ -561,8 +1103,7 @@ class Mcp23x17GPIO(GPIO):
         # Check if it is pwm or simple output
         if pin.function is 'output':
             if pin.pwm:
-                self._pwm_timers[pin.pin_num][0] = value * 1/pin.frequency
-                self._pwm_timers[pin.pin_num][1] = (1 - value)* 1/pin.frequency
+                self._soft_pwm.set(pin.pin_num, duty_cycle=value)
                 pin.duty_cycle = value
             else:
                 value = int(round(value))
@@ -570,9 +1111,57 @@ class Mcp23x17GPIO(GPIO):
         else:
             raise NotOutputPin("Can't write to a non output pin.")
 
+    def read_many(self, pins):
+        """Read many input pins with one read of their ports."""
+
+        nums = []
+        ports = 0           # Bit 0 for port A, bit 1 for port B
+        for name in pins:
+            pin = self.pins[name]
+            if pin.function != "input":
+                raise NotInputPin("Can't read from non input pin.")
+            nums.append(pin.pin_num)
+            ports |= 1 << (pin.pin_num >> 3)
+
+        if ports == 3:
+            levels = self._device.read_ports()
+        elif ports:
+            port = ports >> 1
+            levels = self._device.read_port("AB"[port]) << port * 8
+        else:
+            levels = 0
+
+        return [(levels >> num) & 1 for num in nums]
+
+    def write_many(self, values):
+        """Write many output pins with one latch write per port.
+
+        Pwm pins are written one by one.
+        """
+
+        mask = 0
+        bits = 0
+        for name, value in values.items():
+            pin = self.pins[name]
+            if pin.function != 'output':
+                raise NotOutputPin("Can't write to a non output pin.")
+            if pin.pwm:
+                self.write(name, value)
+                continue
+            if not isinstance(value, (int, float)):
+                raise TypeError("Invalid value type, should be float or int.")
+            if value < 0 or value > 1:
+                raise ValueError("The value should be in [0, 1].")
+            mask |= 1 << pin.pin_num
+            if round(value):
+                bits |= 1 << pin.pin_num
+
+        if mask:
+            self._device.write_ports(mask, bits)
+
     def remove_pins(self, *args):
         for pin in args:
-            del self.pins[pin]
+            self._forget_pin(pin)
 
     def set_pin_function(self, pin, function):
         if function not in self.MCP_FUNCTION:
@@ -610,12 +1199,12 @@ class Mcp23x17GPIO(GPIO):
             # The pwm is deactivated and it will be activated.
             pin.frequency = 1
             pin.duty_cycle = 0
-            # Start thread
-            self._pwm_timers[pin.pin_num] = [0, 1/pin.frequency]
-            thread = threading.Thread(target=self._spwm, args=(pin,), daemon=True)
-            thread.start()
+            self._soft_pwm.start(pin.pin_num, pin.pin_num // 8,
+                                 1 << pin.pin_num % 8, pin.frequency,
+                                 pin.duty_cycle)
         elif prev_pwm and not pwm:
             # The pwm is activated and will be deactivated.
+            self._soft_pwm.stop(pin.pin_num)
             pin.frequency = None
             pin.duty_cycle = None
 
@@ -623,21 +1212,38 @@ class Mcp23x17GPIO(GPIO):
         pin_name = pin
         pin = self.pins[pin]
         if pin.pwm:
+            self._soft_pwm.set(pin.pin_num, frequency=frequency)
             pin.frequency = frequency
         else:
             raise NotPwmPin("Can't set frequency to a non pwm pin.")
- 
-    def _spwm(self, pin):
-        """Gen spwm."""
-        while pin.pwm:
-            with self._spwm_mutex:
-                self._device.write(self.PIN_NUMBER_MAP[pin.pin_num], 1)
-            time.sleep(self._pwm_timers[pin.pin_num][0])
-            with self._spwm_mutex:
-                self._device.write(self.PIN_NUMBER_MAP[pin.pin_num], 0)
-            time.sleep(self._pwm_timers[pin.pin_num][1])
-
-        del self._pwm_timers[pin.pin_num]
+
+    def _write_pwm_port(self, port, mask, bits):
+        """Write the pwm pins of a port that change together."""
+        self._device.write_olat_port("AB"[port], mask, bits)
+
+    def pwm_statistics(self, pin=None):
+        """Statistics of the software pwm.
+
+        Args:
+            pin (str): Pin name or None for the totals of all pins.
+
+        Returns:
+            dict: The achieved frequency, missed periods and edge jitter of
+            the pin, or the edges and port writes of all pins, see
+            :meth:`SoftPWM.statistics`.
+
+        Raises:
+            NotPwmPin: The pin isn't a pwm pin.
+        """
+
+        if pin is None:
+            return self._soft_pwm.statistics()
+
+        pin = self.pins[pin]
+        if not pin.pwm:
+            raise NotPwmPin("Can't get statistics of a non pwm pin.")
+
+        return self._soft_pwm.statistics(pin.pin_num)
 
     def set_pin_edge(self, pin, edge):
         pin = self.pins[pin]
@@ -763,6 +1369,7 @@ class Mcp23x17GPIO(GPIO):
             self._device.set_pin_int(self.PIN_NUMBER_MAP[pin.pin_num], 0)
             del self._int_pins[0]
 
+        self._soft_pwm.close()
         self.remove_pins(*self.pins.keys())
         self._device.stop()
 
@@ -775,23 +1382,43 @@ class Mcp23017GPIO(Mcp23x17GPIO):
             module. Defaults to :data:`1`.
         address (int): Optional argument for specifying the i2c address of the 
             mcp23017 module. Defaults to :data:`0x20`.
+        cache_registers (bool): Optional argument for keeping a shadow copy of
+            the chip's configuration registers, see :class:`MCP23017`.
+            Defaults to :data:`False`.
+        int_a (int): Optional bcm pin connected to the INTA output. With it
+            :meth:`start_polling` waits for edges of the interrupt lines
+            instead of polling over i2c, see :meth:`MCP23017.set_int_lines`.
+            Defaults to :data:`None`.
+        int_b (int): Optional bcm pin connected to the INTB output, without
+            it the outputs are mirrored to INTA. Defaults to :data:`None`.
+        int_impl (str): The gpio implementation of the interrupt lines.
+            Defaults to the first installed.
         **kwargs: Could be multiple keyword arguments in the form of
             pin_name = pin_number(pin number is A_x or B_x, because the 
             implementation use the mcp23x17 devices.) For example for the 
             hc-sr04 sonar, it would be echo="A_1", trigger="B_2".
     """
 
-    def __init__(self, bus=1, address=0x20, **kwargs):
+    def __init__(self, bus=1, address=0x20, cache_registers=False,
+                 int_a=None, int_b=None, int_impl=None, **kwargs):
         """Contructor"""
 
         self._bus = bus
         self._address = address
+        self._cache_registers = cache_registers
+        self._int_a = int_a
+        self._int_b = int_b
+        self._int_impl = int_impl
         super(Mcp23017GPIO, self).__init__(**kwargs)
 
     def initialize(self):
         """Initialize hardware and os resources."""
-        self._device = MCP23017(bus=self._bus, address=self._address)
+        self._device = MCP23017(bus=self._bus, address=self._address,
+                                cache_registers=self._cache_registers)
 
         # Configuration for interrupts
         self._device.set_mirror(0)  # Clear the mirror bit for separate interrupts
         self._device.set_intpol(1)  # Set int output to active high.
+        if self._int_a is not None:
+            self._device.set_int_lines(self._int_a, self._int_b,
+                                       self._int_impl)
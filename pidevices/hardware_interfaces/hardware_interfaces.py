@@ -1,6 +1,10 @@
 """hardware_interfaces.py"""
 
-from pidevices.exceptions import InvalidHPWMPin
+import time
+from functools import partial
+from pidevices.edge_recorder import tick_us
+from pidevices.exceptions import (InvalidHPWMPin, NotInputPin, NotOutputPin,
+                                  StalePinHandle)
 # TODO: Check pins global pins availability
 
 
@@ -44,6 +48,7 @@ class GPIOPin(HardwareInterface):
         self._edge = None
         self._bounce = None
         self._tick = None
+        self._handle = None
 
     def _set_pin_num(self, pin_num):
         self._pin_num = pin_num
@@ -56,6 +61,8 @@ class GPIOPin(HardwareInterface):
             """)
 
     def _set_function(self, function):
+        if function != self._function:
+            self.drop_handle()
         self._function = function
 
     def _get_function(self):
@@ -90,6 +97,8 @@ class GPIOPin(HardwareInterface):
             """)
 
     def _set_pwm(self, pwm):
+        if pwm != self._pwm:
+            self.drop_handle()
         self._pwm = pwm
 
     def _get_pwm(self):
@@ -156,6 +165,69 @@ class GPIOPin(HardwareInterface):
             is not support bounce on its own
             """)
 
+    def _set_handle(self, handle):
+        self._handle = handle
+
+    def _get_handle(self):
+        return self._handle
+
+    handle = property(_get_handle, _set_handle, doc="""
+            The :class:`PinHandle` of the pin or None.
+            """)
+
+    def drop_handle(self):
+        """Invalidate the handle of the pin, e.x. when its function changes."""
+
+        if self._handle is not None:
+            self._handle.invalidate()
+            self._handle = None
+
+
+class PinHandle(object):
+    """Fast access to one pin, returned from :meth:`GPIO.handle`.
+
+    The pin and its function are checked when the handle is created, so
+    :attr:`read` and :attr:`write` are the calls of the backend bound to the
+    pin, without the name lookup and the checks of :meth:`GPIO.read` and
+    :meth:`GPIO.write`. For that reason write doesn't check its value, it
+    should be 0 or 1, or the duty cycle for pwm pins. When the function or
+    the pwm of the pin changes or the pin is removed the handle is
+    invalidated and every call raises :class:`StalePinHandle`.
+
+    Args:
+        name (str): The pin name.
+        read: Function without arguments that reads the pin.
+        write: Function with the value that writes the pin.
+    """
+
+    __slots__ = ("name", "read", "write")
+
+    def __init__(self, name, read, write):
+        """Constructor"""
+
+        self.name = name
+        self.read = read
+        self.write = write
+
+    def invalidate(self):
+        """Make every later call raise :class:`StalePinHandle`."""
+
+        def stale(*args):
+            raise StalePinHandle("The pin {} changed, get a new handle."
+                                 .format(self.name))
+
+        self.read = stale
+        self.write = stale
+
+
+def _refuse(error, message):
+    """A handle function for an access the pin doesn't allow."""
+
+    def refuse(*args):
+        raise error(message)
+
+    return refuse
+
 
 # TODO: catch exceptions if the pin for get functions if the pins has not that
 # attribute
@@ -220,6 +292,154 @@ class GPIO(HardwareInterface):
         """
         pass
 
+    def read_many(self, pins):
+        """Read many input pins together.
+
+        Implementations read the pins that share a port or a bank with one
+        access, this one reads them one by one.
+
+        Args:
+            pins (list): The pin names.
+
+        Returns:
+            list: The value of every pin, in the order of pins.
+
+        Raises:
+            NotInputPin: Try to read from non input pin.
+        """
+
+        return [self.read(pin) for pin in pins]
+
+    def write_many(self, values):
+        """Write many output pins together.
+
+        Implementations write the pins that share a port or a bank with one
+        access, this one writes them one by one.
+
+        Args:
+            values (dict): The values with the pin names as keys, see
+                :meth:`write`.
+
+        Raises:
+            TypeError: Try to write an invalid value.
+            NotOutputPin: Try to write to an input pin.
+        """
+
+        for pin, value in values.items():
+            self.write(pin, value)
+
+    def handle(self, pin):
+        """Get a handle with fast read and write of a pin.
+
+        For tight loops, like triggering a sonar or toggling the direction
+        of a motor, the handle skips the checks of every :meth:`read` and
+        :meth:`write`, see :class:`PinHandle`. A pin has one handle at a
+        time, it is invalidated when the function or the pwm of the pin
+        changes.
+
+        Args:
+            pin (str): The pin's name.
+
+        Returns:
+            :class:`PinHandle`: Its read raises :class:`NotInputPin` if the
+            pin isn't an input and its write :class:`NotOutputPin` if it
+            isn't an output.
+        """
+
+        gpio_pin = self.pins[pin]
+        handle = gpio_pin.handle
+        if handle is None:
+            if gpio_pin.function == 'input':
+                read = self._handle_read(pin, gpio_pin)
+            else:
+                read = _refuse(NotInputPin, "Can't read from non input pin.")
+            if gpio_pin.function == 'output':
+                write = self._handle_write(pin, gpio_pin)
+            else:
+                write = _refuse(NotOutputPin,
+                                "Can't write to a non output pin.")
+            handle = gpio_pin.handle = PinHandle(pin, read, write)
+
+        return handle
+
+    def pulse(self, pin, width, level=1):
+        """Send a pulse on an output pin, e.x. the trigger of a sonar.
+
+        Implementations with hardware timed pulses send it in the
+        background, this one writes the level, spins for the width and
+        writes the opposite level.
+
+        Args:
+            pin (str): The pin's name.
+            width (int): The width of the pulse in microseconds.
+            level (int): The level of the pulse. Defaults to :data:`1`.
+
+        Raises:
+            NotOutputPin: Try to pulse an input pin.
+        """
+
+        write = self.handle(pin).write
+        end = time.perf_counter() + width / 1000000.
+        write(level)
+        while time.perf_counter() < end:
+            pass
+        write(1 - level)
+
+    def tick(self):
+        """The current time in the clock of the edge ticks.
+
+        Returns:
+            int: Microseconds in an unsigned 32 bit counter that wraps, the
+            pigpio tick with :class:`PiGPIO` and :func:`tick_us` otherwise.
+        """
+        return tick_us()
+
+    def _handle_read(self, name, pin):
+        """The read function of the handle of an input pin.
+
+        Implementations return the call of their library bound to the pin,
+        this one uses :meth:`read`.
+        """
+        return partial(self.read, name)
+
+    def _handle_write(self, name, pin):
+        """The write function of the handle of an output pin.
+
+        Implementations return the call of their library bound to the pin,
+        this one uses :meth:`write`.
+        """
+        return partial(self.write, name)
+
+    def _forget_pin(self, pin):
+        """Delete a pin from the dictionary, invalidating its handle."""
+        self._pins.pop(pin).drop_handle()
+
+    def read_mask(self, pins):
+        """Read many input pins to a bitmask.
+
+        Args:
+            pins (list): The pin names.
+
+        Returns:
+            int: Bit i is the value of pins[i].
+        """
+
+        mask = 0
+        for i, value in enumerate(self.read_many(pins)):
+            mask |= value << i
+
+        return mask
+
+    def write_mask(self, pins, mask):
+        """Write many output pins from a bitmask.
+
+        Args:
+            pins (list): The pin names.
+            mask (int): Bit i is the value of pins[i].
+        """
+
+        self.write_many({pin: (mask >> i) & 1 for i, pin in enumerate(pins)})
+
     def add_pins(self, **kwargs):
         """Add new pins to the pins dictionary.
 
@@ -637,9 +857,113 @@ class HPWM(HardwareInterface):
                         doc="""Polarity of the pulse.""")
 
 
+class I2CTransaction(object):
+    """Builder of a sequence of i2c register writes and reads.
+
+    The queued operations are sent together by :meth:`execute`, which
+    implementations map to as few bus calls as possible, for example one
+    i2c_rdwr ioctl with many messages.
+
+    Args:
+        i2c (I2C): The i2c interface.
+        address (int): The address of the slave.
+    """
+
+    def __init__(self, i2c, address):
+        """Constructor"""
+
+        self._i2c = i2c
+        self._address = address
+        self._ops = []
+
+    def write(self, register, data):
+        """Queue a write to a register.
+
+        Args:
+            register (int): The address of the register inside the slave.
+            data: A list or a single byte.
+
+        Returns:
+            The transaction, so calls can be chained.
+        """
+
+        data = data if isinstance(data, list) else [data]
+        self._ops.append((register, data, 0))
+
+        return self
+
+    def read(self, register, byte_num=1):
+        """Queue a read of byte_num bytes starting from a register.
+
+        Args:
+            register (int): The address of the register inside the slave.
+            byte_num (int): How many bytes to read.
+
+        Returns:
+            The transaction, so calls can be chained.
+        """
+
+        self._ops.append((register, None, byte_num))
+
+        return self
+
+    def execute(self):
+        """Send the queued operations, holding the bus for all of them.
+
+        Returns:
+            list: A list of byte lists, one per queued read in queue order.
+        """
+
+        ops = self._ops
+        self._ops = []
+
+        return self._i2c._execute(self._address, ops)
+
+    def __len__(self):
+        return len(self._ops)
+
+
 class I2C(HardwareInterface):
     """Abstract base class representing i2c hardware interface."""
 
+    def transaction(self, address):
+        """Start a batch of register writes and reads.
+
+        Args:
+            address (int): The address of the slave.
+
+        Returns:
+            :class:`I2CTransaction`
+        """
+
+        return I2CTransaction(self, address)
+
+    def _execute(self, address, ops):
+        """Execute the operations of a transaction.
+
+        This fallback issues one call per operation, implementations that
+        can send many messages at once override it.
+
+        Args:
+            address (int): The address of the slave.
+            ops (list): Tuples (register, data, byte_num), data is None for
+                reads.
+
+        Returns:
+            list: The results of the reads.
+        """
+
+        results = []
+        for register, data, byte_num in ops:
+            if data is None:
+                res = self.read(address, register, byte_num)
+                results.append(res if isinstance(res, list) else [res])
+            else:
+                self.write(address, register,
+                           data if len(data) > 1 else data[0])
+
+        return results
+
     def _set_bus(self, bus):
         pass
 
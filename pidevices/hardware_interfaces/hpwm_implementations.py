@@ -85,3 +85,64 @@ class HPWMPeriphery(HPWM):
 
     def _set_polarity(self, polarity):
         pass
+
+
+class SimHPWM(HPWM):
+    """Simulated hardware pwm pin, extends :class:`HPWM`.
+
+    The pin keeps its frequency, duty cycle, polarity and enable state, so
+    drivers of pwm actuators run without the pwm chip.
+
+    Args:
+        pin (int): The pin number in bcm mode.
+
+    Raises:
+        InvalidHPWMPin: If the pin isn't a hardware pwm pin.
+    """
+
+    def __init__(self, pin):
+        """Constructor"""
+
+        super(SimHPWM, self).__init__(pin)
+        self.pin = pin
+        self._frequency = 0
+        self._duty_cycle = 0
+        self._enable = 0
+        self._polarity = "normal"
+
+    def read(self):
+        """Read the duty cycle of the pwm pin."""
+        return self.duty_cycle
+
+    def write(self, value):
+        """Set the duty cycle of the pwm pin."""
+        self.duty_cycle = value
+
+    def close(self):
+        self.enable = 0
+
+    def _get_frequency(self):
+        return self._frequency
+
+    def _set_frequency(self, frequency):
+        self._frequency = frequency
+
+    def _get_duty_cycle(self):
+        return self._duty_cycle
+
+    def _set_duty_cycle(self, duty_cycle):
+        if not 0 <= duty_cycle <= 1:
+            raise ValueError("The duty cycle should be between 0 and 1.")
+        self._duty_cycle = duty_cycle
+
+    def _get_enable(self):
+        return self._enable
+
+    def _set_enable(self, enable):
+        self._enable = enable
+
+    def _get_polarity(self):
+        return self._polarity
+
+    def _set_polarity(self, polarity):
+        self._polarity = polarity
@@ -1,15 +1,26 @@
 """i2c_implementations.py"""
 
+import threading
+from ctypes import c_char, string_at
 from .hardware_interfaces import I2C
+from .bus_pool import BusPool
+from .bus_arbiter import BusArbiter
 
 try:
     from smbus2 import SMBus, i2c_msg
 except ImportError:
     SMBus = None
 
+# Flag of a read message in struct i2c_msg
+I2C_M_RD = 0x0001
+
 
 class SMBus2(I2C):
     """Wrapper for smbus2 library extends :class:`I2C`
+
+    Every transaction holds the bus through a :class:`BusArbiter`, so the
+    transactions of devices that share the bus through :class:`BusPool`
+    don't interleave and higher priority devices get the bus first.
     
     Args:
         bus (int): The i2c bus of the raspberry pi. The pi has two buses.
@@ -22,24 +33,44 @@ class SMBus2(I2C):
         if SMBus is None:
             raise ImportError("failed to import smbus2")
         self._smbus = SMBus(bus)
+        self._lock = BusArbiter().client(name=type(self).__name__)
+
+    @property
+    def lock(self):
+        """The :class:`BusClient` of the bus arbiter.
+
+        Every transaction holds it and a device can hold it in a with block
+        to make a sequence of transactions atomic. Its priority and name
+        attributes set the priority of the device on the bus.
+        """
+        return self._lock
 
     def read(self, address, register, byte_num=1):
         """Read using the smbus protocol.
 
+        Reads longer than the 32 bytes of an smbus block read are done with
+        :meth:`readinto`.
+
         Args:
             address: The address of the spi slave
             register: The register's address.
-            byte_num: How many bytes to read from the device. Max 32
+            byte_num: How many bytes to read from the device.
 
         Returns:
             A list with byte_num elements.
         """
         
-        byte_num = min(byte_num, 32)
-        if byte_num > 1:
-            data = self._smbus.read_i2c_block_data(address, register, byte_num)
-        else:
-            data = self._smbus.read_byte_data(address, register)
+        if byte_num > 32:
+            data = bytearray(byte_num)
+            self.readinto(address, register, data)
+            return list(data)
+
+        with self._lock:
+            if byte_num > 1:
+                data = self._smbus.read_i2c_block_data(address, register,
+                                                       byte_num)
+            else:
+                data = self._smbus.read_byte_data(address, register)
 
         return data
 
@@ -56,7 +87,8 @@ class SMBus2(I2C):
         write_func = self._smbus.write_i2c_block_data\
             if isinstance(data, list) else self._smbus.write_byte_data
 
-        write_func(address, register, data)
+        with self._lock:
+            write_func(address, register, data)
     
     def write_i2c(self, address, register, data):
         """Write using the i2c protocol
@@ -68,24 +100,24 @@ class SMBus2(I2C):
         """
         data = data if isinstance(data, list) else [data]
         msg = i2c_msg.write(address, [register] + data)
-        self._smbus.i2c_rdwr(msg)
+        with self._lock:
+            self._smbus.i2c_rdwr(msg)
 
     def read_i2c(self, address, byte_num):
         """Read using the i2c protocol.
 
         Args:
             address: The address of the spi slave
-            byte_num: How many bytes to read from the device. Max 32
+            byte_num: How many bytes to read from the device.
 
         Returns:
             A list with byte_num elements.
         """
 
-        read = i2c_msg.read(address, byte_num)
-        self._smbus.i2c_rdwr(read)
-        res = [ord(read.buf[i]) for i in range(byte_num)]
+        data = bytearray(byte_num)
+        self._rdwr_into(address, None, data)
 
-        return res
+        return list(data)
 
     def read_write(self, address, register, data, byte_num):
         """Combined read and write command using the i2c protocol.
@@ -94,23 +126,311 @@ class SMBus2(I2C):
             address: The address of the spi slave
             register: The address of the register inside the slave.
             data: A list or a single byte, if it is a list max length 32 bytes.
-            byte_num: How many bytes to read from the device. Max 32
+            byte_num: How many bytes to read from the device.
 
         Returns:
             A list with byte_num elements.
         """
 
         data = data if isinstance(data, list) else [data]
-        write = i2c_msg.write(address, [register] + data)
-        read = i2c_msg.read(address, byte_num)
-        
-        self._smbus.i2c_rdwr(write, read)
-        res = [ord(read.buf[i]) for i in range(byte_num)]
+        res = bytearray(byte_num)
+        self._rdwr_into(address, [register] + data, res)
+
+        return list(res)
+
+    def readinto(self, address, register, buffer):
+        """Read bytes starting from a register directly into a buffer.
+
+        The bus driver writes into the memory of the buffer so there is no
+        per byte work in python, which makes it the fast path for long
+        reads like fifo bursts. There isn't a length limit, the read is
+        split in messages of :attr:`_MAX_MSG_LEN` bytes that follow the
+        register write without a stop condition, so the device continues
+        from where the previous message stopped.
+
+        Args:
+            address: The address of the i2c slave.
+            register: The register's address.
+            buffer: A writable and contiguous object that supports the buffer
+                protocol, for example a bytearray, a memoryview or a numpy
+                array. It is filled with its size in bytes.
+
+        Returns:
+            int: The number of bytes read.
+
+        Raises:
+            TypeError: If the buffer is read only or not contiguous.
+        """
+
+        return self._rdwr_into(address, [register], buffer)
+
+    # Max length of one message, the kernel rejects longer ones.
+    _MAX_MSG_LEN = 8192
+
+    def _rdwr_into(self, address, prefix, buffer):
+        """Write prefix, if it isn't None, and read into buffer."""
+
+        view = memoryview(buffer).cast("B")
+        size = view.nbytes
+
+        msgs = [] if prefix is None else [i2c_msg.write(address, prefix)]
+        for offset in range(0, size, self._MAX_MSG_LEN):
+            length = min(self._MAX_MSG_LEN, size - offset)
+            # A ctypes array over the buffer's memory, the message keeps
+            # a reference to it.
+            target = (c_char * length).from_buffer(view, offset)
+            msgs.append(i2c_msg(addr=address, flags=I2C_M_RD,
+                                len=length, buf=target))
+
+        with self._lock:
+            for i in range(0, len(msgs), self._MAX_MSGS):
+                self._smbus.i2c_rdwr(*msgs[i:i + self._MAX_MSGS])
+
+        return size
+
+    # Max number of messages of one i2c_rdwr ioctl, I2C_RDWR_IOCTL_MAX_MSGS.
+    _MAX_MSGS = 42
+
+    def _execute(self, address, ops):
+        """Send a transaction's operations with i2c_rdwr.
+
+        Every write is one message with the register and the data and every
+        read is a register write followed by a read message. The messages go
+        in as few ioctls as possible, holding the bus for all of them.
+        """
+
+        # Group the messages in ioctls, a register write and its read must
+        # stay in the same ioctl to be joined with a repeated start.
+        batches = [[]]
+        reads = []
+        for register, data, byte_num in ops:
+            if data is None:
+                read = i2c_msg.read(address, byte_num)
+                msgs = (i2c_msg.write(address, [register]), read)
+                reads.append(read)
+            else:
+                msgs = (i2c_msg.write(address, [register] + data),)
+
+            if len(batches[-1]) + len(msgs) > self._MAX_MSGS:
+                batches.append([])
+            batches[-1].extend(msgs)
+
+        with self._lock:
+            for batch in batches:
+                if batch:
+                    self._smbus.i2c_rdwr(*batch)
+
+        return [list(string_at(read.buf, read.len)) for read in reads]
+
+    def close(self):
+        """Release the bus, it is closed when no other device uses it."""
+        if BusPool.release(self):
+            self._smbus.close()
+
+    def _set_bus(self, bus):
+        self._bus = bus
+
+    def _get_bus(self):
+        return self._bus
+
+
+class SimI2C(I2C):
+    """Simulated i2c bus with register models of the chips, extends
+    :class:`I2C`.
+
+    It has the interface of :class:`SMBus2`, so every i2c driver runs its
+    real code against the models of :mod:`sim_devices` without hardware.
+    Every bus number is a :class:`SimBus`, shared by all the handles of the
+    process, whose models answer at the default addresses of the mcp23017,
+    pca9685, bme680 and icm-20948. Transfers are counted like the ioctls of
+    :class:`SMBus2` and take the time of the bus latency.
+
+    Args:
+        bus (int): The simulated bus number.
+        latency (BusLatency): Optional latency, it replaces the latency of
+            the bus.
+    """
+
+    _buses = {}
+    _mutex = threading.Lock()
+
+    def __init__(self, bus, latency=None):
+        """Constructor"""
+
+        self.bus = bus
+        if latency is not None:
+            self.sim_bus(bus).latency = latency
+        self._lock = BusArbiter().client(name=type(self).__name__)
+
+    @property
+    def _sim(self):
+        """The :class:`SimBus`, looked up every time so handles see a new
+        bus after :meth:`reset`.
+        """
+
+        sim = self._buses.get(self._bus)
+        return sim if sim is not None else self.sim_bus(self._bus)
+
+    @classmethod
+    def sim_bus(cls, bus):
+        """Get the :class:`SimBus` of a bus number, to attach models, set the
+        latency or read the counters.
+        """
+
+        # The models are imported with the first simulated bus, the real
+        # buses don't load them.
+        from .sim_devices import SimBus, I2C_MODELS
+
+        with cls._mutex:
+            sim = cls._buses.get(bus)
+            if sim is None:
+                sim = SimBus(I2C_MODELS)
+                cls._buses[bus] = sim
+
+        return sim
+
+    @classmethod
+    def reset(cls):
+        """Drop every simulated bus and its models."""
+
+        with cls._mutex:
+            cls._buses.clear()
+
+    @property
+    def lock(self):
+        """The :class:`BusClient` of the bus arbiter, like
+        :attr:`SMBus2.lock`.
+        """
+        return self._lock
+
+    def read(self, address, register, byte_num=1):
+        """Read using the smbus protocol.
+
+        Args:
+            address: The address of the i2c slave.
+            register: The register's address.
+            byte_num: How many bytes to read from the device.
+
+        Returns:
+            A list with byte_num elements or an int if byte_num is 1.
+        """
+
+        with self._lock:
+            data = self._sim.device(address).read(register, byte_num)
+            self._sim.transfer(byte_num + 3)
+
+        return data if byte_num > 1 else data[0]
+
+    def write(self, address, register, data):
+        """Write using the smbus protocol.
+
+        Args:
+            address: The address of the i2c slave.
+            register: The address of the register inside the slave.
+            data: A list or a single byte.
+        """
+
+        data = data if isinstance(data, list) else [data]
+        with self._lock:
+            self._sim.device(address).write(register, data)
+            self._sim.transfer(len(data) + 2)
+
+    write_i2c = write
+
+    def read_i2c(self, address, byte_num):
+        """Read using the i2c protocol, from the register pointer.
+
+        Args:
+            address: The address of the i2c slave.
+            byte_num: How many bytes to read from the device.
+
+        Returns:
+            A list with byte_num elements.
+        """
+
+        with self._lock:
+            data = self._sim.device(address).read(None, byte_num)
+            self._sim.transfer(byte_num + 1)
+
+        return data
+
+    def read_write(self, address, register, data, byte_num):
+        """Combined write and read using the i2c protocol.
+
+        Args:
+            address: The address of the i2c slave.
+            register: The address of the register inside the slave.
+            data: A list or a single byte.
+            byte_num: How many bytes to read from the device.
+
+        Returns:
+            A list with byte_num elements.
+        """
+
+        data = data if isinstance(data, list) else [data]
+        with self._lock:
+            device = self._sim.device(address)
+            device.write(register, data)
+            res = device.read(None, byte_num)
+            self._sim.transfer(len(data) + byte_num + 3)
 
         return res
 
+    def readinto(self, address, register, buffer):
+        """Read bytes starting from a register into a buffer, like
+        :meth:`SMBus2.readinto`.
+
+        Returns:
+            int: The number of bytes read.
+        """
+
+        view = memoryview(buffer).cast("B")
+        if view.readonly:
+            raise TypeError("The buffer is read only.")
+
+        size = view.nbytes
+        with self._lock:
+            view[:] = bytes(self._sim.device(address).read(register, size))
+            msgs = 1 + -(-size // SMBus2._MAX_MSG_LEN)
+            self._sim.transfer(size + msgs + 1,
+                               -(-msgs // SMBus2._MAX_MSGS))
+
+        return size
+
+    def _execute(self, address, ops):
+        """Run a transaction's operations, counted as the ioctls of
+        :meth:`SMBus2._execute`.
+        """
+
+        results = []
+        msgs = 0
+        byte_num = 0
+        transfers = 1
+        with self._lock:
+            device = self._sim.device(address)
+            for register, data, num in ops:
+                if data is None:
+                    results.append(device.read(register, num))
+                    length, count = num + 3, 2
+                else:
+                    device.write(register, data)
+                    length, count = len(data) + 2, 1
+
+                # A write and its read stay in the same ioctl.
+                if msgs + count > SMBus2._MAX_MSGS:
+                    transfers += 1
+                    msgs = 0
+                msgs += count
+                byte_num += length
+
+            if ops:
+                self._sim.transfer(byte_num, transfers)
+
+        return results
+
     def close(self):
-        self._smbus.close()
+        """Release the handle, the simulated bus and its models remain."""
+        BusPool.release(self)
 
     def _set_bus(self, bus):
         self._bus = bus
@@ -0,0 +1,833 @@
+"""sim_devices.py
+
+Register level models of the chips the drivers talk to, used by the
+simulated interfaces :class:`SimI2C` and :class:`SimSPI`. A model keeps the
+registers of its chip and reacts to reads and writes like the chip does, so a
+driver runs its real code path without hardware. Measurements come from
+attributes of the models that tests and benchmarks set.
+"""
+
+import errno
+import struct
+import threading
+import time
+
+
+class BusLatency(object):
+    """Time that a simulated bus transfer takes.
+
+    A transfer, one ioctl of the real implementations, costs a fixed time
+    for the system call and the start condition and a time per byte on the
+    wire. Waits shorter than a couple of milliseconds spin, because sleeping
+    overshoots them.
+
+    Args:
+        per_transfer (float): Seconds per transfer. Defaults to :data:`0`.
+        per_byte (float): Seconds per byte. Defaults to :data:`0`.
+    """
+
+    # Shorter waits spin on the clock instead of sleeping.
+    SPIN_LIMIT = 0.002
+
+    def __init__(self, per_transfer=0.0, per_byte=0.0):
+        """Constructor"""
+
+        self.per_transfer = per_transfer
+        self.per_byte = per_byte
+
+    @classmethod
+    def for_clock(cls, clock, bits_per_byte=9, per_transfer=50e-6):
+        """Latency of a bus with a clock frequency.
+
+        Args:
+            clock (float): The bus clock in Hz, e.x. 100e3 or 400e3 for i2c.
+            bits_per_byte (int): Clock cycles per byte, 9 for i2c with the
+                ack bit and 8 for spi. Defaults to :data:`9`.
+            per_transfer (float): Seconds of overhead per transfer. Defaults
+                to 50us, about an ioctl on a raspberry pi.
+
+        Returns:
+            :class:`BusLatency`
+        """
+
+        return cls(per_transfer, bits_per_byte / float(clock))
+
+    def duration(self, byte_num, transfers=1):
+        """Seconds of transfers of byte_num bytes in total."""
+        return self.per_transfer * transfers + self.per_byte * byte_num
+
+    def wait(self, byte_num, transfers=1):
+        """Block for the duration of transfers of byte_num bytes in total."""
+
+        duration = self.duration(byte_num, transfers)
+        if duration <= 0:
+            return
+        if duration > self.SPIN_LIMIT:
+            time.sleep(duration)
+            return
+
+        # A real transfer releases the GIL, sleep(0) lets other threads run
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            time.sleep(0)
+
+
+class SimBus(object):
+    """A simulated bus with the device models attached to it.
+
+    Models are created on the first access to their address from the
+    factories of the bus, so a bus answers at the default addresses of the
+    supported chips without any setup. Other models are added with
+    :meth:`attach`. The bus counts the transfers and the bytes that went
+    through it.
+
+    Args:
+        factories (dict): Maps addresses to functions that create the model
+            at that address.
+        latency (BusLatency): The time of the transfers. Defaults to no
+            latency.
+    """
+
+    def __init__(self, factories=None, latency=None):
+        """Constructor"""
+
+        self._factories = dict(factories or {})
+        self._devices = {}
+        self._mutex = threading.Lock()
+        self.latency = latency if latency is not None else BusLatency()
+        self.transfers = 0
+        self.bytes = 0
+
+    def attach(self, address, device):
+        """Attach a model to an address, replacing the previous one.
+
+        Returns:
+            The model.
+        """
+
+        with self._mutex:
+            self._devices[address] = device
+
+        return device
+
+    def detach(self, address):
+        """Remove the model of an address, it stops answering."""
+
+        with self._mutex:
+            self._devices.pop(address, None)
+            self._factories.pop(address, None)
+
+    def device(self, address):
+        """Get the model at an address.
+
+        Raises:
+            OSError: If there isn't a model at the address, like a real bus
+                when nothing acknowledges the address.
+        """
+
+        with self._mutex:
+            device = self._devices.get(address)
+            if device is None:
+                factory = self._factories.get(address)
+                if factory is None:
+                    raise OSError(errno.ENXIO, "No device at address "
+                                  "0x{:02X}".format(address))
+                device = factory()
+                self._devices[address] = device
+
+        return device
+
+    def transfer(self, byte_num, count=1):
+        """Account count transfers of byte_num bytes in total and wait.
+
+        Args:
+            byte_num (int): The bytes on the wire, addresses included.
+            count (int): The number of transfers. Defaults to :data:`1`.
+        """
+
+        with self._mutex:
+            self.transfers += count
+            self.bytes += byte_num
+
+        self.latency.wait(byte_num, count)
+
+    def reset_counters(self):
+        """Zero the transfer and byte counters."""
+
+        with self._mutex:
+            self.transfers = 0
+            self.bytes = 0
+
+
+class RegisterFile(object):
+    """Model of a chip with 8 bit registers behind a register pointer.
+
+    Reads and writes of many bytes continue to the next registers. Subclasses
+    override :meth:`read_register` and :meth:`write_register` for registers
+    with side effects and :meth:`next_register` for other pointer rules.
+
+    Args:
+        size (int): The number of registers. Defaults to :data:`256`.
+    """
+
+    # Power on values of the registers, the rest are zero.
+    RESET_VALUES = {}
+
+    def __init__(self, size=256):
+        """Constructor"""
+
+        self.size = size
+        self.registers = bytearray(size)
+        self.pointer = 0
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Set every register to its power on value."""
+
+        with self._lock:
+            self.registers[:] = bytes(self.size)
+            for register, value in self.RESET_VALUES.items():
+                self.registers[register] = value
+
+    def read(self, register, byte_num):
+        """Read bytes starting from a register.
+
+        Args:
+            register (int): The first register, if it is None the read
+                continues from the register pointer.
+            byte_num (int): The number of bytes.
+
+        Returns:
+            list: The bytes.
+        """
+
+        with self._lock:
+            pointer = self.pointer if register is None else register
+            data = []
+            for _ in range(byte_num):
+                data.append(self.read_register(pointer))
+                pointer = self.next_register(pointer)
+            self.pointer = pointer
+
+        return data
+
+    def write(self, register, data):
+        """Write bytes starting from a register.
+
+        Args:
+            register (int): The first register.
+            data (list): The bytes.
+        """
+
+        with self._lock:
+            # A write without data only sets the pointer for a following read.
+            pointer = register
+            for value in data:
+                self.write_register(pointer, value & 0xFF)
+                pointer = self.next_register(pointer)
+            self.pointer = pointer
+
+    def next_register(self, register):
+        """The register a multi byte access continues to."""
+        return (register + 1) % self.size
+
+    def read_register(self, register):
+        """Read one register."""
+        return self.registers[register]
+
+    def write_register(self, register, value):
+        """Write one register."""
+        self.registers[register] = value
+
+
+def _pin(pin_num):
+    """Port index and bit of an A_x or B_x pin name."""
+
+    chunk, num = pin_num.split("_")
+    return "AB".index(chunk), int(num)
+
+
+class MCP23017Model(RegisterFile):
+    """Model of the mcp23017 16 bit io expander.
+
+    Both register layouts of the IOCON.BANK bit, the byte mode of
+    IOCON.SEQOP, the input polarity, the pull ups and the interrupt logic
+    with INTF and INTCAP are modeled. External signals are applied to the
+    input pins with :meth:`set_pin`. The interrupt outputs are available from
+    :meth:`interrupt` and every change of them calls :attr:`on_interrupt`.
+    """
+
+    # Register indexes, the address is index*2 + port in bank 0 and
+    # port*0x10 + index in bank 1.
+    IODIR, IPOL, GPINTEN, DEFVAL, INTCON, IOCON, GPPU, INTF, INTCAP, GPIO, \
+        OLAT = range(11)
+
+    # IOCON bits
+    BANK = 0x80
+    MIRROR = 0x40
+    SEQOP = 0x20
+    INTPOL = 0x02
+
+    def __init__(self):
+        """Constructor"""
+
+        self.on_interrupt = None
+        super(MCP23017Model, self).__init__(size=0x20)
+
+    def reset(self):
+        with self._lock:
+            # Per port registers, index: [port A, port B]
+            self.ports = [[0] * 11 for _ in range(2)]
+            for port in self.ports:
+                port[self.IODIR] = 0xFF
+            self.iocon = 0
+            self._driven = [0, 0]   # Pins with an external signal
+            self._levels = [0, 0]   # Levels of the external signals
+            self._int_out = [False, False]
+
+    def _decode(self, register):
+        """Port and register index of an address."""
+
+        if self.iocon & self.BANK:
+            port, index = register >> 4, register & 0x0F
+        else:
+            port, index = register & 1, register >> 1
+
+        return port, index
+
+    def next_register(self, register):
+        bank = self.iocon & self.BANK
+        if self.iocon & self.SEQOP:
+            # Byte mode, bank 0 toggles between the A and B registers.
+            return register if bank else register ^ 1
+        if bank:
+            return (register + 1) & 0x1F
+        return (register + 1) % 0x16
+
+    def read_register(self, register):
+        port, index = self._decode(register)
+        if index > self.OLAT:
+            return 0
+        if index == self.IOCON:
+            return self.iocon
+        if index == self.GPIO:
+            value = self._port_value(port)
+            self._clear_interrupt(port)
+            return value
+        if index == self.INTCAP:
+            value = self.ports[port][self.INTCAP]
+            self._clear_interrupt(port)
+            return value
+
+        return self.ports[port][index]
+
+    def write_register(self, register, value):
+        port, index = self._decode(register)
+        if index > self.OLAT or index in (self.INTF, self.INTCAP):
+            return
+        if index == self.IOCON:
+            self.iocon = value
+        elif index == self.GPIO:
+            self.ports[port][self.OLAT] = value
+        else:
+            self.ports[port][index] = value
+            if index in (self.GPINTEN, self.DEFVAL, self.INTCON):
+                self._compare_interrupts(port)
+
+    def _pins(self, port):
+        """Levels of the pins of a port, pulled up pins default to high."""
+
+        regs = self.ports[port]
+        inputs = (self._levels[port] & self._driven[port]) |\
+            (regs[self.GPPU] & ~self._driven[port])
+
+        return ((inputs & regs[self.IODIR]) |
+                (regs[self.OLAT] & ~regs[self.IODIR])) & 0xFF
+
+    def _port_value(self, port):
+        """The GPIO register, the input pins inverted by IPOL."""
+
+        regs = self.ports[port]
+        return self._pins(port) ^ (regs[self.IPOL] & regs[self.IODIR])
+
+    def set_pin(self, pin_num, level):
+        """Apply an external signal to a pin.
+
+        Args:
+            pin_num (str): The pin in A_x or B_x form.
+            level (int): The level, None removes the signal and the pin
+                follows its pull up.
+        """
+
+        port, bit = _pin(pin_num)
+        with self._lock:
+            before = self._pins(port)
+            if level is None:
+                self._driven[port] &= ~(1 << bit)
+            else:
+                self._driven[port] |= 1 << bit
+                if level:
+                    self._levels[port] |= 1 << bit
+                else:
+                    self._levels[port] &= ~(1 << bit)
+
+            regs = self.ports[port]
+            changed = (before ^ self._pins(port)) & regs[self.IODIR]
+            # Pins without INTCON interrupt on every change.
+            self._raise(port, changed & regs[self.GPINTEN] &
+                        ~regs[self.INTCON])
+            self._compare_interrupts(port)
+
+    def get_pin(self, pin_num):
+        """The level of a pin, for output pins the latch value."""
+
+        port, bit = _pin(pin_num)
+        with self._lock:
+            return (self._pins(port) >> bit) & 1
+
+    def _compare_interrupts(self, port):
+        """Interrupts of pins compared against DEFVAL."""
+
+        regs = self.ports[port]
+        self._raise(port, (self._pins(port) ^ regs[self.DEFVAL]) &
+                    regs[self.INTCON] & regs[self.GPINTEN] & regs[self.IODIR])
+
+    def _raise(self, port, bits):
+        """Set interrupt flags, the port is captured on the first one."""
+
+        regs = self.ports[port]
+        if not bits or regs[self.INTF]:
+            return
+        regs[self.INTF] = bits
+        regs[self.INTCAP] = self._port_value(port)
+        self._update_outputs()
+
+    def _clear_interrupt(self, port):
+        self.ports[port][self.INTF] = 0
+        # Compared pins still at the wrong level interrupt again.
+        self._compare_interrupts(port)
+        self._update_outputs()
+
+    def _active(self, port):
+        """If the interrupt output of a port is asserted."""
+
+        if self.iocon & self.MIRROR:
+            return any(p[self.INTF] for p in self.ports)
+        return bool(self.ports[port][self.INTF])
+
+    def interrupt(self, port):
+        """The level of the INTA (port 0) or INTB (port 1) output."""
+
+        with self._lock:
+            return int(self._active(port) == bool(self.iocon & self.INTPOL))
+
+    def _update_outputs(self):
+        for port in range(2):
+            active = self._active(port)
+            if active != self._int_out[port]:
+                self._int_out[port] = active
+                if self.on_interrupt is not None:
+                    self.on_interrupt(port, self.interrupt(port))
+
+
+class PCA9685Model(RegisterFile):
+    """Model of the pca9685 16 channel pwm driver.
+
+    The prescale register is written only while the oscillator sleeps, the
+    ALL_LED registers write every channel and the RESTART bit is set when
+    the chip is put to sleep and cleared by writing it.
+    """
+
+    MODE_1 = 0x00
+    LED = 0x06
+    ALL_LED = 0xFA
+    PRESCALE = 0xFE
+    SLEEP = 0x10
+    RESTART = 0x80
+    OSC_CLOCK = 25e6
+
+    RESET_VALUES = {0x00: 0x11, 0x01: 0x04, 0x02: 0xE2, 0x03: 0xE4,
+                    0x04: 0xE8, 0x05: 0xE0, PRESCALE: 0x1E}
+    # LEDn_OFF_H, every channel starts full off
+    RESET_VALUES.update({0x09 + 4*i: 0x10 for i in range(16)})
+
+    def write_register(self, register, value):
+        regs = self.registers
+        if register == self.MODE_1:
+            old = regs[self.MODE_1]
+            if value & self.RESTART:
+                value &= ~self.RESTART
+            elif value & self.SLEEP and not old & self.SLEEP:
+                # Going to sleep with running outputs, restart is possible.
+                value |= self.RESTART
+            else:
+                value |= old & self.RESTART
+            regs[self.MODE_1] = value
+        elif register == self.PRESCALE:
+            if regs[self.MODE_1] & self.SLEEP:
+                regs[register] = max(value, 3)
+        elif self.ALL_LED <= register < self.PRESCALE:
+            for channel in range(16):
+                regs[self.LED + 4*channel + register - self.ALL_LED] = value
+        else:
+            regs[register] = value
+
+    def channel(self, channel):
+        """The (on, off) values of a channel, bit 12 is the full on/off bit."""
+
+        base = self.LED + 4*channel
+        regs = self.registers
+
+        return (regs[base] | (regs[base + 1] & 0x1F) << 8,
+                regs[base + 2] | (regs[base + 3] & 0x1F) << 8)
+
+    def duty_cycle(self, channel):
+        """The duty cycle of a channel between 0 and 1."""
+
+        on, off = self.channel(channel)
+        if off & 0x1000:
+            return 0.0
+        if on & 0x1000:
+            return 1.0
+
+        return ((off - on) % 4096) / 4096.0
+
+    @property
+    def frequency(self):
+        """The pwm frequency in Hz."""
+        return self.OSC_CLOCK / (4096 * (self.registers[self.PRESCALE] + 1))
+
+
+class BME680Model(RegisterFile):
+    """Model of the bme680 environmental sensor.
+
+    The calibration registers hold :attr:`CALIBRATION` and a forced mode
+    measurement copies the raw adc attributes to the data registers, after
+    :attr:`conversion_time` seconds the measuring bit is cleared. The
+    default values compensate to about 25 C, 1000 hPa and 40 %rH.
+    """
+
+    ID = 0xD0
+    CHIP_ID = 0x61
+    RESET = 0xE0
+    CTRL_GAS_1 = 0x71
+    CTRL_MEAS = 0x74
+    MEAS_STATUS_0 = 0x1D
+    PRESS_MSB = 0x1F
+    TEMP_MSB = 0x22
+    HUM_MSB = 0x25
+    GAS_MSB = 0x2A
+    GAS_LSB = 0x2B
+
+    # (address, struct format, value) of the calibration parameters.
+    CALIBRATION = (
+        (0xE9, "<H", 26153),    # par_t1
+        (0x8A, "<h", 26246),    # par_t2
+        (0x8C, "b", 3),         # par_t3
+        (0x8E, "<H", 36530),    # par_p1
+        (0x90, "<h", -10390),   # par_p2
+        (0x92, "b", 88),        # par_p3
+        (0x94, "<h", 7083),     # par_p4
+        (0x96, "<h", -71),      # par_p5
+        (0x99, "b", 30),        # par_p6
+        (0x98, "b", 43),        # par_p7
+        (0x9C, "<h", -3033),    # par_p8
+        (0x9E, "<h", -2349),    # par_p9
+        (0xA0, "B", 30),        # par_p10
+        (0xE3, "B", 797 >> 4),  # par_h1 msb
+        (0xE1, "B", 1004 >> 4), # par_h2 msb
+        # par_h2 lsb in the high and par_h1 lsb in the low nibble
+        (0xE2, "B", (1004 & 0x0F) << 4 | (797 & 0x0F)),
+        (0xE4, "b", 0),         # par_h3
+        (0xE5, "b", 45),        # par_h4
+        (0xE6, "b", 20),        # par_h5
+        (0xE7, "B", 120),       # par_h6
+        (0xE8, "b", -100),      # par_h7
+        (0xED, "b", -30),       # par_g1
+        (0xEB, "<h", -12000),   # par_g2
+        (0xEE, "b", 18),        # par_g3
+        (0x02, "B", 1 << 4),    # res_heat_range
+        (0x00, "b", 44),        # res_heat_val
+    )
+
+    def __init__(self):
+        """Constructor"""
+
+        self.temp_adc = 498328
+        self.pres_adc = 350348
+        self.hum_adc = 20783
+        self.gas_adc = 400
+        self.gas_range = 4
+        self.conversion_time = 0.0
+        self._ready = 0.0
+        super(BME680Model, self).__init__()
+
+    def reset(self):
+        with self._lock:
+            super(BME680Model, self).reset()
+            self.registers[self.ID] = self.CHIP_ID
+            for address, fmt, value in self.CALIBRATION:
+                struct.pack_into(fmt, self.registers, address, value)
+
+    def read_register(self, register):
+        if register == self.MEAS_STATUS_0 and self._ready:
+            if time.monotonic() >= self._ready:
+                self._ready = 0.0
+                self._store()
+            return self.registers[register] | (0x20 if self._ready else 0)
+
+        return self.registers[register]
+
+    def write_register(self, register, value):
+        if register == self.RESET:
+            if value == 0xB6:
+                self.reset()
+            return
+
+        self.registers[register] = value
+        if register == self.CTRL_MEAS and value & 0x03 == 1:
+            if self.conversion_time > 0:
+                self._ready = time.monotonic() + self.conversion_time
+            else:
+                self._store()
+
+    def _store(self):
+        """Finish a forced measurement."""
+
+        regs = self.registers
+        # 20 bit values, msb, lsb and the high nibble of xlsb
+        regs[self.TEMP_MSB:self.TEMP_MSB + 3] = \
+            (self.temp_adc << 4).to_bytes(3, "big")
+        regs[self.PRESS_MSB:self.PRESS_MSB + 3] = \
+            (self.pres_adc << 4).to_bytes(3, "big")
+        struct.pack_into(">H", regs, self.HUM_MSB, self.hum_adc)
+
+        if regs[self.CTRL_GAS_1] & 0x10:
+            # gas_valid and heat_stab with the range
+            regs[self.GAS_MSB] = self.gas_adc >> 2
+            regs[self.GAS_LSB] = (self.gas_adc & 0x03) << 6 | 0x30 |\
+                self.gas_range
+        else:
+            regs[self.GAS_MSB] = 0
+            regs[self.GAS_LSB] = 0
+
+        regs[self.MEAS_STATUS_0] = 0x80     # new_data
+        regs[self.CTRL_MEAS] &= ~0x03       # back to sleep
+
+
+class AK09916Model(RegisterFile):
+    """Model of the ak09916 magnetometer inside the icm-20948.
+
+    A single measurement or a continuous mode loads :attr:`field`, the raw
+    x, y, z values, to the data registers and sets the data ready bit, that
+    reading ST2 clears.
+    """
+
+    WIA1 = 0x00
+    WIA2 = 0x01
+    ST1 = 0x10
+    HXL = 0x11
+    ST2 = 0x18
+    CNTL2 = 0x31
+    CNTL3 = 0x32
+
+    RESET_VALUES = {WIA1: 0x48, WIA2: 0x09}
+
+    def __init__(self):
+        """Constructor"""
+
+        self.field = (100, -200, 300)
+        super(AK09916Model, self).__init__()
+
+    def read_register(self, register):
+        value = self.registers[register]
+        if register == self.ST1 and self.registers[self.CNTL2] & 0x1E:
+            # Continuous modes always have a new sample.
+            self._measure()
+            value = self.registers[self.ST1]
+        elif register == self.ST2:
+            self.registers[self.ST1] &= ~0x01
+
+        return value
+
+    def write_register(self, register, value):
+        if register == self.CNTL3:
+            if value & 0x01:
+                self.reset()
+            return
+
+        self.registers[register] = value
+        if register == self.CNTL2 and value == 0x01:
+            self._measure()
+            self.registers[self.CNTL2] = 0
+
+    def _measure(self):
+        struct.pack_into("<hhh", self.registers, self.HXL, *self.field)
+        self.registers[self.ST1] |= 0x01
+
+
+class ICM20948Model(RegisterFile):
+    """Model of the icm-20948 imu.
+
+    The four register banks are selected with REG_BANK_SEL. The i2c master
+    runs the slave 0 transfer when I2C_SLV0_DO is written, a read copies the
+    bytes of the :class:`AK09916Model` to EXT_SLV_SENS_DATA and a write
+    writes I2C_SLV0_DO to the magnetometer. The samples are set with
+    :meth:`set_sample` as raw values.
+    """
+
+    BANK_SEL = 0x7F
+    WHO_AM_I = 0x00
+    CHIP_ID = 0xEA
+    PWR_MGMT_1 = 0x06
+    ACCEL_XOUT_H = 0x2D
+    EXT_SLV_SENS_DATA_00 = 0x3B
+    SLV0_ADDR = 0x03
+    SLV0_REG = 0x04
+    SLV0_CTRL = 0x05
+    SLV0_DO = 0x06
+    MAG_ADDRESS = 0x0C
+
+    def __init__(self):
+        """Constructor"""
+
+        self.magnetometer = AK09916Model()
+        super(ICM20948Model, self).__init__(size=4 * 0x80)
+
+    def reset(self):
+        with self._lock:
+            super(ICM20948Model, self).reset()
+            self.bank = 0
+            self.registers[self.WHO_AM_I] = self.CHIP_ID
+            self.registers[self.PWR_MGMT_1] = 0x41
+            self.set_sample((0, 0, 16384 // 8), (0, 0, 0), 0)
+
+    def set_sample(self, accel, gyro, temp=0):
+        """Set the raw accelerometer, gyroscope and temperature values.
+
+        Args:
+            accel (tuple): x, y, z accelerometer values.
+            gyro (tuple): x, y, z gyroscope values.
+            temp (int): Temperature value.
+        """
+
+        with self._lock:
+            struct.pack_into(">7h", self.registers, self.ACCEL_XOUT_H,
+                             *(tuple(accel) + tuple(gyro) + (temp,)))
+
+    def bank_register(self, bank, register):
+        """The value of a register of a bank."""
+        return self.registers[bank * 0x80 + register]
+
+    def read(self, register, byte_num):
+        # Every access is in the selected bank, REG_BANK_SEL is in all.
+        with self._lock:
+            start = None if register is None else self._offset(register)
+            return super(ICM20948Model, self).read(start, byte_num)
+
+    def write(self, register, data):
+        with self._lock:
+            super(ICM20948Model, self).write(self._offset(register), data)
+
+    def _offset(self, register):
+        return self.bank * 0x80 + (register & 0x7F)
+
+    def next_register(self, register):
+        return (register & ~0x7F) | ((register + 1) & 0x7F)
+
+    def read_register(self, register):
+        if register & 0x7F == self.BANK_SEL:
+            return self.bank << 4
+        return self.registers[register]
+
+    def write_register(self, register, value):
+        if register & 0x7F == self.BANK_SEL:
+            self.bank = (value >> 4) & 0x03
+            return
+
+        self.registers[register] = value
+        if register == 3 * 0x80 + self.SLV0_DO:
+            self._slave_transfer()
+
+    def _slave_transfer(self):
+        """Run the slave 0 transfer of the i2c master."""
+
+        bank_3 = 3 * 0x80
+        address = self.registers[bank_3 + self.SLV0_ADDR]
+        register = self.registers[bank_3 + self.SLV0_REG]
+        if address & 0x7F != self.MAG_ADDRESS:
+            return
+
+        if address & 0x80:
+            length = self.registers[bank_3 + self.SLV0_CTRL] & 0x0F
+            data = self.magnetometer.read(register, length)
+            start = self.EXT_SLV_SENS_DATA_00
+            self.registers[start:start + length] = bytes(data)
+        else:
+            self.magnetometer.write(register,
+                                    [self.registers[bank_3 + self.SLV0_DO]])
+
+
+class MCP3002Model(object):
+    """Model of the mcp3002 2 channel 10 bit adc on spi.
+
+    Every transfer is a conversion, the command bits are decoded from the bit
+    stream after the start bit like the chip does, so commands aligned in any
+    way work.
+
+    Attributes:
+        values (list): The 10 bit raw value of each channel.
+    """
+
+    def __init__(self):
+        """Constructor"""
+        self.values = [0, 0]
+
+    def set_voltage(self, channel, voltage, v_ref=3.3):
+        """Set the input of a channel from a voltage."""
+
+        value = int(round(voltage / v_ref * 1024))
+        self.values[channel] = min(max(value, 0), 1023)
+
+    def transfer(self, data):
+        """Exchange bytes with the chip.
+
+        Args:
+            data (list): The bytes sent on MOSI.
+
+        Returns:
+            list: The bytes received on MISO.
+        """
+
+        bits = [(byte >> (7 - i)) & 1 for byte in data for i in range(8)]
+        out = [0] * len(bits)
+
+        try:
+            start = bits.index(1)
+        except ValueError:
+            return [0] * len(data)
+
+        if start + 3 < len(bits):
+            single, odd, msbf = bits[start + 1:start + 4]
+            if single:
+                value = self.values[odd]
+            else:
+                value = max(self.values[odd] - self.values[1 - odd], 0)
+
+            # A null bit then b9..b0 and, without MSBF, b1..b9 again.
+            stream = [(value >> (9 - i)) & 1 for i in range(10)]
+            if not msbf:
+                stream += stream[-2::-1]
+            for i, bit in enumerate(stream, start=start + 5):
+                if i < len(out):
+                    out[i] = bit
+
+        return [sum(bit << (7 - i) for i, bit in enumerate(out[j:j + 8]))
+                for j in range(0, len(out), 8)]
+
+
+# Models answering at the default addresses of a simulated i2c bus.
+I2C_MODELS = {0x40: PCA9685Model, 0x76: BME680Model, 0x77: BME680Model,
+              0x68: ICM20948Model, 0x69: ICM20948Model}
+I2C_MODELS.update({address: MCP23017Model for address in range(0x20, 0x28)})
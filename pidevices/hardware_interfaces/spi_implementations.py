@@ -1,4 +1,7 @@
 from .hardware_interfaces import SPI
+from .bus_pool import BusPool
+from .bus_arbiter import BusArbiter
+import threading
 
 try:
     from spidev import SpiDev
@@ -27,6 +30,17 @@ class SPIimplementation(SPI):
         self._interface = SpiDev()
         self._interface.open(port, device)
         self._interface.max_speed_hz = 1000000
+        self._lock = BusArbiter().client(name=type(self).__name__)
+
+    @property
+    def lock(self):
+        """The :class:`BusClient` of the bus arbiter.
+
+        Every transaction holds it and a device can hold it in a with block
+        to make a sequence of transactions atomic. Its priority and name
+        attributes set the priority of the device on the bus.
+        """
+        return self._lock
 
     def read(self, n):
         """Read n words from spi
@@ -34,7 +48,8 @@ class SPIimplementation(SPI):
         Args:
             n (int): The number of bytes to read from spi.
         """
-        return self._interface.readbytes(n)
+        with self._lock:
+            return self._interface.readbytes(n)
 
     # TODO: Check writebytes2 for large lists
     def write(self, data):
@@ -44,7 +59,8 @@ class SPIimplementation(SPI):
             data (list): A list with integers to be writter to the device.
         """
 
-        self._interface.writebytes2(data)
+        with self._lock:
+            self._interface.writebytes2(data)
 
     def read_write(self, data):
         """
@@ -52,10 +68,12 @@ class SPIimplementation(SPI):
         :attr:`bits_per_word` bits or less) to the SPI interface, and reads an
         equivalent number of words, returning them as a list of integers.
         """
-        return self._interface.xfer2(data)
+        with self._lock:
+            return self._interface.xfer2(data)
 
     def close(self):
-        if self._interface is not None:
+        """Release the device, it is closed when no other handle uses it."""
+        if self._interface is not None and BusPool.release(self):
             self._interface.close()
         self._interface = None
 
@@ -82,3 +100,120 @@ class SPIimplementation(SPI):
 
     def _set_bits_per_word(self, value):
         self._interface.bits_per_word = value
+
+
+class SimSPI(SPI):
+    """Simulated spi device, extends :class:`SPI`.
+
+    It has the interface of :class:`SPIimplementation`. Every port and
+    device pair is a :class:`SimBus` with one model at address 0, by default
+    an :class:`MCP3002Model`, whose transfer method exchanges the bytes.
+
+    Args:
+        port (int): The simulated spi port.
+        device (int): The simulated chip select.
+        latency (BusLatency): Optional latency, it replaces the latency of
+            the bus.
+    """
+
+    _buses = {}
+    _mutex = threading.Lock()
+
+    def __init__(self, port, device, latency=None):
+        """Constructor"""
+
+        self._port = port
+        self._device = device
+        if latency is not None:
+            self.sim_bus(port, device).latency = latency
+        self._settings = {"mode": 0, "lsbfirst": False, "cshigh": False,
+                          "bits_per_word": 8}
+        self._lock = BusArbiter().client(name=type(self).__name__)
+
+    @classmethod
+    def sim_bus(cls, port, device):
+        """Get the :class:`SimBus` of a port and device. Its model at address
+        0 is the chip, another model is set with attach(0, model).
+        """
+
+        # Imported with the first simulated device, like SimI2C.sim_bus.
+        from .sim_devices import SimBus, MCP3002Model
+
+        with cls._mutex:
+            sim = cls._buses.get((port, device))
+            if sim is None:
+                sim = SimBus({0: MCP3002Model})
+                cls._buses[(port, device)] = sim
+
+        return sim
+
+    @classmethod
+    def reset(cls):
+        """Drop every simulated device."""
+
+        with cls._mutex:
+            cls._buses.clear()
+
+    @property
+    def _sim(self):
+        """The :class:`SimBus`, looked up every time so handles see a new
+        device after :meth:`reset`.
+        """
+
+        sim = self._buses.get((self._port, self._device))
+        return sim if sim is not None else self.sim_bus(self._port,
+                                                        self._device)
+
+    @property
+    def lock(self):
+        """The :class:`BusClient` of the bus arbiter."""
+        return self._lock
+
+    def read(self, n):
+        """Read n words, sending zeros."""
+        return self.read_write([0] * n)
+
+    def write(self, data):
+        """Write data, the received words are dropped."""
+        self.read_write(list(data))
+
+    def read_write(self, data):
+        """Exchange the words of data with the model.
+
+        Returns:
+            list: The received words.
+        """
+
+        with self._lock:
+            res = self._sim.device(0).transfer(data)
+            self._sim.transfer(len(data))
+
+        return res
+
+    def close(self):
+        """Release the handle, the simulated device remains."""
+        BusPool.release(self)
+
+    def _get_clock_mode(self):
+        return self._settings["mode"]
+
+    def _set_clock_mode(self, value):
+        self._settings["mode"] = value
+
+    def _get_lsb_first(self):
+        return self._settings["lsbfirst"]
+
+    def _set_lsb_first(self, value):
+        self._settings["lsbfirst"] = bool(value)
+
+    def _get_select_high(self):
+        return self._settings["cshigh"]
+
+    def _set_select_high(self, value):
+        self._settings["cshigh"] = bool(value)
+
+    def _get_bits_per_word(self):
+        return self._settings["bits_per_word"]
+
+    def _set_bits_per_word(self, value):
+        self._settings["bits_per_word"] = value
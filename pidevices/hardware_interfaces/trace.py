@@ -0,0 +1,597 @@
+"""trace.py
+
+Record and replay of the calls at the hardware interface boundary.
+
+A recorded interface wraps the real implementation and writes every method
+call, with its arguments, result or exception and its monotonic start time
+and duration, to a compact binary trace. Callbacks that the interface calls
+later, e.x. gpio edge events, are recorded too. A replayed interface answers
+the same calls from the trace without any hardware, as fast as possible or
+with the original timing, so drivers and applications can be profiled on a
+workstation with the data of a real session.
+
+The trace is a header followed by records, every record is a fixed
+:data:`RECORD` header and a :mod:`marshal` payload. Method names and
+interfaces are written once and then referenced by number.
+"""
+
+import builtins
+import marshal
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from functools import partial
+from importlib import import_module
+from .hardware_interfaces import I2CTransaction, PinHandle
+from ..exceptions import ReplayError
+from .. import exceptions
+
+MAGIC = b"PDTRACE\x01"
+
+# kind, channel, name, start since the start of the trace, duration, size of
+# the payload
+RECORD = struct.Struct("<BHHdfI")
+
+# Record kinds
+NAME = 0        # payload: the name, the id is in the name field
+CHANNEL = 1     # payload: (interface, module, implementation, kwargs)
+CALL = 2        # payload: (args, kwargs, result, out buffers)
+RAISE = 3       # payload: (args, kwargs, (exception, args), out buffers)
+GET = 4         # payload: the value of the property
+SET = 5         # payload: the new value of the property
+EVENT = 6       # payload: (slot, callback args)
+
+_MARSHAL_VERSION = 4
+_PLAIN = (type(None), bool, int, float, str, bytes)
+
+
+def _encode(value):
+    """Convert a value to types that marshal supports."""
+
+    if isinstance(value, _PLAIN):
+        return value
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_encode(item) for item in value)
+    if isinstance(value, dict):
+        return {_encode(k): _encode(v) for k, v in value.items()}
+    if callable(value):
+        return None
+    try:
+        return memoryview(value).tobytes()
+    except TypeError:
+        return repr(value)
+
+
+def _writable(value):
+    """A memoryview of a writable buffer argument or None."""
+
+    if isinstance(value, _PLAIN):
+        return None
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return None
+
+    return None if view.readonly else view.cast("B")
+
+
+def _encode_args(args):
+    """Encode arguments, writable buffers are recorded after the call."""
+    return tuple(None if _writable(arg) is not None else _encode(arg)
+                 for arg in args)
+
+
+def _out_buffers(args):
+    outs = []
+    for i, arg in enumerate(args):
+        view = _writable(arg)
+        if view is not None:
+            outs.append((i, view.tobytes()))
+
+    return outs
+
+
+class TraceRecord(object):
+    """A record of a trace, see :class:`TraceReader`."""
+
+    __slots__ = ("kind", "channel", "name", "start", "duration", "payload")
+
+    def __init__(self, kind, channel, name, start, duration, payload):
+        self.kind = kind
+        self.channel = channel
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.payload = payload
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+class TraceWriter(object):
+    """Writer of a binary trace file.
+
+    Args:
+        path (str): The path of the trace file, it is overwritten.
+    """
+
+    def __init__(self, path):
+        """Constructor"""
+
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._names = {}
+        self._channels = 0
+        self._start = time.perf_counter()
+
+    @staticmethod
+    def clock():
+        """The monotonic clock of the timestamps."""
+        return time.perf_counter()
+
+    def channel(self, interface, impl, kwargs):
+        """Add an interface object to the trace.
+
+        Args:
+            interface (str): The interface type, e.x. I2C.
+            impl (type): The class of the implementation.
+            kwargs (dict): The arguments of its constructor.
+
+        Returns:
+            int: The channel number of the interface's records.
+        """
+
+        with self._lock:
+            self._channels += 1
+            channel = self._channels
+        now = self.clock()
+        self.write(CHANNEL, channel, "", now, now,
+                   (interface, impl.__module__, impl.__name__,
+                    _encode(kwargs)))
+
+        return channel
+
+    def write(self, kind, channel, name, start, end, payload):
+        """Append a record.
+
+        Args:
+            kind (int): The record kind, e.x. :data:`CALL`.
+            channel (int): The channel of the interface.
+            name (str): The method or property name.
+            start (float): :meth:`clock` before the call.
+            end (float): :meth:`clock` after the call.
+            payload: Encoded data of the record kind.
+        """
+
+        data = marshal.dumps(payload, _MARSHAL_VERSION)
+        with self._lock:
+            if self._file is None:
+                return
+            name_id = self._names.get(name)
+            if name_id is None:
+                name_id = len(self._names)
+                self._names[name] = name_id
+                encoded = name.encode()
+                self._file.write(RECORD.pack(NAME, 0, name_id, 0, 0,
+                                             len(encoded)))
+                self._file.write(encoded)
+            self._file.write(RECORD.pack(kind, channel, name_id,
+                                         start - self._start, end - start,
+                                         len(data)))
+            self._file.write(data)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Flush and close the file, later records are dropped."""
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceReader(object):
+    """Reader of a binary trace file.
+
+    Iterating it gives the :class:`TraceRecord` objects in the order they
+    were written, with the names resolved.
+
+    Args:
+        path (str): The path of the trace file.
+
+    Raises:
+        ValueError: The file is not a trace.
+    """
+
+    def __init__(self, path):
+        """Constructor"""
+
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is not a pidevices trace.".format(path))
+
+    def __iter__(self):
+        names = {}
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC))
+            while True:
+                header = f.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                kind, channel, name, start, duration, size = \
+                    RECORD.unpack(header)
+                data = f.read(size)
+                if len(data) < size:
+                    # Cut by a crash while recording
+                    return
+                if kind == NAME:
+                    names[name] = data.decode()
+                    continue
+                yield TraceRecord(kind, channel, names[name], start, duration,
+                                  marshal.loads(data))
+
+
+class RecordedInterface(object):
+    """Proxy of a hardware interface that records its calls.
+
+    Method calls and the properties with plain values are recorded, other
+    attributes are returned as they are. Functions in the arguments, like
+    the event of :meth:`GPIO.set_pin_event`, are wrapped so their calls are
+    recorded as events of the method and its first argument.
+
+    Args:
+        interface: The interface object.
+        trace (TraceWriter): The trace.
+        channel (int): The channel of the interface from
+            :meth:`TraceWriter.channel`.
+    """
+
+    def __init__(self, interface, trace, channel):
+        """Constructor"""
+
+        object.__setattr__(self, "_interface", interface)
+        object.__setattr__(self, "_trace", trace)
+        object.__setattr__(self, "_channel", channel)
+
+    def __getattr__(self, name):
+        interface = self._interface
+        if isinstance(getattr(type(interface), name, None), property):
+            start = self._trace.clock()
+            value = getattr(interface, name)
+            if isinstance(value, _PLAIN):
+                self._trace.write(GET, self._channel, name, start,
+                                  self._trace.clock(), value)
+            return value
+
+        attr = getattr(interface, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            return self._call(name, attr, args, kwargs)
+
+        return method
+
+    def __setattr__(self, name, value):
+        interface = self._interface
+        if isinstance(getattr(type(interface), name, None), property):
+            start = self._trace.clock()
+            setattr(interface, name, value)
+            self._trace.write(SET, self._channel, name, start,
+                              self._trace.clock(), _encode(value))
+        else:
+            setattr(interface, name, value)
+
+    def transaction(self, address):
+        """An :class:`I2CTransaction` whose execution is recorded."""
+        return I2CTransaction(self, address)
+
+    def handle(self, pin):
+        """A :class:`PinHandle` whose reads and writes are recorded."""
+        return PinHandle(pin, partial(self.read, pin), partial(self.write, pin))
+
+    def _call(self, name, method, args, kwargs):
+        trace = self._trace
+        live = args
+        if any(callable(arg) for arg in args):
+            live = tuple(self._event(name, args, i) if callable(arg) else arg
+                         for i, arg in enumerate(args))
+
+        encoded = (_encode_args(args), _encode(kwargs))
+        start = trace.clock()
+        try:
+            result = method(*live, **kwargs)
+        except Exception as e:
+            trace.write(RAISE, self._channel, name, start, trace.clock(),
+                        encoded + ((type(e).__name__, _encode(e.args)),
+                                   _out_buffers(args)))
+            raise
+        trace.write(CALL, self._channel, name, start, trace.clock(),
+                    encoded + (_encode(result), _out_buffers(args)))
+
+        return result
+
+    def _event(self, name, args, index):
+        """Wrap the function argument in position index of a call."""
+
+        function = args[index]
+        slot = _encode(args[0]) if index else None
+        extra = len(args) - index - 1
+        trace = self._trace
+        channel = self._channel
+
+        def event(*event_args):
+            # Only the arguments from the interface, the rest are the
+            # arguments given with the function.
+            own = event_args[:len(event_args) - extra]
+            now = trace.clock()
+            trace.write(EVENT, channel, name, now, now, (slot, _encode(own)))
+            return function(*event_args)
+
+        return event
+
+
+class ReplayedInterface(object):
+    """Interface that answers its calls from a trace, created by
+    :meth:`Replay.open`.
+
+    Args:
+        replay (Replay): The replay session.
+        channel (int): The channel of the recorded interface.
+        impl (type): The recorded implementation class, used to tell the
+            properties from the methods. It can be None.
+    """
+
+    def __init__(self, replay, channel, impl):
+        """Constructor"""
+
+        object.__setattr__(self, "_replay", replay)
+        object.__setattr__(self, "_channel", channel)
+        object.__setattr__(self, "_impl", impl)
+        object.__setattr__(self, "lock", threading.RLock())
+
+    def _is_property(self, name):
+        return isinstance(getattr(self._impl, name, None), property)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if self._is_property(name):
+            return self._replay.replay(self._channel, GET, name)
+
+        def method(*args, **kwargs):
+            return self._replay.replay(self._channel, CALL, name, args,
+                                       kwargs)
+
+        return method
+
+    def __setattr__(self, name, value):
+        if self._is_property(name):
+            self._replay.replay(self._channel, SET, name, (value,))
+        else:
+            object.__setattr__(self, name, value)
+
+    def transaction(self, address):
+        """An :class:`I2CTransaction` answered from the trace."""
+        return I2CTransaction(self, address)
+
+    def handle(self, pin):
+        """A :class:`PinHandle` answered from the trace."""
+        return PinHandle(pin, partial(self.read, pin), partial(self.write, pin))
+
+
+class Replay(object):
+    """Replay session of a trace.
+
+    Interfaces are matched to the recorded ones by their type and
+    constructor arguments, in the order they were created, so the same
+    program gets the interfaces of the recording. Every interface replays
+    its own records in order. Recorded events are called from a dispatcher
+    thread after the call that preceded them, like the threads of the gpio
+    libraries.
+
+    Args:
+        path (str): The path of the trace file.
+        speed (float): None replays as fast as possible, otherwise every call
+            returns at its recorded time divided by speed, 1.0 is the
+            original timing. Defaults to :data:`None`.
+        strict (bool): Compare the arguments of every call with the recorded
+            ones. Defaults to :data:`False`, only the names are compared.
+
+    Raises:
+        ValueError: The file is not a trace.
+    """
+
+    def __init__(self, path, speed=None, strict=False):
+        """Constructor"""
+
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._records = {}      # channel: deque of records
+        self._channels = {}     # (interface, kwargs): deque of channels
+        self._impls = {}        # channel: (module, implementation)
+        self._handlers = {}     # (channel, name, slot): (function, args)
+        self._origin = None
+        self._events = None
+
+        for record in TraceReader(path):
+            if record.kind == CHANNEL:
+                interface, module, impl, kwargs = record.payload
+                self._channels.setdefault(
+                    self._key(interface, kwargs), deque()).append(
+                        record.channel)
+                self._impls[record.channel] = (module, impl)
+                self._records[record.channel] = deque()
+            else:
+                self._records[record.channel].append(record)
+
+    @staticmethod
+    def _key(interface, kwargs):
+        return interface, repr(sorted(kwargs.items()))
+
+    def open(self, interface, kwargs):
+        """Get the next recorded interface of a type.
+
+        Args:
+            interface (str): The interface type, e.x. I2C.
+            kwargs (dict): The arguments of the constructor.
+
+        Returns:
+            :class:`ReplayedInterface`
+
+        Raises:
+            ReplayError: There isn't another interface with these arguments
+                in the trace.
+        """
+
+        with self._lock:
+            channels = self._channels.get(
+                self._key(interface, _encode(kwargs)))
+            if not channels:
+                raise ReplayError("No recorded {} interface with arguments "
+                                  "{}.".format(interface, kwargs))
+            channel = channels.popleft()
+
+        module, name = self._impls[channel]
+        try:
+            impl = getattr(import_module(module), name, None)
+        except ImportError:
+            impl = None
+
+        return ReplayedInterface(self, channel, impl)
+
+    def replay(self, channel, kind, name, args=(), kwargs=None):
+        """Answer a call of a replayed interface.
+
+        Args:
+            channel (int): The channel of the interface.
+            kind (int): :data:`CALL`, :data:`GET` or :data:`SET`.
+            name (str): The method or property name.
+            args (tuple): The arguments of the call.
+            kwargs (dict): The keyword arguments of the call.
+
+        Returns:
+            The recorded result.
+
+        Raises:
+            ReplayError: The call doesn't match the trace.
+        """
+
+        with self._lock:
+            records = self._records[channel]
+            record = records.popleft() if records else None
+            if record is None or record.name != name or not (
+                    record.kind == kind or
+                    (kind == CALL and record.kind == RAISE)):
+                raise ReplayError("Call {} of channel {} doesn't match the "
+                                  "trace, next recorded {}.".format(
+                                      name, channel,
+                                      record.name if record else None))
+            if self._origin is None:
+                self._origin = time.perf_counter() - self._scaled(
+                    record.start)
+            events = []
+            while records and records[0].kind == EVENT:
+                events.append(records.popleft())
+
+        if kind == CALL:
+            if self.strict and record.payload[0] != _encode_args(args):
+                raise ReplayError("Arguments of {} don't match the trace: {} "
+                                  "recorded {}.".format(name, args,
+                                                        record.payload[0]))
+            for i, arg in enumerate(args):
+                if callable(arg):
+                    slot = _encode(args[0]) if i else None
+                    self._handlers[(channel, name, slot)] = (arg,
+                                                             args[i + 1:])
+            for i, data in record.payload[3]:
+                view = _writable(args[i])
+                if view is not None:
+                    view[:len(data)] = data
+
+        self._wait(record.end)
+        for event in events:
+            self._dispatch(event)
+
+        if record.kind == RAISE:
+            raise self._exception(*record.payload[2])
+        if kind == CALL:
+            return record.payload[2]
+        if kind == GET:
+            return record.payload
+
+    def _scaled(self, seconds):
+        return seconds / self.speed if self.speed else 0.0
+
+    def _wait(self, at):
+        """Wait until the trace time at, with the original timing."""
+
+        if not self.speed:
+            return
+        delay = self._origin + self._scaled(at) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _dispatch(self, event):
+        if self._events is None:
+            self._events = queue.Queue()
+            thread = threading.Thread(target=self._run_events, daemon=True)
+            thread.start()
+        self._events.put(event)
+
+    def _run_events(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            slot, args = event.payload
+            handler = self._handlers.get((event.channel, event.name, slot))
+            if handler is None:
+                continue
+            self._wait(event.start)
+            function, extra = handler
+            function(*(tuple(args) + tuple(extra)))
+
+    @staticmethod
+    def _exception(name, args):
+        """Recreate a recorded exception."""
+
+        cls = getattr(exceptions, name, None) or getattr(builtins, name,
+                                                          None)
+        if not (isinstance(cls, type) and issubclass(cls, Exception)):
+            return ReplayError("Recorded {}{}".format(name, args))
+
+        return cls(*args)
+
+    def remaining(self):
+        """The number of records that weren't replayed yet."""
+
+        with self._lock:
+            return sum(len(records) for records in self._records.values())
+
+    def close(self):
+        """Stop the event dispatcher."""
+
+        if self._events is not None:
+            self._events.put(None)
+            self._events = None
@@ -0,0 +1,224 @@
+"""int_poller.py"""
+
+import threading
+import time
+
+
+class IntPoller(object):
+    """Adaptive polling of the interrupt flags of mcp23017 expanders.
+
+    One thread per i2c bus polls every registered expander, reading INTFA,
+    INTFB, INTCAPA and INTCAPB in one transfer, that also clears the
+    interrupts. After a poll that found a flag the next one follows after
+    min_interval, while there are no interrupts the interval doubles up to
+    the target latency of the subscriptions minus the time of a poll. So an
+    edge is seen in at most the target latency while an idle bus sees a
+    poll every few milliseconds instead of continuous reads.
+
+    Failed reads are counted for every subscription of the expander, see
+    :meth:`statistics`. After :attr:`ERROR_BACKOFF` failures in a row an
+    expander, e.x. one that dropped off the bus, is read only once per the
+    target latency of its subscriptions until a read succeeds.
+
+    Pollers are shared per bus, see :meth:`shared`.
+
+    Args:
+        min_interval (float): Seconds between polls after an interrupt.
+            Defaults to :data:`0.0002`.
+    """
+
+    # Failed reads in a row after which an expander is polled at the idle
+    # interval.
+    ERROR_BACKOFF = 3
+
+    _pollers = {}
+    _mutex = threading.Lock()
+
+    def __init__(self, min_interval=0.0002):
+        """Constructor"""
+
+        self.min_interval = min_interval
+        self._condition = threading.Condition()
+        self._subscriptions = []
+        self._errors = {}       # subscription: failed reads
+        self._failures = {}     # mcp: (failures in a row, error, retry time)
+        self._thread = None
+        self.interval = min_interval
+        self.polls = 0
+        self.hits = 0
+
+    @classmethod
+    def shared(cls, bus):
+        """Get the poller of an i2c bus.
+
+        Args:
+            bus (int): The bus number.
+
+        Returns:
+            :class:`IntPoller`
+        """
+
+        with cls._mutex:
+            poller = cls._pollers.get(bus)
+            if poller is None:
+                poller = cls._pollers[bus] = cls()
+
+        return poller
+
+    def add(self, mcp, pin_nums, callback, latency=0.002):
+        """Poll pins of an expander.
+
+        The expander is switched to bank 0 with sequential reads.
+
+        Args:
+            mcp (MCP23017): The expander.
+            pin_nums (list): Pins in A_x or B_x form.
+            callback: Called from the polling thread with the pin number for
+                every flagged pin, it shouldn't block.
+            latency (float): The max seconds from an edge to its poll.
+                Defaults to :data:`0.002`.
+
+        Returns:
+            The subscription for :meth:`remove`.
+        """
+
+        mcp.set_seqop(0)
+        mcp.set_bank(0)
+        pins = []
+        for pin_num in pin_nums:
+            chunk, num = mcp._get_chunk_number(pin_num)
+            pins.append((pin_num, ord(chunk) - ord('A'), 1 << num))
+
+        subscription = (mcp, tuple(pins), callback, latency)
+        with self._condition:
+            self._subscriptions.append(subscription)
+            self._errors.setdefault(subscription, 0)
+            self.interval = self.min_interval
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name="mcp23017-poller",
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+        return subscription
+
+    def remove(self, subscription):
+        """Stop a subscription of :meth:`add`."""
+
+        with self._condition:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            if subscription not in self._subscriptions:
+                self._errors.pop(subscription, None)
+            mcp = subscription[0]
+            if all(sub[0] is not mcp for sub in self._subscriptions):
+                self._failures.pop(mcp, None)
+            self._condition.notify_all()
+
+    def statistics(self, subscription=None):
+        """Statistics of the poller or of a subscription.
+
+        Args:
+            subscription: A subscription of :meth:`add`. Defaults to None.
+
+        Returns:
+            dict: Without a subscription, the polls, the polls that found a
+            flag, the current interval and the failed reads of every
+            subscription. With a subscription, its failed reads, the failures
+            in a row of its expander and the last error or None.
+        """
+
+        with self._condition:
+            if subscription is None:
+                return {"polls": self.polls, "hits": self.hits,
+                        "interval": self.interval,
+                        "errors": sum(self._errors.values())}
+
+            failure = self._failures.get(subscription[0], (0, None, 0))
+            return {"errors": self._errors.get(subscription, 0),
+                    "consecutive_errors": failure[0],
+                    "last_error": failure[1]}
+
+    def _run(self):
+        clock = time.perf_counter
+        while True:
+            with self._condition:
+                if not self._subscriptions:
+                    self._thread = None
+                    return
+                subscriptions = list(self._subscriptions)
+
+            start = clock()
+            hit = False
+            for mcp, flags in self._poll(subscriptions, start):
+                for sub_mcp, pins, callback, _ in subscriptions:
+                    if sub_mcp is not mcp:
+                        continue
+                    for pin_num, port, mask in pins:
+                        if flags[port] & mask:
+                            hit = True
+                            callback(pin_num)
+            end = clock()
+
+            with self._condition:
+                self.polls += 1
+                if hit:
+                    self.hits += 1
+                    self.interval = self.min_interval
+                else:
+                    latency = min(sub[3] for sub in subscriptions)
+                    limit = max(self.min_interval, latency - (end - start))
+                    self.interval = min(self.interval * 2, limit)
+                # Subscriptions that change wake the thread
+                deadline = start + self.interval
+                remaining = deadline - clock()
+                if remaining > 0 and self._subscriptions == subscriptions:
+                    self._condition.wait(remaining)
+
+    def _poll(self, subscriptions, now):
+        """Read the flags of every subscribed expander once."""
+
+        seen = []
+        for mcp, _, _, _ in subscriptions:
+            if mcp in seen:
+                continue
+            seen.append(mcp)
+
+            failure = self._failures.get(mcp)
+            if failure is not None and now < failure[2]:
+                continue
+
+            # Stopped expander, its owner removes it.
+            if mcp._i2c >= len(mcp.hardware_interfaces):
+                continue
+
+            i2c = mcp.hardware_interfaces[mcp._i2c]
+            try:
+                flags = i2c.read(mcp.address, mcp.INTFA, 4)
+            except OSError as error:
+                self._failed(mcp, subscriptions, error, now)
+                continue
+            if len(flags) < 2:
+                self._failed(mcp, subscriptions,
+                             OSError("Short read of the interrupt flags"), now)
+                continue
+
+            if failure is not None:
+                with self._condition:
+                    self._failures.pop(mcp, None)
+            yield mcp, flags
+
+    def _failed(self, mcp, subscriptions, error, now):
+        """Count a failed read of an expander, back off after repeated ones."""
+
+        with self._condition:
+            failures = self._failures.get(mcp, (0,))[0] + 1
+            retry = now
+            if failures >= self.ERROR_BACKOFF:
+                retry += min(sub[3] for sub in subscriptions if sub[0] is mcp)
+            self._failures[mcp] = (failures, error, retry)
+
+            for subscription in subscriptions:
+                if subscription[0] is mcp and subscription in self._errors:
+                    self._errors[subscription] += 1
@@ -0,0 +1,40 @@
+"""lazy_import.py"""
+
+import sys
+from importlib import import_module
+
+
+def lazy_attributes(package, exports):
+    """Create module level __getattr__ and __dir__ for lazy loading.
+
+    The returned functions import the module of an exported name only the
+    first time it is accessed and then cache the object on the package, so
+    later accesses don't pass through __getattr__ again.
+
+    Args:
+        package (str): The name of the package, usually __name__.
+        exports (dict): Maps every exported name to the relative module that
+            defines it, or to a tuple (module, attribute) for aliases.
+
+    Returns:
+        A tuple with the __getattr__ and __dir__ functions of the package.
+    """
+
+    def __getattr__(name):
+        try:
+            target = exports[name]
+        except KeyError:
+            raise AttributeError("module {!r} has no attribute "
+                                 "{!r}".format(package, name)) from None
+
+        module_name, attr = target if isinstance(target, tuple)\
+            else (target, name)
+        value = getattr(import_module(module_name, package), attr)
+        setattr(sys.modules[package], name, value)
+
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
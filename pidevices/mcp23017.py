@@ -1,28 +1,46 @@
 """mcp23017.py"""
 
 from .mcp23x17 import MCP23x17
-from sys import maxsize
-import sys
+from .register_cache import RegisterCache
+from .int_poller import IntPoller
 import atexit
-import time
 import threading
 
 
 class MCP23017(MCP23x17):
     """Class representing mcp23017 chip
     
+    Interrupts are detected by polling the INTF registers over i2c, or when
+    the INTA/INTB outputs of the chip are wired to gpio pins of the pi, see
+    :meth:`set_int_lines`, by reading them only after an edge of the lines.
+
     Args:
         bus (int): The i2c bus
         address (int): The hardware defined address of the module.
+        cache_registers (bool): Keep a shadow copy of the configuration
+            registers, so bit changes need only a write. Every driver of the
+            chip must enable it, changes from other processes are not seen.
+            Defaults to :data:`False`.
     """
 
-    def __init__(self, bus, address):
+    # Interrupt polling bursts shouldn't delay the other devices on the bus.
+    BUS_PRIORITY = -10
+
+    # Max seconds from an edge to the poll that sees it, without interrupt
+    # lines. Polling slows down to that while there are no interrupts.
+    poll_latency = 0.002
+
+    def __init__(self, bus, address, cache_registers=False):
         """Constructor."""
 
         atexit.register(self.stop)
         super(MCP23017, self).__init__()
         self._bus = bus
         self._address = address
+        self._cache_registers = cache_registers
+        self._int_gpio = None       # Interface of the INTA/INTB lines
+        self._int_lines = ()
+        self._int_wake = threading.Event()
         self.start()
 
     @property
@@ -47,25 +65,102 @@ class MCP23017(MCP23x17):
         """Init hardware and os resources."""
 
         self._i2c = self.init_interface('i2c', bus=self._bus)
+        if self._cache_registers:
+            self._cache = RegisterCache.shared(
+                self.hardware_interfaces[self._i2c], self._address,
+                volatile=self._volatile_registers())
         self.clear_ints()
     
+    def _chip_cache(self):
+        if self._cache is not None:
+            return self._cache
+        return RegisterCache.lookup(self.hardware_interfaces[self._i2c],
+                                    self._address)
+
+    def _atomic(self):
+        return self.hardware_interfaces[self._i2c].lock
+
     def _read_interface(self, address):
         return self.hardware_interfaces[self._i2c].read(self._address, address)
 
     def _write_interface(self, address, value):
         self.hardware_interfaces[self._i2c].write(self._address, address, value)
 
+    def read_ports(self):
+        if self.GPIOB != self.GPIOA + 1:
+            return super(MCP23017, self).read_ports()
+
+        # In bank 0 GPIOB follows GPIOA with and without sequential mode.
+        ports = self.hardware_interfaces[self._i2c].read(self._address,
+                                                         self.GPIOA, 2)
+
+        return ports[0] | ports[1] << 8
+
     def clear_ints(self):
         """Disable interrupts on every pin."""
-        self.hardware_interfaces[self._i2c].write(self._address,
-                                                  self.GPINTENA,
-                                                  0)
-        self.hardware_interfaces[self._i2c].write(self._address,
-                                                  self.GPINTENB,
-                                                  0)
+        self.hardware_interfaces[self._i2c].transaction(self._address)\
+            .write(self.GPINTENA, 0)\
+            .write(self.GPINTENB, 0)\
+            .execute()
+
+        cache = self._chip_cache()
+        if cache is not None:
+            cache.put(self.GPINTENA, 0)
+            cache.put(self.GPINTENB, 0)
+
+    def set_int_lines(self, inta, intb=None, impl=None):
+        """Detect interrupts from edges of the INTA/INTB outputs.
+
+        The outputs are configured active high and push pull and the gpio
+        pins get rising edge events. With only INTA connected the outputs
+        are mirrored, so INTA signals both ports. After that
+        :meth:`poll_int` waits for an edge instead of reading the INTF
+        registers continuously, the flags and the captured values are read
+        in one transfer only when a line is asserted.
+
+        Args:
+            inta (int): The bcm pin connected to INTA.
+            intb (int): The bcm pin connected to INTB. Defaults to
+                :data:`None` for mirrored outputs on INTA.
+            impl (str): The gpio implementation of the lines, e.x.
+                "RPiGPIO" or "PiGPIO". Defaults to the first installed.
+        """
+
+        pins = {"inta": inta} if intb is None else {"inta": inta,
+                                                     "intb": intb}
+        self._int_gpio = self.init_interface('gpio', impl=impl, **pins)
+        gpio = self.hardware_interfaces[self._int_gpio]
+        self._int_lines = tuple(sorted(pins))
+
+        self.set_mirror(int(intb is None))
+        self.set_odr(0)
+        self.set_intpol(1)
+
+        for line in self._int_lines:
+            gpio.init_input(line, "down")
+            gpio.set_pin_edge(line, "rising")
+            gpio.set_pin_event(line, self._int_line_event)
+
+    def _int_line_event(self, *args):
+        """Edge of an interrupt line, wakes the polling thread."""
+        self._int_wake.set()
+
+    def _wake_poll(self):
+        self._int_wake.set()
+
+    def _int_asserted(self):
+        """If an interrupt line is still active."""
+
+        gpio = self.hardware_interfaces[self._int_gpio]
+        return any(gpio.read(line) for line in self._int_lines)
 
     def poll_int(self, pin_nums):
         """Poll the interrupt bit for the specified pin.
+
+        The flags are polled by the :class:`IntPoller` of the bus, with
+        :attr:`poll_latency` as the max delay of an edge. With interrupt
+        lines, see :meth:`set_int_lines`, the function waits for their edges
+        instead and the bus is idle between interrupts.
         
         Args:
             pin_nums (list): List with the pin number in format A_x or B_x,
@@ -80,65 +175,57 @@ class MCP23017(MCP23x17):
         self._poll_flag = True
         self._poll_end = False
 
-        num_butes = 25  # How many bytes to read
-
         pin_nums = pin_nums if isinstance(pin_nums, list) else [pin_nums]
-
-        self.set_seqop(1)
-
-        bank = 1  # Bank 1 means only one register(A or B values)
-        # Check if it need both registers or just one.
-        prev = pin_nums[0].split('_')[0]
-        for pin_num in pin_nums[1:]:
-            if pin_num.split('_')[0] is not prev:
-                bank = 0
-                break
-        self.set_bank(bank)
-
-        # Get pin_nums and chunks
-        nums_chunks = [self._get_chunk_number(pin_num) for pin_num in pin_nums]
-
-        # Start register
-        if bank:
-            register = self.INTFA if nums_chunks[0][0] is 'A' else self.INTFB
-        else:
-            register = self.INTFA
-
-        step = 1 if bank else 2
-        both = step - 1  # Variable indicates if we need both registers, 0 for not
-
-        # Poll register
+        if self._int_gpio is not None:
+            self._poll_int_lines(pin_nums)
+            self._poll_end = True
+            return
+
+        poller = IntPoller.shared(self._bus)
+        subscription = poller.add(self, pin_nums, self._dispatch_int,
+                                  self.poll_latency)
         while self._poll_flag:
-            data = self.hardware_interfaces[self._i2c].read(self.address,
-                                                            register,
-                                                            num_butes)
-            # Or all the values in order to not having to skip a 1 after finding
-            # it. For example if the byte 2 is 01... then until byte 23 it would
-            # be 01 and will have to call it again.
-            for d, d_ in zip(data[::step], data[1::step]):
-                data[0] |= d
-                data[1] |= d_
-            
-            for i in range(0, step, step):
-                # Read for every register
-                for j, (chunk, num) in enumerate(nums_chunks):
-                    index = (ord(chunk) - ord('A'))*both + i    
-
-                    value = self._get_bit(data[index], num+1)
-
-                    #if chunk is 'A' and num is 0:
-                    #    print("Num {} and value {}".format(num, value))
-                    if value: 
-                        # Create a thread with the handling function
-                        threading.Thread(target=self._int_handlers[pin_nums[j]],
-                                         args=()).start()
+            self._int_wake.wait()
+            self._int_wake.clear()
+        poller.remove(subscription)
+        self._poll_end = True
+
+    def _poll_int_lines(self, pin_nums):
+        """Wait for the interrupt lines and dispatch the flagged pins."""
 
         self.set_seqop(0)
         self.set_bank(0)
-        self._poll_end = True
+        pins = []
+        for pin_num in pin_nums:
+            chunk, num = self._get_chunk_number(pin_num)
+            port = ord(chunk) - ord('A')
+            pins.append((pin_num, port, 1 << num))
+
+        i2c = self.hardware_interfaces[self._i2c]
+        # An interrupt may be pending from before the edge events
+        self._int_wake.set()
+        while self._poll_flag:
+            self._int_wake.wait()
+            self._int_wake.clear()
+
+            while self._poll_flag:
+                # INTFA, INTFB, INTCAPA, INTCAPB, reading INTCAP clears the
+                # interrupt and releases the line.
+                intf = i2c.read(self.address, self.INTFA, 4)[:2]
+                for pin_num, port, mask in pins:
+                    if intf[port] & mask:
+                        self._dispatch_int(pin_num)
+
+                # New interrupts while the flags were read keep the line
+                # active without a new edge.
+                if not self._int_asserted():
+                    break
 
     def wait_pin_for_edge(self, pin_num, timeout=None):
         """Wait for an edge signal on a pin.
+
+        The flags are polled by the :class:`IntPoller` of the bus, see
+        :meth:`poll_int`.
         
         Args:
             pin_num (str): The pin number in format A_x or B_x,
@@ -153,53 +240,35 @@ class MCP23017(MCP23x17):
         # Enable interrupts
         self.set_pin_int(pin_num, 1)
 
-        self.set_seqop(1)
-        self.set_bank(1)
-
-        chunk, pin_num = self._get_chunk_number(pin_num)
-        address = self.INTFA if chunk is 'A' else self.INTFB
-
-        num_butes = 24
-
-        # Use timeout
-        if timeout is None:
-            timeout = maxsize
-        else:
-            timeout /= 1000
-
-        iter_flag = 0
-        t_s = time.time()
-        while (not iter_flag) and (time.time() - t_s < timeout):
-            data = self.hardware_interfaces[self._i2c].read(self.address,
-                                                            address,
-                                                            num_butes)
-            for d in data:
-                iter_flag = self._get_bit(d, pin_num+1)
-
-        val = 1
-        while val:
-            data = self.hardware_interfaces[self._i2c].read(self.address,
-                                                            address,
-                                                            num_butes)
-            for d in data:
-                val = self._get_bit(d, pin_num+1)
-                self.read(chunk + "_" + str(pin_num))
+        edge = threading.Event()
+        poller = IntPoller.shared(self._bus)
+        subscription = poller.add(self, [pin_num], lambda pin: edge.set(),
+                                  self.poll_latency)
+        occurred = edge.wait(None if timeout is None else timeout / 1000)
+        poller.remove(subscription)
 
         # Disable interrupts
-        self.set_pin_int(chunk + "_" + str(pin_num), 0)
+        self.set_pin_int(pin_num, 0)
 
-        self.set_seqop(0)
-        self.set_bank(0)
-
-        return iter_flag
+        return int(occurred)
 
     def stop(self):
         """Free hardware and os resources."""
 
         self.stop_poll_int_async()
+        self._close_dispatcher()
+
+        if self._int_gpio is not None:
+            self.hardware_interfaces[self._int_gpio].close()
+            del self.hardware_interfaces[self._int_gpio]
+            self._int_gpio = None
 
         if len(self.hardware_interfaces):
             self.set_seqop(0)
             self.set_bank(0)
             self.hardware_interfaces[self._i2c].close()
             del self.hardware_interfaces[self._i2c]
+
+            if self._cache is not None:
+                RegisterCache.release(self._cache)
+                self._cache = None
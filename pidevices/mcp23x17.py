@@ -2,9 +2,15 @@
 
 import time
 import warnings
+from contextlib import contextmanager
 from threading import Thread
 from abc import abstractmethod, ABCMeta
 from .devices import Device
+from .dispatcher import Dispatcher
+from .register_map import Field
+
+# The bits of an 8 bit register, index 0 is the lowest bit.
+BIT_FIELDS = tuple(Field(shift=i, width=1) for i in range(8))
 
 
 class MCP23x17(Device): 
@@ -28,14 +34,22 @@ class MCP23x17(Device):
         between the two registers A,B.
     """
 
+    # Interrupt handlers run on a pool of INT_WORKERS threads, see
+    # Dispatcher. Interrupts of a pin whose handler is running and already
+    # has INT_PENDING calls waiting are coalesced.
+    INT_WORKERS = 2
+    INT_PENDING = 1
+
     def __init__(self):
         super(MCP23x17, self).__init__(name="", max_data_length=0)
         self._set_registers(0)
+        self._cache = None       # Optional RegisterCache, set by implementations
 
         self._debounce = {}      # Dictionary with debounce time for pins
         self._int_handlers = {}  # Dictionary with int handling function for pins
         self._poll_async = False
         self._poll_flag = False
+        self._dispatcher = None
     
     def set_pin_debounce(self, pin_num, value):
         """Set the debounce time for a pin.
@@ -84,7 +98,10 @@ class MCP23x17(Device):
         if self._poll_flag:
             warnings.warn("Already polling for interrupts")
         else:
-            Thread(target=self.poll_int, args=(pin_nums,)).start()
+            self._poll_flag = True
+            self._poll_thread = Thread(target=self.poll_int,
+                                       args=(pin_nums,))
+            self._poll_thread.start()
             self._poll_async = True
 
     def stop_poll_int_async(self):
@@ -92,10 +109,39 @@ class MCP23x17(Device):
 
         if self._poll_flag and self._poll_async:
             self._poll_flag = False
+            self._wake_poll()
 
             # Wait polling thread to exit
-            while not self._poll_end:
-                time.sleep(1)
+            self._poll_thread.join()
+
+    def _wake_poll(self):
+        """Wake a polling thread that waits, so it sees the stop flag."""
+        pass
+
+    def _dispatch_int(self, pin_num):
+        """Queue the interrupt handler of a pin to the dispatcher."""
+
+        if self._dispatcher is None:
+            self._dispatcher = Dispatcher(self.INT_WORKERS, self.INT_PENDING,
+                                          name="mcp23x17-int")
+        self._dispatcher.submit(pin_num, self._int_handlers[pin_num])
+
+    def int_statistics(self):
+        """Statistics of the interrupt handler dispatcher.
+
+        Returns:
+            dict: The dictionary of :meth:`Dispatcher.statistics`, empty
+            before the first interrupt.
+        """
+
+        if self._dispatcher is None:
+            return {}
+        return self._dispatcher.statistics()
+
+    def _close_dispatcher(self):
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+            self._dispatcher = None
 
     def _set_registers(self, bank):
         """Set the registers address."""
@@ -360,9 +406,16 @@ class MCP23x17(Device):
             value: Int represents the value.
         """
 
+        iocon = self.IOCON
         self._set_bit_register(self.IOCON, 8, value)
         self._set_registers(value)
 
+        # The addresses changed, the cached values are of other registers.
+        cache = self._chip_cache()
+        if cache is not None and self.IOCON != iocon:
+            cache.invalidate()
+            cache.volatile = self._volatile_registers()
+
     def get_bank(self):
         """Get bank bit.
 
@@ -638,7 +691,136 @@ class MCP23x17(Device):
         chunk, pin_num = self._get_chunk_number(pin_num)
         address = self.OLATA if chunk is 'A' else self.OLATB
         self._set_bit_register(address, pin_num+1, value)
-    
+
+    def write_olat_port(self, chunk, mask, bits):
+        """Write many pins of a port olat with one register write.
+
+        Args:
+            chunk (str): The port, A or B.
+            mask (int): The pins that are written, bit x is pin x.
+            bits (int): The new values of the pins in mask.
+        """
+
+        address = self.OLATA if chunk == 'A' else self.OLATB
+        with self._atomic():
+            register = self._read_register(address)
+            register = (register & ~mask) | (bits & mask)
+            self._write_register(address, register)
+
+    def read_port(self, chunk):
+        """Read the pins of a port.
+
+        Args:
+            chunk (str): The port, A or B.
+
+        Returns:
+            int: The GPIO register of the port, bit x is pin x.
+        """
+
+        return self._read_register(self.GPIOA if chunk == 'A' else self.GPIOB)
+
+    def read_ports(self):
+        """Read the pins of both ports.
+
+        Returns:
+            int: Port A in the low byte and port B in the high byte.
+        """
+
+        return self.read_port('A') | self.read_port('B') << 8
+
+    def write_ports(self, mask, bits):
+        """Write many pins of both ports, one olat write per port.
+
+        Args:
+            mask (int): The pins that are written, port A in the low byte
+                and port B in the high byte.
+            bits (int): The new values of the pins in mask.
+        """
+
+        for chunk, shift in (('A', 0), ('B', 8)):
+            port_mask = (mask >> shift) & 0xFF
+            if port_mask:
+                self.write_olat_port(chunk, port_mask, (bits >> shift) & 0xFF)
+
+    @property
+    def register_cache(self):
+        """The :class:`RegisterCache` of the chip or None if it is disabled."""
+        return self._cache
+
+    def _chip_cache(self):
+        """The register cache of the driver or, if it doesn't cache, the
+        cache other drivers of the chip share. None without either.
+        """
+        return self._cache
+
+    def _volatile_registers(self):
+        """Registers that the chip changes by itself and must not be cached."""
+        return (self.INTFA, self.INTFB, self.INTCAPA, self.INTCAPB,
+                self.GPIOA, self.GPIOB)
+
+    def resync_registers(self):
+        """Read again the cached registers, e.x. after a reset of the chip."""
+        if self._cache is not None:
+            self._cache.resync(self._read_interface)
+
+    def _read_register(self, address):
+        """Read a register through the register cache if it is enabled."""
+
+        cache = self._cache
+        if cache is None:
+            shared = self._chip_cache()
+            if shared is None:
+                return self._read_interface(address)
+
+            # Not cached here, but the value is fresh for the other drivers.
+            with self._atomic():
+                value = self._read_interface(address)
+                shared.put(address, value)
+            return value
+
+        value = cache.get(address)
+        if value is None:
+            value = self._read_interface(address)
+            cache.put(address, value)
+
+        return value
+
+    def _write_register(self, address, value):
+        """Write a register through the register cache if it is enabled.
+
+        Writes that don't change a cached register are skipped. Without a
+        cache of its own the driver still updates the cache other drivers of
+        the chip share.
+        """
+
+        cache = self._cache
+        if cache is None:
+            shared = self._chip_cache()
+            if shared is None:
+                self._write_interface(address, value)
+                return
+
+            with self._atomic():
+                self._write_interface(address, value)
+                self._put_written(shared, address, value)
+            return
+
+        if cache.peek(address) == value:
+            return
+        self._write_interface(address, value)
+        self._put_written(cache, address, value)
+
+    def _put_written(self, cache, address, value):
+        """Record a register write in a cache."""
+
+        cache.put(address, value)
+
+        # A write to the port is a write to its output latch.
+        if address == self.GPIOA:
+            cache.put(self.OLATA, value)
+        elif address == self.GPIOB:
+            cache.put(self.OLATB, value)
+
     def _read_interface(self, address):
         """Wrapper to interface read function."""
         pass
@@ -647,6 +829,14 @@ class MCP23x17(Device):
         """Wrapper to interface write function."""
         pass
 
+    @contextmanager
+    def _atomic(self):
+        """Context manager that makes a sequence of bus accesses atomic.
+
+        Implementations that share their bus override it to hold the bus.
+        """
+        yield
+
     def _set_bit_register(self, address, bit, value):
         """Set i'th bit in from register in address.
 
@@ -656,9 +846,11 @@ class MCP23x17(Device):
             value:
         """
 
-        register = self._read_interface(address)
-        register = self._set_bit(register, bit, value)
-        self._write_interface(address, register)
+        # Other threads must not write the register between read and write.
+        with self._atomic():
+            register = self._read_register(address)
+            register = self._set_bit(register, bit, value)
+            self._write_register(address, register)
 
     def _get_bit_register(self, address, bit):
         """Get i'th bit in from register in address.
@@ -671,47 +863,33 @@ class MCP23x17(Device):
             The i'th bit from register.
         """
 
-        register = self._read_interface(address)
+        register = self._read_register(address)
         
         return self._get_bit(register, bit)
 
-    def _set_bit(self, register, bit, value, res=8):
+    def _set_bit(self, register, bit, value):
         """Set value for specific bit in register in 8bit registers.
 
         Args:
             register: The 8 bit value.
-            bit: The i'th bit to be changed. It should be 1 to res.
+            bit: The i'th bit to be changed. It should be 1 to 8.
             value: 0 or 1.
-            res: The bit resolution of the register
 
         Returns:
             The new value of register.
         """
 
-        if bit < 1 or bit > res:
-            # raise exception
-            pass
-
-        max_val = 2**res - 1
-        mask = ((max_val << bit) | ((0x1 << (bit-1)) - 1)) & max_val
-        register &= mask
-
-        return register | (value << (bit-1))
+        return BIT_FIELDS[bit - 1].encode(register, value)
     
     def _get_bit(self, register, bit):
         """Get the value of a specific bit from register.
 
         Args:
             register: The value
-            bit: The i'th bit to be read. The value should be between
+            bit: The i'th bit to be read. It should be 1 to 8.
 
         Returns: 
             The value of the i'th bit of register.
         """
 
-        if bit < 1:
-            # raise exception
-            pass
-        bit -= 1
-
-        return (register & (0x1 << bit)) >> bit
+        return BIT_FIELDS[bit - 1].decode(register)
@@ -0,0 +1,220 @@
+"""odometry.py"""
+
+import math
+import threading
+import time
+from collections import namedtuple
+from .stats import RunningStats
+
+# The pose in meters and radians, the linear and angular velocity in m/s and
+# rad/s and the time.time() of the step that computed them.
+OdometryState = namedtuple("OdometryState",
+                           ["x", "y", "theta", "v", "omega", "timestamp"])
+
+
+class DifferentialOdometry(object):
+    """Odometry of a differential drive robot on a fixed rate thread.
+
+    Every period the thread takes the new pulses of the left and the right
+    :class:`DfRobotWheelEncoder`, integrates the pose with the midpoint of
+    the heading change and computes the velocity from the windowed wheel
+    velocities of the encoders. The encoders don't sense the direction, it
+    is the sign of the last speed of each motor, see
+    :attr:`MotorController.directions`, or forward without motors.
+
+    The state is published as an :class:`OdometryState` that is replaced,
+    never changed, so :meth:`state` doesn't block. The steps are scheduled
+    on a monotonic clock, a late step is counted in the jitter statistics
+    and the steps that it missed are skipped.
+
+    Args:
+        left: The encoder of the left wheel.
+        right: The encoder of the right wheel.
+        wheel_base (float): The distance of the wheels in meters.
+        wheel_radius (float): The radius of the wheels in meters.
+        rate (float): The steps per second. Defaults to :data:`100`.
+        motors: Optional motor controller, its first direction is the left
+            wheel and the second the right one.
+        name (str): The name of the thread.
+
+    Raises:
+        ValueError: If the geometry or the rate isn't positive.
+    """
+
+    def __init__(self, left, right, wheel_base, wheel_radius, rate=100,
+                 motors=None, name="odometry"):
+        """Constructor"""
+
+        if wheel_base <= 0 or wheel_radius <= 0:
+            raise ValueError("The wheel base and radius should be positive.")
+        if rate <= 0:
+            raise ValueError("The rate should be positive.")
+
+        self._left = left
+        self._right = right
+        self.wheel_base = wheel_base
+        self.wheel_radius = wheel_radius
+        self._period = 1. / rate
+        self._motors = motors
+        self._name = name
+
+        self._state = OdometryState(0.0, 0.0, 0.0, 0.0, 0.0, time.time())
+        self._reset = None
+        self._counts = (left.counts, right.counts)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.steps = 0
+        self.missed = 0
+        self._periods = RunningStats()
+        self._jitter = RunningStats()
+
+    @classmethod
+    def from_config(cls, left, right, config, motors=None):
+        """Create the odometry from a configuration dictionary.
+
+        Args:
+            left: The encoder of the left wheel.
+            right: The encoder of the right wheel.
+            config (dict): With the keys wheel_base and wheel_radius in
+                meters and optionally rate, e.x. a section of a json or yaml
+                file.
+            motors: Optional motor controller.
+
+        Returns:
+            :class:`DifferentialOdometry`
+        """
+
+        return cls(left, right, config["wheel_base"], config["wheel_radius"],
+                   rate=config.get("rate", 100), motors=motors)
+
+    @property
+    def rate(self):
+        """The steps per second."""
+        return 1. / self._period
+
+    def state(self):
+        """The latest state.
+
+        Returns:
+            :class:`OdometryState`
+        """
+        return self._state
+
+    def reset(self, x=0.0, y=0.0, theta=0.0):
+        """Set the pose, it applies on the next step.
+
+        Args:
+            x (float): Meters. Defaults to :data:`0`.
+            y (float): Meters. Defaults to :data:`0`.
+            theta (float): Radians. Defaults to :data:`0`.
+        """
+
+        self._reset = (x, y, theta)
+        if self._thread is None:
+            self._apply_reset()
+
+    def start(self):
+        """Start the thread, the pulses until now are not counted."""
+
+        if self._thread is not None:
+            return
+
+        self._counts = (self._left.counts, self._right.counts)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread, the state keeps the last step."""
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def statistics(self):
+        """Timing of the steps.
+
+        Returns:
+            dict: The achieved "rate" in Hz, the steps, the missed periods
+            and the statistics of the seconds from the deadline to the start
+            of every step in "jitter", see :meth:`RunningStats.as_dict`.
+        """
+
+        mean = self._periods.mean
+        return {"rate": 1 / mean if mean else None,
+                "steps": self.steps,
+                "missed": self.missed,
+                "jitter": self._jitter.as_dict()}
+
+    def _run(self):
+        clock = time.perf_counter
+        period = self._period
+        deadline = clock() + period
+        last = None
+        while not self._stop.wait(max(deadline - clock(), 0)):
+            now = clock()
+            self._jitter.add(now - deadline)
+            if last is not None:
+                self._periods.add(now - last)
+            last = now
+
+            self.step()
+
+            deadline += period
+            behind = clock() - deadline
+            if behind > period:
+                # Skip the periods that the step missed
+                skipped = int(behind / period)
+                self.missed += skipped
+                deadline += skipped * period
+
+    def _apply_reset(self):
+        x, y, theta = self._reset
+        self._reset = None
+        state = self._state
+        self._state = state._replace(x=x, y=y, theta=theta,
+                                     timestamp=time.time())
+
+    def step(self):
+        """Integrate the pulses since the last step, called by the thread."""
+
+        if self._reset is not None:
+            self._apply_reset()
+
+        left, right = self._left, self._right
+        counts = (left.counts, right.counts)
+        # A counter that was set lower starts over.
+        pulses = [max(new - old, 0) for new, old in zip(counts, self._counts)]
+        self._counts = counts
+
+        directions = (1, 1) if self._motors is None else \
+            self._motors.directions
+        radius = self.wheel_radius
+        d_left = directions[0] * pulses[0] * 2 * math.pi * radius / left.res
+        d_right = directions[1] * pulses[1] * 2 * math.pi * radius / right.res
+        v_left = directions[0] * left.velocity() * radius
+        v_right = directions[1] * right.velocity() * radius
+
+        state = self._state
+        distance = (d_left + d_right) / 2
+        turn = (d_right - d_left) / self.wheel_base
+        heading = state.theta + turn / 2
+        theta = math.atan2(math.sin(state.theta + turn),
+                           math.cos(state.theta + turn))
+
+        self._state = OdometryState(state.x + distance * math.cos(heading),
+                                    state.y + distance * math.sin(heading),
+                                    theta,
+                                    (v_left + v_right) / 2,
+                                    (v_right - v_left) / self.wheel_base,
+                                    time.time())
+        self.steps += 1
+
+    def close(self):
+        """Stop the thread."""
+        self.stop()
@@ -0,0 +1,190 @@
+"""register_cache.py"""
+
+import threading
+
+
+class RegisterCache(object):
+    """Write-through shadow copy of the registers of a device.
+
+    Configuration registers change only when the driver writes them, so
+    after the first read their value is known and a read-modify-write of a
+    few bits needs only the write. The cache keeps the last value read from
+    or written to every register except the volatile ones, status, data and
+    self clearing registers, that always go to the bus.
+
+    The cache doesn't access the bus itself. A driver asks :meth:`get` first
+    and reads the bus on a miss, then records every value it reads or writes
+    with :meth:`put`. After anything that changes the registers behind the
+    driver's back, like a reset, the cache must be dropped with
+    :meth:`invalidate` or refreshed with :meth:`resync`.
+
+    Drivers of the same chip must see the same registers, so caches are
+    usually created with :meth:`shared` that returns one cache per bus
+    connection and slave address.
+
+    Args:
+        volatile: Iterable with the addresses of the registers that must not
+            be cached.
+    """
+
+    _mutex = threading.Lock()
+    _shared = {}
+
+    def __init__(self, volatile=()):
+        """Constructor"""
+
+        self._volatile = frozenset(volatile)
+        self._values = {}
+        self._key = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls, i2c, address, volatile=()):
+        """Get the cache of a slave, creating it if needed.
+
+        Args:
+            i2c: The bus interface of the device, handles of the same
+                :class:`BusPool` connection share their caches.
+            address (int): The address of the slave.
+            volatile: Iterable with the volatile registers, used only when
+                the cache is created.
+
+        Returns:
+            :class:`RegisterCache`
+        """
+
+        key = cls._shared_key(i2c, address)
+        with cls._mutex:
+            entry = cls._shared.get(key)
+            if entry is None:
+                entry = [cls(volatile), 0]
+                entry[0]._key = key
+                cls._shared[key] = entry
+            entry[1] += 1
+
+        return entry[0]
+
+    @classmethod
+    def lookup(cls, i2c, address):
+        """Get the shared cache of a slave if a driver created one.
+
+        Drivers that don't cache use it to keep the cache of the other
+        drivers of the chip up to date, they don't become its users.
+
+        Args:
+            i2c: The bus interface of the device.
+            address (int): The address of the slave.
+
+        Returns:
+            :class:`RegisterCache` or None.
+        """
+
+        with cls._mutex:
+            entry = cls._shared.get(cls._shared_key(i2c, address))
+
+        return entry[0] if entry is not None else None
+
+    @staticmethod
+    def _shared_key(i2c, address):
+        return (getattr(i2c, "_pool_key", None) or id(i2c), address)
+
+    @classmethod
+    def release(cls, cache):
+        """Release a cache from :meth:`shared`, it is dropped by the last user.
+
+        Args:
+            cache (RegisterCache): The cache.
+        """
+
+        with cls._mutex:
+            entry = cls._shared.get(cache._key)
+            if entry is None or entry[0] is not cache:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del cls._shared[cache._key]
+
+    @property
+    def volatile(self):
+        """The registers that are never cached.
+
+        Setting it, e.x. after the register map of the chip changed, drops
+        the cached values of the new volatile registers.
+        """
+        return self._volatile
+
+    @volatile.setter
+    def volatile(self, registers):
+        self._volatile = frozenset(registers)
+        self.invalidate(self._volatile)
+
+    def get(self, register):
+        """Get the cached value of a register.
+
+        Args:
+            register (int): The address of the register.
+
+        Returns:
+            The value or None if the register isn't cached, then the caller
+            reads the bus.
+        """
+
+        value = self._values.get(register)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def peek(self, register):
+        """Like :meth:`get` without counting a hit or a miss."""
+        return self._values.get(register)
+
+    def put(self, register, value):
+        """Record a value read from or written to a register.
+
+        Values of volatile registers are ignored.
+
+        Args:
+            register (int): The address of the register.
+            value (int): The value.
+        """
+
+        if register not in self._volatile:
+            self._values[register] = value
+
+    def invalidate(self, registers=None):
+        """Forget cached values.
+
+        Args:
+            registers: Iterable with registers to forget. Defaults to every
+                register.
+        """
+
+        if registers is None:
+            self._values.clear()
+        else:
+            for register in registers:
+                self._values.pop(register, None)
+
+    def resync(self, read, registers=None):
+        """Read cached registers again from the device.
+
+        Args:
+            read: Function that reads a register from the bus,
+                read(register) -> value.
+            registers: Iterable with the registers to read. Defaults to every
+                cached register.
+        """
+
+        registers = list(self._values) if registers is None else registers
+        for register in registers:
+            self.put(register, read(register))
+
+    def __contains__(self, register):
+        return register in self._values
+
+    def __len__(self):
+        return len(self._values)
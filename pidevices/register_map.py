@@ -0,0 +1,262 @@
+"""register_map.py"""
+
+import struct
+
+
+class Field(object):
+    """A bit field inside an 8 bit register.
+
+    The mask and the sign bit are computed once, so getting and setting the
+    field are a couple of integer operations.
+
+    Args:
+        address (int): The address of the register. It can be None for
+            fields used only to encode and decode values.
+        shift (int): The position of the lowest bit. Defaults to :data:`0`.
+        width (int): The number of bits. Defaults to :data:`8`.
+        signed (bool): If the field is a two's complement number.
+            Defaults to :data:`False`.
+    """
+
+    __slots__ = ("address", "shift", "width", "mask", "signed", "_sign")
+
+    size = 1
+
+    def __init__(self, address=None, shift=0, width=8, signed=False):
+        """Constructor"""
+
+        if shift < 0 or width < 1 or shift + width > 8:
+            raise ValueError("The field must fit in 8 bits.")
+
+        self.address = address
+        self.shift = shift
+        self.width = width
+        self.mask = ((1 << width) - 1) << shift
+        self.signed = signed
+        self._sign = 1 << (width - 1) if signed else 0
+
+    def decode(self, raw):
+        """Get the field from the value of its register."""
+
+        value = (raw & self.mask) >> self.shift
+        if value & self._sign:
+            value -= self._sign << 1
+
+        return value
+
+    def encode(self, raw, value):
+        """Set the field in the value of its register.
+
+        Args:
+            raw (int): The current value of the register.
+            value (int): The new value of the field.
+
+        Returns:
+            int: The new value of the register.
+        """
+
+        return (raw & ~self.mask & 0xFF) | ((value << self.shift) & self.mask)
+
+    def unpack(self, data, offset=0):
+        """Decode the field from a block of bytes that was read."""
+        return self.decode(data[offset])
+
+
+class Value(object):
+    """A number stored in consecutive registers.
+
+    The bytes are decoded with a precompiled :class:`struct.Struct`, for
+    example ``">h"`` for a big endian signed 16 bit value. Values that don't
+    fill their bytes, like the 20 bit adc results of many sensors, take the
+    number of bits and their position after decoding.
+
+    Args:
+        address (int): The address of the first register.
+        fmt (str): A struct format with a byte order and one integer type, or
+            ``">3"``/``"<3"`` for 3 byte unsigned values.
+        shift (int): Right shift applied after decoding. Defaults to :data:`0`.
+        width (int): The number of bits kept after the shift. Defaults to
+            every bit.
+        signed (bool): If the shifted bits are a two's complement number.
+            Defaults to :data:`False`, signed struct formats are already
+            signed.
+    """
+
+    __slots__ = ("address", "size", "shift", "mask", "_struct", "_sign",
+                 "_order")
+
+    def __init__(self, address, fmt, shift=0, width=None, signed=False):
+        """Constructor"""
+
+        self.address = address
+        if fmt[1:] == "3":
+            self._struct = None
+            self._order = "big" if fmt[0] == ">" else "little"
+            self.size = 3
+        else:
+            self._struct = struct.Struct(fmt)
+            self._order = None
+            self.size = self._struct.size
+
+        self.shift = shift
+        self.mask = (1 << width) - 1 if width else -1
+        self._sign = 1 << (width - 1) if signed and width else 0
+
+    def unpack(self, data, offset=0):
+        """Decode the value from a block of bytes.
+
+        Args:
+            data: A bytes like object.
+            offset (int): The position of the value in data.
+
+        Returns:
+            int: The value.
+        """
+
+        if self._struct is not None:
+            value = self._struct.unpack_from(data, offset)[0]
+        else:
+            value = int.from_bytes(data[offset:offset + self.size],
+                                   self._order)
+
+        value = (value >> self.shift) & self.mask
+        if value & self._sign:
+            value -= self._sign << 1
+
+        return value
+
+    def pack(self, value):
+        """Encode a value to the list of bytes of its registers."""
+
+        if self._struct is not None:
+            return list(self._struct.pack(value << self.shift))
+
+        return list((value << self.shift).to_bytes(self.size, self._order))
+
+
+class ReadPlan(object):
+    """Precomputed block reads for a set of register map entries.
+
+    Entries in nearby registers share one block read. Plans are created and
+    cached by :meth:`RegisterMap.plan`.
+
+    Args:
+        entries (list): Tuples (name, entry) of :class:`Field` or
+            :class:`Value` objects.
+        max_gap (int): The max number of unused registers inside a block.
+    """
+
+    def __init__(self, entries, max_gap):
+        """Constructor"""
+
+        blocks = []             # [start, end)
+        self._layout = []       # (name, entry, block index, offset)
+        for name, entry in sorted(entries, key=lambda e: e[1].address):
+            start = entry.address
+            end = start + entry.size
+            if blocks and start - blocks[-1][1] <= max_gap:
+                blocks[-1][1] = max(blocks[-1][1], end)
+            else:
+                blocks.append([start, end])
+            self._layout.append((name, entry, len(blocks) - 1,
+                                 start - blocks[-1][0]))
+
+        self.blocks = [(start, end - start) for start, end in blocks]
+
+    def queue(self, transaction):
+        """Queue the block reads to an :class:`I2CTransaction`.
+
+        Returns:
+            int: The number of queued reads.
+        """
+
+        for start, length in self.blocks:
+            transaction.read(start, length)
+
+        return len(self.blocks)
+
+    def decode(self, blocks):
+        """Decode the entries from the read blocks.
+
+        Args:
+            blocks (list): The result of every block read in order, lists of
+                bytes or bytes like objects.
+
+        Returns:
+            dict: Maps the name of every entry to its value.
+        """
+
+        blocks = [bytes(block) for block in blocks]
+
+        return {name: entry.unpack(blocks[index], offset)
+                for name, entry, index, offset in self._layout}
+
+
+class RegisterMap(object):
+    """Declarative description of the registers of a device.
+
+    A driver declares its fields and values once, with their address, width,
+    byte order and signedness, and reads any group of them with
+    :meth:`read`, that coalesces them in as few block reads as possible and
+    sends them in one i2c transaction.
+
+    Args:
+        entries (dict): Maps names to :class:`Field` and :class:`Value`
+            objects.
+        max_gap (int): Registers closer than that are read in the same block
+            even if the registers between them aren't needed. Defaults to
+            :data:`4`.
+    """
+
+    def __init__(self, entries, max_gap=4):
+        """Constructor"""
+
+        self._entries = dict(entries)
+        self._max_gap = max_gap
+        self._plans = {}
+
+    def __getitem__(self, name):
+        return self._entries[name]
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def plan(self, names):
+        """Get the cached :class:`ReadPlan` of some entries.
+
+        Args:
+            names: Iterable with entry names.
+
+        Returns:
+            :class:`ReadPlan`
+        """
+
+        key = tuple(names)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = ReadPlan([(name, self._entries[name]) for name in key],
+                            self._max_gap)
+            self._plans[key] = plan
+
+        return plan
+
+    def read(self, i2c, address, names):
+        """Read entries in one transaction.
+
+        Args:
+            i2c (I2C): The i2c interface.
+            address (int): The address of the slave.
+            names: Iterable with entry names.
+
+        Returns:
+            dict: Maps every name to its value.
+        """
+
+        plan = self.plan(names)
+        transaction = i2c.transaction(address)
+        plan.queue(transaction)
+
+        return plan.decode(transaction.execute())
@@ -0,0 +1,135 @@
+"""ring_buffer.py"""
+
+
+class ArrayRingBuffer(object):
+    """Fixed size ring buffer backed by a preallocated numpy array.
+
+    The buffer is allocated twice the capacity and every element is written
+    in both halves. That way any window of the last n elements is a
+    contiguous slice of the array, so windows are returned as numpy views
+    without copying even when they wrap around the end of the ring.
+
+    Args:
+        capacity (int): The max number of elements that the buffer holds.
+        dtype: A numpy dtype, for example :data:`"f8"` for scalar samples or
+            a record layout like :data:`[("x", "f4"), ("y", "f4")]`.
+        shape (tuple): Optional shape of every element for vector samples.
+            Defaults to :data:`()`.
+
+    Raises:
+        ImportError: If numpy is not installed.
+        ValueError: If capacity is smaller than 1.
+    """
+
+    def __init__(self, capacity, dtype, shape=()):
+        """Constructor"""
+
+        # Imported here, numpy is heavy and every device imports this module.
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("failed to import numpy")
+
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Invalid capacity, should be a positive integer.")
+
+        self._capacity = capacity
+        self._buffer = numpy.zeros((2 * capacity,) + tuple(shape), dtype=dtype)
+        self._head = 0      # Index of the next write in [0, capacity)
+        self._length = 0
+
+    @property
+    def capacity(self):
+        """The max number of elements of the buffer."""
+        return self._capacity
+
+    @property
+    def dtype(self):
+        """The numpy dtype of the elements."""
+        return self._buffer.dtype
+
+    def __len__(self):
+        return self._length
+
+    def append(self, value):
+        """Write a value in place, overwriting the oldest one if full.
+
+        Args:
+            value: A scalar, a tuple for record dtypes or an array like with
+                the element's shape.
+        """
+
+        head = self._head
+        self._buffer[head] = value
+        self._buffer[head + self._capacity] = value
+
+        head += 1
+        self._head = 0 if head == self._capacity else head
+        if self._length < self._capacity:
+            self._length += 1
+
+    def last(self, n=None):
+        """Get the last n elements, oldest first.
+
+        Args:
+            n (int): How many elements to return. Defaults to all the stored
+                elements.
+
+        Returns:
+            A read only numpy view of the buffer.
+        """
+
+        n = self._length if n is None else min(n, self._length)
+        end = self._head + self._capacity
+
+        return self._readonly(self._buffer[end - n:end])
+
+    def window(self, start, end):
+        """Get the elements in [start, end) counting from the oldest element.
+
+        Negative indexes count from the newest element like python slices.
+
+        Args:
+            start (int): Start index.
+            end (int): End index.
+
+        Returns:
+            A read only numpy view of the buffer.
+
+        Raises:
+            IndexError: Start index out of range or start after end.
+        """
+
+        length = self._length
+        start = start if start >= 0 else length + start
+        end = end if end >= 0 else length + end
+        if start < 0 or start > length or end > length:
+            raise IndexError("Window out of range.")
+        if start > end:
+            raise IndexError("Start value after end value.")
+
+        # Position of the oldest element inside the mirrored buffer.
+        first = self._head + self._capacity - length
+
+        return self._readonly(self._buffer[first + start:first + end])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.last()[index]
+
+        length = self._length
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("Ring buffer index out of range.")
+
+        return self._buffer[self._head + self._capacity - length + index]
+
+    def clear(self):
+        """Drop every element without releasing the memory."""
+        self._head = 0
+        self._length = 0
+
+    def _readonly(self, view):
+        view.flags.writeable = False
+        return view
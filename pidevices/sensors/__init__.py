@@ -1,22 +1,112 @@
-"""Import all sensors here."""
+"""Import all sensors here.
 
-from .ads1x15 import *
-from .bme680 import *
-from .button import *
-from .button_array import *
-from .cytron_line_sensor_lss05 import *
-from .distance_sensor import *
-from .gas_sensor import *
-from .sharp_gp20axxx0f import *
-from .hc_sr04 import *
-from .humidity_sensor import *
-from .line_follower import *
-from .mcp3002 import *
-from .microphone import *
-from .picamera import *
-from .pressure_sensor import *
-from .temperature_sensor import *
-from .df_robot_wheel_encoders import *
-from .vl53l1x import *
-from .icm_20948_imu import *
-from .cv2_camera import Camera as CV2Camera, CameraError, CameraReadError, CameraUnavailable, CameraConvertionError
+The sensor modules are imported lazily, the first time one of their names is
+accessed, so using one driver doesn't import the libraries of every other.
+"""
+
+from ..lazy_import import lazy_attributes
+
+_EXPORTS = {
+    'ADS1X15': '.ads1x15',
+    'BME680': '.bme680',
+    't_cal': '.bme680',
+    'p_cal': '.bme680',
+    'h_cal': '.bme680',
+    'g_cal': '.bme680',
+    'bme860_data': '.bme680',
+    'Button': '.button',
+    'ButtonRPiGPIO': '.button',
+    'ButtonMcp23017': '.button',
+    'ButtonArray': '.button_array',
+    'ButtonArrayRPiGPIO': '.button_array',
+    'ButtonArrayMcp23017': '.button_array',
+    'CytronLfLSS05': '.cytron_line_sensor_lss05',
+    'CytronLfLSS05Rpi': '.cytron_line_sensor_lss05',
+    'CytronLfLSS05Mcp23017': '.cytron_line_sensor_lss05',
+    'cytron_res': '.cytron_line_sensor_lss05',
+    'DistanceSensor': '.distance_sensor',
+    'GasSensor': '.gas_sensor',
+    'GP2Y0AxxxK0F': '.sharp_gp20axxx0f',
+    'GP2Y0A21YK0F': '.sharp_gp20axxx0f',
+    'GP2Y0A41SK0F': '.sharp_gp20axxx0f',
+    'HcSr04': '.hc_sr04',
+    'HcSr04RPiGPIO': '.hc_sr04',
+    'HcSr04PiGPIO': '.hc_sr04',
+    'HcSr04Mcp23017': '.hc_sr04',
+    'SonarScheduler': '.sonar_scheduler',
+    'SonarReading': '.sonar_scheduler',
+    'HumiditySensor': '.humidity_sensor',
+    'LineFollower': '.line_follower',
+    'Mcp3002': '.mcp3002',
+    'Microphone': '.microphone',
+    'TimeStampedStream': '.picamera',
+    'Camera': '.picamera',
+    'Dims': '.picamera',
+    'CameraData': '.picamera',
+    'PressureSensor': '.pressure_sensor',
+    'TemperatureSensor': '.temperature_sensor',
+    'DfRobotWheelEncoder': '.df_robot_wheel_encoders',
+    'DfRobotWheelEncoderPiGPIO': '.df_robot_wheel_encoders',
+    'DfRobotWheelEncoderRpiGPIO': '.df_robot_wheel_encoders',
+    'DfRobotWheelEncoderMcp23017': '.df_robot_wheel_encoders',
+    'VL53L1xError': '.vl53l1x',
+    'VL53L1xDistanceMode': '.vl53l1x',
+    'VL53L1X': '.vl53l1x',
+    'ICM_20948': '.icm_20948_imu',
+    'icm_data': '.icm_20948_imu',
+    'meas_data': '.icm_20948_imu',
+    'CHIP_ID': '.icm_20948_imu',
+    'I2C_ADDR_ALT': '.icm_20948_imu',
+    'ICM20948_BANK_SEL': '.icm_20948_imu',
+    'ICM20948_I2C_MST_ODR_CONFIG': '.icm_20948_imu',
+    'ICM20948_I2C_MST_CTRL': '.icm_20948_imu',
+    'ICM20948_I2C_MST_DELAY_CTRL': '.icm_20948_imu',
+    'ICM20948_I2C_SLV0_ADDR': '.icm_20948_imu',
+    'ICM20948_I2C_SLV0_REG': '.icm_20948_imu',
+    'ICM20948_I2C_SLV0_CTRL': '.icm_20948_imu',
+    'ICM20948_I2C_SLV0_DO': '.icm_20948_imu',
+    'ICM20948_EXT_SLV_SENS_DATA_00': '.icm_20948_imu',
+    'ICM20948_GYRO_SMPLRT_DIV': '.icm_20948_imu',
+    'ICM20948_GYRO_CONFIG_1': '.icm_20948_imu',
+    'ICM20948_GYRO_CONFIG_2': '.icm_20948_imu',
+    'ICM20948_WHO_AM_I': '.icm_20948_imu',
+    'ICM20948_USER_CTRL': '.icm_20948_imu',
+    'ICM20948_PWR_MGMT_1': '.icm_20948_imu',
+    'ICM20948_PWR_MGMT_2': '.icm_20948_imu',
+    'ICM20948_INT_PIN_CFG': '.icm_20948_imu',
+    'ICM20948_ACCEL_SMPLRT_DIV_1': '.icm_20948_imu',
+    'ICM20948_ACCEL_SMPLRT_DIV_2': '.icm_20948_imu',
+    'ICM20948_ACCEL_INTEL_CTRL': '.icm_20948_imu',
+    'ICM20948_ACCEL_WOM_THR': '.icm_20948_imu',
+    'ICM20948_ACCEL_CONFIG': '.icm_20948_imu',
+    'ICM20948_ACCEL_XOUT_H': '.icm_20948_imu',
+    'ICM20948_GRYO_XOUT_H': '.icm_20948_imu',
+    'ICM20948_TEMP_OUT_H': '.icm_20948_imu',
+    'AK09916_I2C_ADDR': '.icm_20948_imu',
+    'AK09916_CHIP_ID': '.icm_20948_imu',
+    'AK09916_WIA': '.icm_20948_imu',
+    'AK09916_ST1': '.icm_20948_imu',
+    'AK09916_ST1_DOR': '.icm_20948_imu',
+    'AK09916_ST1_DRDY': '.icm_20948_imu',
+    'AK09916_HXL': '.icm_20948_imu',
+    'AK09916_ST2': '.icm_20948_imu',
+    'AK09916_ST2_HOFL': '.icm_20948_imu',
+    'AK09916_CNTL2': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_OFF': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_SINGLE': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_CONT1': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_CONT2': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_CONT3': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_CONT4': '.icm_20948_imu',
+    'AK09916_CNTL2_MODE_TEST': '.icm_20948_imu',
+    'AK09916_CNTL3': '.icm_20948_imu',
+    'CV2Camera': ('.cv2_camera', 'Camera'),
+    'CameraError': '.cv2_camera',
+    'CameraReadError': '.cv2_camera',
+    'CameraUnavailable': '.cv2_camera',
+    'CameraConvertionError': '.cv2_camera',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPORTS)
@@ -1,9 +1,13 @@
+import struct
 import time
 from math import ceil
 from .humidity_sensor import HumiditySensor
 from .temperature_sensor import TemperatureSensor
 from .gas_sensor import GasSensor
 from .pressure_sensor import PressureSensor
+from ..calibration_cache import CalibrationCache
+from ..register_cache import RegisterCache
+from ..register_map import RegisterMap, Field, Value
 from collections import namedtuple
 
 
@@ -75,6 +79,11 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
     RES_HEAT_RANGE = 0x02
     RES_HEAT_VAL = 0x00
 
+    # Registers that change without a write, the measurement data and status
+    # and ctrl_meas whose mode bits return to sleep after a forced measurement.
+    VOLATILE_REGISTERS = tuple(range(MEAS_STATUS_0, GAS_R_LSB + 1)) +\
+        (STATUS, CTRL_MEAS, RESET)
+
     # Bits to shift for setting/reading bits in registers
 
     # CONFIG register
@@ -135,6 +144,80 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
     NEW_DATA_0 = 7
     NEW_DATA_0_BITS = 1
 
+    # Fields of the control and status registers
+    REGISTER_MAP = RegisterMap({
+        "spi_3w_en": Field(CONFIG, SPI_3W_EN, SPI_3W_EN_BITS),
+        "filter": Field(CONFIG, FILTER, FILTER_BITS),
+        "mode": Field(CTRL_MEAS, MODE, MODE_BITS),
+        "osrs_p": Field(CTRL_MEAS, OSRS_P, OSRS_P_BITS),
+        "osrs_t": Field(CTRL_MEAS, OSRS_T, OSRS_T_BITS),
+        "osrs_h": Field(CTRL_HUM, OSRS_H, OSRS_H_BITS),
+        "spi_3w_int_en": Field(CTRL_HUM, SPI_3W_INT_EN, SPI_3W_INT_EN_BITS),
+        "nb_conv": Field(CTRL_GAS_1, NB_CONV, NB_CONV_BITS),
+        "run_gas": Field(CTRL_GAS_1, RUN_GUS, RUN_GUS_BITS),
+        "heat_off": Field(CTRL_GAS_0, HEAT_OFF, HEAT_OFF_BITS),
+        "gas_range_r": Field(GAS_R_LSB, GAS_RANGE_R, GAS_RANGE_R_BITS),
+        "heat_stab_r": Field(GAS_R_LSB, HEAF_STAB_R, HEAF_STAB_R_BITS),
+        "gas_valid_r": Field(GAS_R_LSB, GAS_VALID_R, GAS_VALID_R_BITS),
+        "gas_meas_index": Field(MEAS_STATUS_0, GAS_MEAS_INDEX,
+                                GAS_MEAS_INDEX_BITS),
+        "measuring": Field(MEAS_STATUS_0, MEASURING, MEASURING_BITS),
+        "gas_measuring": Field(MEAS_STATUS_0, GAS_MEASURING,
+                               GAS_MEASURING_BITS),
+        "new_data_0": Field(MEAS_STATUS_0, NEW_DATA_0, NEW_DATA_0_BITS),
+        "range_sw_err": Field(0x04, 4, 4, signed=True),
+    })
+
+    # Calibration parameters, types from the datasheet. The two 12 bit
+    # humidity parameters share the nibbles of one register.
+    CALIBRATION_MAP = RegisterMap({
+        "par_t1": Value(PAR_T1_l, "<H"),
+        "par_t2": Value(PAR_T2_l, "<h"),
+        "par_t3": Value(PAR_T3, "b"),
+        "par_p1": Value(PAR_P1_l, "<H"),
+        "par_p2": Value(PAR_P2_l, "<h"),
+        "par_p3": Value(PAR_P3, "b"),
+        "par_p4": Value(PAR_P4_l, "<h"),
+        "par_p5": Value(PAR_P5_l, "<h"),
+        "par_p6": Value(PAR_P6, "b"),
+        "par_p7": Value(PAR_P7, "b"),
+        "par_p8": Value(PAR_P8_l, "<h"),
+        "par_p9": Value(PAR_P9_l, "<h"),
+        "par_p10": Value(PAR_P10, "B"),
+        "par_h1_msb": Value(PAR_H1_h, "B"),
+        "par_h1_lsb": Field(PAR_H1_l, 0, 4),
+        "par_h2_msb": Value(PAR_H2_h, "B"),
+        "par_h2_lsb": Field(PAR_H2_l, 4, 4),
+        "par_h3": Value(PAR_H3, "b"),
+        "par_h4": Value(PAR_H4, "b"),
+        "par_h5": Value(PAR_H5, "b"),
+        "par_h6": Value(PAR_H6, "B"),
+        "par_h7": Value(PAR_H7, "b"),
+        "par_g1": Value(PAR_G1, "b"),
+        "par_g2": Value(PAR_G2_L, "<h"),
+        "par_g3": Value(PAR_G3, "b"),
+        "res_heat_range": Field(RES_HEAT_RANGE, 4, 2),
+        "res_heat_val": Value(RES_HEAT_VAL, "b"),
+        "range_sw_err": Field(0x04, 4, 4, signed=True),
+    })
+
+    # The chip id and a trimmed parameter, read in one transaction to check
+    # that cached calibration parameters belong to the chip.
+    IDENTITY_MAP = RegisterMap({
+        "chip_id": Value(ID, "B"),
+        "par_t1": Value(PAR_T1_l, "<H"),
+    })
+
+    # The field 0 data block, MEAS_STATUS_0 to GAS_R_LSB: the status, the
+    # pressure and the temperature as msb, lsb and xlsb, the humidity and
+    # the gas resistance with its range and status bits.
+    FIELD_0 = struct.Struct(">BxHBHBH3xH")
+
+    # Microseconds of a measurement cycle and of the tph and gas switching,
+    # from the Bosch driver.
+    MEAS_CYCLE_US = 1963
+    SWITCH_US = 477 * 4 + 477 * 5
+
     MODES = {"sleep": 0, "forced": 1}
     OVERSAMPLING = {0: 0, 1: 1, 2: 2, 4: 3, 8: 4, 16: 5}
     IIR = {0: 0, 1: 1, 3: 2, 7: 3, 15: 4, 31: 5, 63: 6, 127: 7}
@@ -154,16 +237,32 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
                  slave, t_oversample=1, 
                  p_oversample=0, h_oversample=0,
                  iir_coef=0, gas_status=0,
-                 name="", max_data_length=1):
+                 name="", max_data_length=1, cache_registers=False,
+                 calibration_cache=None, data_dtype=None, data_shape=()):
         """Constructor
 
         Args:
             bus (int): The i2c bus.
             slave (int): The slave address. Should be 0 or 1
+            cache_registers (bool): Keep a shadow copy of the configuration
+                registers, so setting a parameter needs only a write.
+            calibration_cache: Keep the calibration parameters on disk,
+                True for the default :class:`CalibrationCache`, a path or
+                a cache. Defaults to no cache.
+            data_dtype: Optional numpy dtype of the data samples, see
+                :class:`Device`.
+            data_shape (tuple): Optional shape of the data samples.
         """
 
-        super(BME680, self).__init__(name, max_data_length)
+        super(BME680, self).__init__(name, max_data_length, data_dtype,
+                                     data_shape)
         self._bus = bus
+        self._cache_registers = cache_registers
+        self._cache = None
+        self._calibration_cache = CalibrationCache.resolve(calibration_cache)
+        self._field_0 = bytearray(self.FIELD_0.size)
+        self._heater_durations = {}     # Profile index: milliseconds
+        self._nb_conv = 0
         # TODO check slave values
         self.BME_ADDRESS = 0x76 + slave
         self.start()
@@ -183,6 +282,10 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         """Initialize hardware and os resources."""
         
         self._i2c = self.init_interface("i2c", bus=self._bus)
+        if self._cache_registers:
+            self._cache = RegisterCache.shared(
+                self.hardware_interfaces[self._i2c], self.BME_ADDRESS,
+                volatile=self.VOLATILE_REGISTERS)
 
     def read(self, temp=True, hum=True, pres=True, gas=True):
         """Get a measurment.
@@ -203,83 +306,65 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         if not gas:
             self.gas_status = 0
 
-        self._set_register(self.CTRL_MEAS, self.MODE_BITS,
-                           self.MODE, self.MODES['forced'])
+        # The oversampling of ctrl_meas is known, it's written without a read.
+        self._write_register(
+            self.CTRL_MEAS,
+            (self.OVERSAMPLING[self.t_oversample] << self.OSRS_T) |
+            (self.OVERSAMPLING[self.p_oversample] << self.OSRS_P) |
+            self.MODES['forced'])
 
         # Wait for measurements to finish
-        while self._get_register(self.MEAS_STATUS_0,
-                                 self.MEASURING_BITS,
-                                 self.MEASURING):
-            time.sleep(0.01)
-
-        # Read results
-        temp = self._read_temp_pre(self.TEMP_MSB, self.t_oversample,
-                                   self.TEMP_XLSB_7_4_BITS, self.TEMP_XLSB_7_4,
-                                   self._calc_temp)
-        pres = self._read_temp_pre(self.PRESS_MSB, self.p_oversample,
-                                   self.PRESS_XLSB_7_4_BITS, self.PRESS_XLSB_7_4,
-                                   self._calc_pres)
-        humi = self._read_humi()
-        gas = self._read_gas()
+        time.sleep(self.measurement_duration())
+        status, pres_adc, pres_xlsb, temp_adc, temp_xlsb, humi_adc, gas_r = \
+            self._read_field_0()
+        while status >> self.MEASURING & 1:
+            time.sleep(0.001)
+            status, pres_adc, pres_xlsb, temp_adc, temp_xlsb, humi_adc, \
+                gas_r = self._read_field_0()
+
+        # Read results, the adc values are 20 bits
+        temp = 0
+        if self.t_oversample:
+            temp = self._calc_temp((temp_adc << 4) | (temp_xlsb >> 4))
+        pres = 0
+        if self.p_oversample:
+            pres = self._calc_pres((pres_adc << 4) | (pres_xlsb >> 4))
+        humi = self._calc_humi(humi_adc) if self.h_oversample else 0
+
+        # The gas needs a stable heater temperature
+        gas = 0
+        if self.gas_status and gas_r >> self.HEAF_STAB_R & 1:
+            gas = self._calc_gas(gas_r >> self.GAS_R_0_1,
+                                 gas_r & ((1 << self.GAS_RANGE_R_BITS) - 1),
+                                 self._range_sw_err)
 
         data = bme860_data(temp=temp/100, pres=pres/100, hum=humi/1000, gas=gas)
         return data
 
-    # TODO: check if multiple returns is a good practice
-    def _read_gas(self):
-        """Read gas temperature"""
-
-        if not self.gas_status:
-            return 0
-
-        # Check if the heater temperature is stable for gas measurment
-        heat_stab = self._get_register(self.GAS_R_LSB,
-                                       self.HEAF_STAB_R_BITS,
-                                       self.HEAF_STAB_R)
-        if not heat_stab:
-            return 0
-
-        # Get measurment
-        gas_range = self._get_register(self.GAS_R_LSB,
-                                       self.GAS_RANGE_R_BITS,
-                                       self.GAS_RANGE_R)
-        range_error = self._get_bytes(0x04, 4, signed=True)
-        adc = self._get_bytes(self.GAS_MSB, 10, rev=True)
-
-        return self._calc_gas(adc, gas_range, range_error)
+    def _read_field_0(self):
+        """Read the data block in one transfer and unpack it with
+        :attr:`FIELD_0`."""
 
-    def _read_humi(self):
-        """Read humidity measurment."""
+        self.hardware_interfaces[self._i2c].readinto(self.BME_ADDRESS,
+                                                     self.MEAS_STATUS_0,
+                                                     self._field_0)
 
-        if not self.h_oversample:
-            return 0
+        return self.FIELD_0.unpack_from(self._field_0)
 
-        adc = self._get_bytes(self.HUM_MSB, 16, rev=True)
-
-        return self._calc_humi(adc)
-
-    def _read_temp_pre(self, register, oversample, bits, shift, calculator):
-        """Read pressure or temperature measurement.
-        
-        Args:
-            register: The result msb
-            calculator the function for computing the result from adc
+    def measurement_duration(self):
+        """The seconds of a forced measurement with the current oversampling
+        and heater duration, like the profile duration of the Bosch driver.
         """
-        
-        # If iir is enable then the result resolution is 20 bits
-        if self.iir_coef and oversample:
-            last_byte = 4
-        # if iir is not enabled the resultion is 16 + (osrt_f - 1)
-        elif not self.iir_coef and oversample:
-            last_byte = self.OVERSAMPLING[oversample] - 1
-        # If oversample is 0 the measurment is skipped
-        else:
-            return 0
-        resolution = 16 + last_byte
 
-        adc = self._get_bytes(register, resolution, rev=True)
+        cycles = self.t_oversample + self.p_oversample + self.h_oversample
+        duration = cycles * self.MEAS_CYCLE_US + self.SWITCH_US + 500
 
-        return calculator(adc)
+        # Milliseconds, with the wake up
+        duration = duration // 1000 + 1
+        if self.gas_status:
+            duration += self._heater_durations.get(self._nb_conv, 0)
+
+        return duration / 1000.
 
     def _calc_temp(self, temp_adc, INT=True):
         """Calculate temperature from adc value."""
@@ -360,6 +445,19 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
     def stop(self):
         self._reset()
         self.hardware_interfaces[self._i2c].close()
+        if self._cache is not None:
+            RegisterCache.release(self._cache)
+            self._cache = None
+
+    @property
+    def register_cache(self):
+        """The :class:`RegisterCache` of the sensor or None if it is disabled."""
+        return self._cache
+
+    def resync_registers(self):
+        """Read again the cached registers from the sensor."""
+        if self._cache is not None:
+            self._cache.resync(self._read_register)
     
     def set_idac_heat(self, indexes, values):
         """Set idac_heat_x registers.
@@ -370,7 +468,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         """
 
         for val, i in zip(values, indexes):
-            self._set_register(self.IDAC_HEAT+i, 0, 0, val)
+            self._write_register(self.IDAC_HEAT+i, val)
 
     def set_heating_temp(self, indexes, values):
         """Set idac_heat_x registers.
@@ -382,7 +480,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
 
         for val, i in zip(values, indexes):
             val = self._calc_res_heat(val)
-            self._set_register(self.RES_HEAT+i, 8, 0, int(val))
+            self._write_register(self.RES_HEAT+i, int(val))
 
     # TODO: dont calculate if the temperature isn't set
     def _calc_res_heat(self, temperature):
@@ -424,8 +522,9 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         """
 
         for val, i in zip(values, indexes):
+            self._heater_durations[i] = min(val, 4032)
             val = self._calc_heater_duration(val)
-            self._set_register(self.GAS_WAIT+i, 8, 0, val)
+            self._write_register(self.GAS_WAIT+i, val)
 
     def _calc_heater_duration(self, duration):
         """Calculate correct value for heater duration setting from
@@ -447,63 +546,63 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
 
         """
 
-        self._set_register(self.CTRL_GAS_0, self.HEAT_OFF_BITS, 
-                           self.HEAT_OFF, value)
+        self._set_field("heat_off", value)
 
     def set_nb_conv(self, value):
-        self._set_register(self.CTRL_GAS_1, self.NB_CONV_BITS,
-                           self.NB_CONV, value)
+        self._nb_conv = value
+        self._set_field("nb_conv", value)
 
     def _get_calibration_pars(self):
-        """Get calibrations parameters."""
+        """Get calibrations parameters.
+
+        Every parameter of :attr:`CALIBRATION_MAP` is fetched in one i2c
+        transaction of coalesced block reads. With a calibration cache the
+        parameters are read only if the cache doesn't have them for the
+        chip id and par_t1 of :attr:`IDENTITY_MAP`.
+        """
+
+        i2c = self.hardware_interfaces[self._i2c]
+        cache = self._calibration_cache
+        if cache is None:
+            pars = self.CALIBRATION_MAP.read(i2c, self.BME_ADDRESS,
+                                             self.CALIBRATION_MAP)
+        else:
+            identity = self.IDENTITY_MAP.read(i2c, self.BME_ADDRESS,
+                                              self.IDENTITY_MAP)
+            key = cache.key("BME680", self._bus, self.BME_ADDRESS,
+                            identity["chip_id"])
+            check = [identity["par_t1"]]
+            pars = cache.get(key, check)
+            if pars is None or set(pars) != set(self.CALIBRATION_MAP):
+                pars = self.CALIBRATION_MAP.read(i2c, self.BME_ADDRESS,
+                                                 self.CALIBRATION_MAP)
+                cache.put(key, pars, check)
 
         # Temperature
-        par_t1 = self._get_bytes(self.PAR_T1_l, 16)
-        par_t2 = self._get_bytes(self.PAR_T2_l, 16, signed=True)
-        par_t3 = self._get_bytes(self.PAR_T3, 8)
-        self._t_calib = t_cal(par_t1=par_t1, par_t2=par_t2, par_t3=par_t3)
+        self._t_calib = t_cal(par_t1=pars["par_t1"], par_t2=pars["par_t2"],
+                              par_t3=pars["par_t3"])
 
         # Pressure
-        par_p1 = self._get_bytes(self.PAR_P1_l, 16)
-        par_p2 = self._get_bytes(self.PAR_P2_l, 16, signed=True)
-        par_p3 = self._get_bytes(self.PAR_P3, 8)
-        par_p4 = self._get_bytes(self.PAR_P4_l, 16, signed=True)
-        par_p5 = self._get_bytes(self.PAR_P5_l, 16, signed=True)
-        par_p6 = self._get_bytes(self.PAR_P6, 8)
-        par_p7 = self._get_bytes(self.PAR_P7, 8)
-        par_p8 = self._get_bytes(self.PAR_P8_l, 16, signed=True)
-        par_p9 = self._get_bytes(self.PAR_P9_l, 16, signed=True)
-        par_p10 = self._get_bytes(self.PAR_P10, 8)
-        self._p_calib = p_cal(par_p1=par_p1, par_p2=par_p2, par_p3=par_p3,
-                              par_p4=par_p4, par_p5=par_p5, par_p6=par_p6,
-                              par_p7=par_p7, par_p8=par_p8, par_p9=par_p9,
-                              par_p10=par_p10)
+        self._p_calib = p_cal(par_p1=pars["par_p1"], par_p2=pars["par_p2"],
+                              par_p3=pars["par_p3"], par_p4=pars["par_p4"],
+                              par_p5=pars["par_p5"], par_p6=pars["par_p6"],
+                              par_p7=pars["par_p7"], par_p8=pars["par_p8"],
+                              par_p9=pars["par_p9"], par_p10=pars["par_p10"])
 
         # Humidity
-        # TODO: Make one call
-        par_h1 = self._get_bytes(self.PAR_H1_h, 8) << 4
-        par_h1 += self._get_bits(self._get_bytes(self.PAR_H1_l, 8), 4, 4)
-        par_h2 = self._get_bytes(self.PAR_H2_h, 8) << 4
-        par_h2 += self._get_bits(self._get_bytes(self.PAR_H2_l, 8), 4, 4)
-        par_h3 = self._get_bytes(self.PAR_H3, 8, signed=True)
-        par_h4 = self._get_bytes(self.PAR_H4, 8, signed=True)
-        par_h5 = self._get_bytes(self.PAR_H5, 8, signed=True)
-        par_h6 = self._get_bytes(self.PAR_H6, 8)
-        par_h7 = self._get_bytes(self.PAR_H7, 8, signed=True)
-        self._h_calib = h_cal(par_h1=par_h1, par_h2=par_h2, par_h3=par_h3,
-                              par_h4=par_h4, par_h5=par_h5, par_h6=par_h6,
-                              par_h7=par_h7)
+        par_h1 = (pars["par_h1_msb"] << 4) | pars["par_h1_lsb"]
+        par_h2 = (pars["par_h2_msb"] << 4) | pars["par_h2_lsb"]
+        self._h_calib = h_cal(par_h1=par_h1, par_h2=par_h2,
+                              par_h3=pars["par_h3"], par_h4=pars["par_h4"],
+                              par_h5=pars["par_h5"], par_h6=pars["par_h6"],
+                              par_h7=pars["par_h7"])
         
         # Gas
-        par_g1 = self._get_bytes(self.PAR_G1, 8, signed=True)
-        par_g2 = self._get_bytes(self.PAR_G2_L, 16, signed=True)
-        par_g3 = self._get_bytes(self.PAR_G3, 8, signed=True)
-        res_heat_range = self._get_bits(self._get_bytes(self.RES_HEAT_RANGE, 8),
-                                        2, 4)
-        res_heat_val = self._get_bytes(self.RES_HEAT_VAL, 8, signed=True)
-        self._g_calib = g_cal(par_g1=par_g1, par_g2=par_g2, par_g3=par_g3,
-                              res_heat_range=res_heat_range,
-                              res_heat_val=res_heat_val)
+        self._g_calib = g_cal(par_g1=pars["par_g1"], par_g2=pars["par_g2"],
+                              par_g3=pars["par_g3"],
+                              res_heat_range=pars["res_heat_range"],
+                              res_heat_val=pars["res_heat_val"])
+        self._range_sw_err = pars["range_sw_err"]
 
     # TODO: Check maybe remove the option to get one byte
     def _get_bytes(self, low_byte_addr, res, signed=False, rev=False):
@@ -554,21 +653,9 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
                                                   self.RESET,
                                                   0xB6)
 
-    def _set_bits(self, register, value, num_bits, shift):
-        """Set shift bits from start of register with value.
-
-        Args:
-            register:
-            value:
-            num_bits: Integer indicating how many bits to set.
-            shift: Integer indicating the starting bit in the number.
-        """
-
-        # Zero target bits
-        mask = ((0xFF << (num_bits + shift)) | ((1 << shift) - 1)) & 0xFF
-        register &= mask
-
-        return register | (value << shift)
+        # Every register has its power on value again.
+        if self._cache is not None:
+            self._cache.invalidate()
 
     def _get_bits(self, register, num_bits, shift):
         """Get specific bits from register
@@ -583,35 +670,64 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
 
         return (register & mask) >> shift
 
-    def _get_register(self, register, bits, shift):
-        """Get specific bits from register.
-        
+    def _get_field(self, name):
+        """Get a field of :attr:`REGISTER_MAP`.
+
         Args:
-            register:
-            bits:
-            shift:
+            name (str): The name of the field.
         """
-        r_val = self.hardware_interfaces[self._i2c].read(self.BME_ADDRESS,
-                                                         register)
 
-        return self._get_bits(r_val, bits, shift)
+        field = self.REGISTER_MAP[name]
+
+        return field.decode(self._cached_read(field.address))
+
+    def _read_register(self, register):
+        """Read a register from the bus."""
+        return self.hardware_interfaces[self._i2c].read(self.BME_ADDRESS,
+                                                        register)
+
+    def _cached_read(self, register):
+        """Read a register, from the register cache if it has it."""
+
+        cache = self._cache
+        value = None if cache is None else cache.get(register)
+        if value is None:
+            value = self._read_register(register)
+            if cache is not None:
+                cache.put(register, value)
+
+        return value
+
+    def _set_field(self, name, value):
+        """Write a new value to a field of :attr:`REGISTER_MAP`.
 
-    def _set_register(self, register, bits, shift, value):
-        """Write a new value to register.
-        
         Args:
-            register:
-            bits:
-            shift:
-            value:
+            name (str): The name of the field.
+            value (int): The value.
         """
-        
-        r_val = self.hardware_interfaces[self._i2c].read(self.BME_ADDRESS,
-                                                         register)
-        r_val = self._set_bits(r_val, value, bits, shift)
-        self.hardware_interfaces[self._i2c].write(self.BME_ADDRESS,
-                                                  register,
-                                                  r_val)
+
+        field = self.REGISTER_MAP[name]
+        with self.hardware_interfaces[self._i2c].lock:
+            r_val = self._cached_read(field.address)
+            self._write_register(field.address, field.encode(r_val, value))
+
+    def _write_register(self, register, value):
+        """Write a whole register.
+
+        Args:
+            register: The address of the register.
+            value: The value.
+        """
+
+        cache = self._cache
+
+        # A cached register that doesn't change needs no write.
+        if cache is not None and value == cache.peek(register):
+            return
+        self.hardware_interfaces[self._i2c].write(self.BME_ADDRESS, register,
+                                                  value)
+        if cache is not None:
+            cache.put(register, value)
 
     @property
     def t_oversample(self):
@@ -622,8 +738,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         self._t_oversample = value
 
         # Set osrs_t
-        self._set_register(self.CTRL_MEAS, self.OSRS_T_BITS,
-                           self.OSRS_T, self.OVERSAMPLING[value])
+        self._set_field("osrs_t", self.OVERSAMPLING[value])
 
     @property
     def p_oversample(self):
@@ -634,8 +749,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         self._p_oversample = value
 
         # Set osrs_p
-        self._set_register(self.CTRL_MEAS, self.OSRS_P_BITS,
-                           self.OSRS_P, self.OVERSAMPLING[value])
+        self._set_field("osrs_p", self.OVERSAMPLING[value])
 
     @property
     def h_oversample(self):
@@ -646,8 +760,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         self._h_oversample = value
 
         # Set osrs_h
-        self._set_register(self.CTRL_HUM, self.OSRS_H_BITS,
-                           self.OSRS_H, self.OVERSAMPLING[value])
+        self._set_field("osrs_h", self.OVERSAMPLING[value])
 
     @property
     def iir_coef(self):
@@ -658,8 +771,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         self._iir_coef = value
 
         # Set osrs_t
-        self._set_register(self.CONFIG, self.FILTER_BITS,
-                           self.FILTER, self.IIR[value])
+        self._set_field("filter", self.IIR[value])
 
     @property
     def gas_status(self):
@@ -670,8 +782,7 @@ class BME680(HumiditySensor, TemperatureSensor, GasSensor, PressureSensor):
         self._gas_status = value
 
         # Set register
-        self._set_register(self.CTRL_GAS_1, self.RUN_GUS_BITS,
-                           self.RUN_GUS, value)
+        self._set_field("run_gas", value)
 
     @property
     def t_calib(self):
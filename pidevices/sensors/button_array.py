@@ -90,6 +90,17 @@ class ButtonArray(Sensor):
 
         return self.hardware_interfaces[self._gpio].read(self._b_names[button])
 
+    def read_all(self):
+        """Read the current state of every button together.
+
+        Buttons on the same port or bank are read with one access.
+
+        Returns:
+            list: The state of every button, in the order of the buttons.
+        """
+
+        return self.hardware_interfaces[self._gpio].read_many(self._b_names)
+
     def when_pressed(self, button, func, *args):
         """Set a function for asynchronous call when the button is pressed.
 
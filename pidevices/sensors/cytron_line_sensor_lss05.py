@@ -26,6 +26,7 @@ class CytronLfLSS05(LineFollower):
     """
     
     _MODES = {"dark": 2, "bright": 3}
+    _SENSORS = cytron_res._fields
     _PULSE_TIME = 200
     _SLEEP_TIME = 0.001
 
@@ -153,18 +154,9 @@ class CytronLfLSS05(LineFollower):
                 The format is (so_1, so_2, so_3, so_4, so_5).
         """
 
-        so_1_res = self.hardware_interfaces[self.gpio].read("so_1")
-        so_2_res = self.hardware_interfaces[self.gpio].read("so_2")
-        so_3_res = self.hardware_interfaces[self.gpio].read("so_3")
-        so_4_res = self.hardware_interfaces[self.gpio].read("so_4")
-        so_5_res = self.hardware_interfaces[self.gpio].read("so_5")
-
-        res = cytron_res(so_1=so_1_res,
-                         so_2=so_2_res,
-                         so_3=so_3_res,
-                         so_4=so_4_res,
-                         so_5=so_5_res,
-                         )
+        # One read of the port or bank when the gpio supports it
+        res = cytron_res(
+            *self.hardware_interfaces[self.gpio].read_many(self._SENSORS))
         if SAVE:
             self.update_data(res)
 
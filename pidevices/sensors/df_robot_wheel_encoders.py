@@ -1,23 +1,48 @@
 """df_robot_wheel_encoders.py"""
 from .wheel_encoders import WheelEncoder
+from ..edge_recorder import tick_us
+from array import array
 import atexit
-import time
 import math
 
 
 class DfRobotWheelEncoder(WheelEncoder):
     """Class implementing df robot wheel encoders. Extends :class:`WheelEncoder`
-    
+
+    The callback of the signal only stores the tick of every pulse in a
+    preallocated ring, the pigpio tick with :class:`PiGPIO` or the time of
+    the callback otherwise. The velocity is computed on :meth:`read` from
+    the pulses of the last window seconds, or of the last window_counts
+    pulses if it is set, and decays when the pulses slow down, reaching
+    zero when there isn't a pulse for stop_time seconds.
+
     Args:
         pin_num: The pin number of encoder's signal.
+        resolution (int): Pulses per revolution. Defaults to :data:`10`.
+        name (str): The optional name of the device.
+        max_data_length (int): The max data of the data list.
+        window (float): The seconds of pulses for the velocity. Defaults to
+            :data:`0.1`.
+        window_counts (int): The number of pulses for the velocity, instead
+            of the time window. Defaults to None.
+        stop_time (float): Seconds without a pulse when the wheel is
+            stopped. Defaults to :data:`0.5`.
+        capacity (int): The pulses kept in the ring, the max of a window.
+            Defaults to :data:`256`.
+        data_dtype: Optional numpy dtype of the data samples, see
+            :class:`Device`.
+        data_shape (tuple): Optional shape of the data samples.
     """
     RPM_PER_RPS = 9.5492
 
-    def __init__(self, pin, resolution=10, name='', max_data_length=0):
+    def __init__(self, pin, resolution=10, name='', max_data_length=0,
+                 window=0.1, window_counts=None, stop_time=0.5,
+                 capacity=256, data_dtype=None, data_shape=()):
         """Constructor."""
 
         # initialize base constructor
-        super(DfRobotWheelEncoder, self).__init__(name, max_data_length)
+        super(DfRobotWheelEncoder, self).__init__(name, max_data_length,
+                                                  data_dtype, data_shape)
 
         # track variables
         self._pin_num = pin
@@ -25,9 +50,15 @@ class DfRobotWheelEncoder(WheelEncoder):
 
         self._gpio = -1
 
+        self.window = window
+        self.window_counts = window_counts
+        self.stop_time = stop_time
+
         self._counter = 0
-        self._timer = 0
-        self._dt = 0
+        self._capacity = capacity
+        self._ticks = array('I', [0]) * capacity
+        self._index = 0     # Pulses written to the ring
+        self._first = 0     # First pulse of the velocity, see reset
         self._started = False
 
         self.start()
@@ -60,13 +91,44 @@ class DfRobotWheelEncoder(WheelEncoder):
 
         self._started = True
 
-    def _cbf(self, gpio, level, tick, *args):
-        """Callback function which records timestamps and tick between encoder pulses."""
-        
-        self._dt = time.time() - self._timer
-        self._timer = time.time()
+    def _cbf(self, gpio=None, level=None, tick=None, *args):
+        """Callback function which records the tick of an encoder pulse.
+
+        PiGPIO passes the tick of the pulse, the other interfaces don't and
+        the pulse is stamped when the callback runs.
+        """
+
+        if tick is None:
+            tick = tick_us()
+        index = self._index
+        self._ticks[index % self._capacity] = tick
+        self._index = index + 1
         self._counter += 1
-        
+
+    def ticks(self, n=None):
+        """The ticks of the last pulses.
+
+        Args:
+            n (int): The number of pulses. Defaults to all the kept ones.
+
+        Returns:
+            list: Ticks in microseconds, oldest first.
+        """
+
+        end = self._index
+        start = max(end - self._capacity, self._first)
+        if n is not None:
+            start = max(start, end - n)
+
+        return [self._ticks[i % self._capacity] for i in range(start, end)]
+
+    def _now(self):
+        """The current tick in the clock of the pulses."""
+
+        if self._gpio == -1:
+            return tick_us()
+        return self.hardware_interfaces[self._gpio].tick()
+
     def state(self):
         """Get current state of encoder.
         
@@ -76,22 +138,66 @@ class DfRobotWheelEncoder(WheelEncoder):
 
         return self.hardware_interfaces[self._gpio].read('signal')
 
+    def velocity(self):
+        """The angular velocity of the wheel from the recent pulses.
+
+        Returns:
+            float: Radians per second, 0 if the wheel is stopped.
+        """
+
+        end = self._index
+        oldest = max(end - self._capacity + 1, self._first)
+        if end - oldest < 1:
+            return 0.0
+
+        capacity = self._capacity
+        ticks = self._ticks
+        last = ticks[(end - 1) % capacity]
+        since = ((self._now() - last) & 0xFFFFFFFF) / 1e6
+        if since >= self.stop_time:
+            return 0.0
+
+        # Walk back over the pulses of the window, at least one interval.
+        if self.window_counts is not None:
+            start = max(end - 1 - self.window_counts, oldest)
+            span = ((last - ticks[start % capacity]) & 0xFFFFFFFF) / 1e6
+        else:
+            window = self.window * 1e6
+            start = end - 1
+            span = 0
+            while start > oldest:
+                width = (last - ticks[(start - 1) % capacity]) & 0xFFFFFFFF
+                if span and width > window:
+                    break
+                start -= 1
+                span = width
+            span /= 1e6
+
+        pulses = end - 1 - start
+        if pulses < 1:
+            return 0.0
+
+        # A pulse later than the mean period bounds the velocity.
+        period = max(span / pulses, since)
+        if period <= 0:
+            return 0.0
+
+        return 2 * math.pi / (self._res * period)
+
     def read(self):
-        """Return the last recorded value of the encoder.
+        """Return the velocity of the encoder, see :meth:`velocity`.
 
         Returns:
             A dictionary with the rps and rps of the wheel attached to the encoder.
         """
 
-        if self._dt > 0:
-            rps = 2 * math.pi / (self._res * self._dt)
-        else:
-            rps = 0.0
+        rps = self.velocity()
 
         return {"rps": rps, "rpm": self._rpsToRpm(rps)}     
     
     def reset(self):
-        self._dt = 0.0
+        """Forget the pulses until now, the velocity is 0 until new ones."""
+        self._first = self._index
 
     def _rpsToRpm(self, rps):
         """ Convert rps to rpm."""
@@ -117,12 +223,15 @@ class DfRobotWheelEncoderPiGPIO(DfRobotWheelEncoder):
         pin_num (int): The pin number of encoder's signal.
     """
 
-    def __init__(self, pin, resolution, name='', max_data_length=0):
+    def __init__(self, pin, resolution, name='', max_data_length=0,
+                 data_dtype=None, data_shape=()):
 
         super(DfRobotWheelEncoderPiGPIO, self).__init__(pin, 
                                                         resolution,
                                                         name,
-                                                        max_data_length)        
+                                                        max_data_length,
+                                                        data_dtype=data_dtype,
+                                                        data_shape=data_shape)        
     def start(self):
         """Initialize hardware and os resources once."""
 
@@ -152,12 +261,13 @@ class DfRobotWheelEncoderRpiGPIO(DfRobotWheelEncoder):
         pin_num (int): The pin number of encoder's signal.
     """
 
-    def __init__(self, pin, name='', max_data_length=0):
+    def __init__(self, pin, name='', max_data_length=0, data_dtype=None,
+                 data_shape=()):
         """Constructor."""
 
-        super(DfRobotWheelEncoderRpiGPIO, self).__init__(pin, 
-                                                         name,
-                                                         max_data_length)
+        super(DfRobotWheelEncoderRpiGPIO, self).__init__(
+            pin, name=name, max_data_length=max_data_length,
+            data_dtype=data_dtype, data_shape=data_shape)
     
     def start(self):
         """Initialize hardware and os resources."""
@@ -182,16 +292,17 @@ class DfRobotWheelEncoderMcp23017(DfRobotWheelEncoder):
         pin_num: The pin number of encoder's signal.
     """
 
-    def __init__(self, pin, bus=1, address=0x20, name='', max_data_length=0):
+    def __init__(self, pin, bus=1, address=0x20, name='', max_data_length=0,
+                 data_dtype=None, data_shape=()):
         """Constructor."""
 
         self._bus = bus
         self._address = address
 
         print(f"starting with bus {bus} and address {address}")
-        super(DfRobotWheelEncoderMcp23017, self).__init__(pin, 
-                                                          name,
-                                                          max_data_length)
+        super(DfRobotWheelEncoderMcp23017, self).__init__(
+            pin, name=name, max_data_length=max_data_length,
+            data_dtype=data_dtype, data_shape=data_shape)
 
     def start(self):
         """Initialize hardware and os resources."""
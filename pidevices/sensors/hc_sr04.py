@@ -1,8 +1,8 @@
 """hc_sr04.py"""
 
+import threading
 import time
 from .distance_sensor import DistanceSensor
-from ..exceptions import OutOfRange
 from math import sqrt
 
 class HcSr04(DistanceSensor):
@@ -25,6 +25,12 @@ class HcSr04(DistanceSensor):
     """
     _SPEED_OF_SOUND = 33100
 
+    # Width of the trigger pulse in microseconds.
+    TRIGGER_WIDTH = 10
+
+    # The echo of a clear path lasts about 38ms, 30ms are beyond 4m.
+    ECHO_TIMEOUT = 0.03
+
     def __init__(self, trigger_pin,
                  echo_pin, name="",
                  max_data_length=100):
@@ -42,6 +48,7 @@ class HcSr04(DistanceSensor):
         self._temp = 20
 
         self._gpio = None
+        self._echo = None
         # Initialize hardware resources
         
         #self.start()
@@ -75,6 +82,9 @@ class HcSr04(DistanceSensor):
 
     def stop(self):
         """Free hardware and os resources."""
+        if self._echo is not None:
+            self._echo.close()
+
         # Set output to low
         self.hardware_interfaces[self._gpio].write('trigger', 0)
 
@@ -90,42 +100,83 @@ class HcSr04(DistanceSensor):
         Returns:
             int: The distance in centimeters. If it return -1 it means the that
                 the measurment is out of the sensor's range.
+        """
+
+        self.trigger()
+        distance = self.collect()
+
+        # Add measurment to data deque
+        if SAVE and distance != -1:
+            self.update_data(distance)
+
+        return distance
+
+    def trigger(self):
+        """Start a measurement without waiting for it, see :meth:`collect`.
 
-        Raises:
-            OutOfRange: Error when a measurment takes too long.
+        The edges left from earlier echoes are dropped and the trigger pulse
+        is sent with :meth:`GPIO.pulse`, timed by the daemon with pigpio.
         """
 
-        # Send 10us pulse to trigger
-        self.hardware_interfaces[self._gpio].write('trigger', 1)
-        time.sleep(0.000015)
-        self.hardware_interfaces[self._gpio].write('trigger', 0)
+        self._echo.read()
+        self.hardware_interfaces[self._gpio].pulse('trigger',
+                                                   self.TRIGGER_WIDTH)
+
+    def collect(self, timeout=None):
+        """Wait for the echo of the last :meth:`trigger`.
+
+        The echo edges are recorded with their ticks by an
+        :class:`EdgeRecorder`, the wait ends with the falling edge and the
+        width is the difference of the ticks, in microseconds with pigpio.
 
-        self.out = False
-        # If wait time is more than max echo signal = 0.024s
-        count = 0
-        while not self.out:
-            if count == 10:
+        Args:
+            timeout (float): Max seconds to wait for the echo. Defaults to
+                :data:`ECHO_TIMEOUT`.
+
+        Returns:
+            float: The distance in centimeters, -1 if the echo didn't end in
+            time or the distance is out of the sensor's range.
+        """
+
+        if timeout is None:
+            timeout = self.ECHO_TIMEOUT
+        deadline = time.perf_counter() + timeout
+
+        rise = None
+        while True:
+            batch = self._echo.read()
+            for level, tick in zip(batch.level, batch.tick):
+                if level:
+                    rise = tick
+                elif rise is not None:
+                    return self._distance(((tick - rise) & 0xFFFFFFFF) / 1e6)
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not self._echo.wait(remaining):
                 return -1
-                #raise OutOfRange("Out of range.")
-            time.sleep(0.003)
-            count += 1
+
+    def _distance(self, duration):
+        """The distance of an echo of duration seconds, or -1 if it's out of
+        the sensor's range."""
+
+        self.duration = duration
 
         # Distance is the time that the pulse travelled
         # multiplied by the speed of sound
         sound_speed = self._SPEED_OF_SOUND * sqrt(1 + self._temp / 27315)
-        distance_of_pulse = self.duration * sound_speed
+        distance_of_pulse = duration * sound_speed
 
         # Half the distance
         distance = round(distance_of_pulse / 2., ndigits=4)
-
-        # Add measurment to data deque
-        if SAVE:
-            self.update_data(distance)
+        if not self.min_distance * 100 <= distance <= self.max_distance * 100:
+            return -1
 
         return distance
-    
-    def _async_measure(self):
-        pass
+
+    def _record_echo(self):
+        """Record the edges of the echo pin, called by start."""
+        self._echo = self.hardware_interfaces[self._gpio].record_edges(
+            ['echo'], capacity=16)
 
 class HcSr04RPiGPIO(HcSr04):
     """HcSr04 class extends :class:`DistanceSensor`
@@ -162,15 +213,37 @@ class HcSr04RPiGPIO(HcSr04):
                                          trigger=self.trigger_pin,
                                          echo=self.echo_pin)
         self.hardware_interfaces[self._gpio].set_pin_function('echo', 'input')
-        self.hardware_interfaces[self._gpio].set_pin_edge('echo', 'both')
-        self.hardware_interfaces[self._gpio].set_pin_event('echo',
-                                                          self._async_measure)
+        self._record_echo()
         self.hardware_interfaces[self._gpio].set_pin_function('trigger', 'output')
 
         # Allow module to settle
         time.sleep(0.25)
 
 
+class HcSr04PiGPIO(HcSr04RPiGPIO):
+    """HcSr04 class using the pigpio library extends :class:`HcSr04RPiGPIO`
+
+    The trigger pulse is timed by the pigpio daemon and the echo width is
+    the difference of the daemon ticks of its edges, so a reading lasts
+    the echo and has microsecond resolution.
+
+    Args:
+        trigger_pin (int): BCM number of the trigger pin.
+        echo_pin (int): BCM number of the echo pin.
+        name (str): The optional name of the device.
+        max_data_length (int): The max data of the data list.
+    """
+
+    def __init__(self, trigger_pin,
+                 echo_pin, name="",
+                 max_data_length=100):
+        "Constructor"
+
+        super(HcSr04PiGPIO, self).__init__(trigger_pin, echo_pin,
+                                           name, max_data_length)
+        self._impl = "PiGPIO"
+
+
 class HcSr04Mcp23017(HcSr04):
     """HcSr04 class extends :class:`DistanceSensor`
     
@@ -199,6 +272,9 @@ class HcSr04Mcp23017(HcSr04):
         self._impl = "Mcp23017GPIO"
         self._bus = bus
         self._address = address
+        self._rise = None
+        self._width = 0
+        self._done = threading.Event()
         super(HcSr04Mcp23017, self).__init__(trigger_pin, echo_pin,
                                              name, max_data_length)
 
@@ -222,61 +298,47 @@ class HcSr04Mcp23017(HcSr04):
         # Allow module to settle
         time.sleep(0.25)
 
-    def read(self, SAVE=False):
-        """Get a distance measurment
-        
-        Args:
-            SAVE (boolean): Flag for saving the measurment to the data list.
+    def trigger(self):
+        """Start a measurement without waiting for it, see :meth:`collect`."""
 
-        Returns:
-            The distance in centimeters.
+        self._rise = None
+        self._done.clear()
+        self.hardware_interfaces[self._gpio].pulse('trigger',
+                                                   self.TRIGGER_WIDTH)
 
-        Raises:
-            OutOfRange: Error when a measurment takes too long.
-        """
+    def collect(self, timeout=None):
+        """Wait for the echo of the last :meth:`trigger`.
 
-        # Send 10us pulse to trigger
-        self.hardware_interfaces[self._gpio].write('trigger', 1)
-        time.sleep(0.000015)
-        self.hardware_interfaces[self._gpio].write('trigger', 0)
-
-        self.out = False
-        # If wait time is more than max echo signal = 0.024s
-        t_start = 0
-
-        while not self.hardware_interfaces[self._gpio].read('echo'):
-            t_start = time.time()
-            time.sleep(0.0003)
+        The interrupts of the echo edges stamp its start and end, the wait
+        ends with an event set by the falling edge, so the resolution is
+        the interrupt latency of the expander.
 
-        t_stop = 0
-        while self.hardware_interfaces[self._gpio].read('echo'):
-            t_stop = time.time()
-            time.sleep(0.0003)
-
-        self.duration = t_stop - t_start
-        # Distance is the time that the pulse travelled
-        # multiplied by the speed of sound
-        distance_of_pulse = self.duration * self._SPEED_OF_SOUND
+        Args:
+            timeout (float): Max seconds to wait for the echo. Defaults to
+                :data:`ECHO_TIMEOUT`.
 
-        # Half the distance
-        distance = round(distance_of_pulse / 2., ndigits=4)
+        Returns:
+            float: The distance in centimeters, -1 if the echo didn't end in
+            time or the distance is out of the sensor's range.
+        """
 
-        # Add measurment to data deque
-        if SAVE:
-            self.update_data(distance)
+        if not self._done.wait(self.ECHO_TIMEOUT if timeout is None
+                               else timeout):
+            return -1
 
-        return distance
+        return self._distance(self._width)
 
-    
     def _async_measure(self, gpio_pin, level):
         """Function to be called with edge signals.
         
         With rising signal start measure time and with falling signal stop
         save signal duration.
         """
-        
+
+        now = time.perf_counter()
         if level == 1:
-            self.t_start = time.time()
-        else:
-            self.duration = (time.time() - self.t_start)
-            self.out = True
+            self._rise = now
+        elif self._rise is not None:
+            self._width = now - self._rise
+            self._rise = None
+            self._done.set()
@@ -2,6 +2,7 @@
 
 from collections import namedtuple
 from ..devices import Sensor
+from ..register_map import RegisterMap, Field, Value
 import time
 import math
 import struct
@@ -44,6 +45,42 @@ ICM20948_ACCEL_XOUT_H = 0x2D
 ICM20948_GRYO_XOUT_H = 0x33
 ICM20948_TEMP_OUT_H = 0x39
 
+# Bank 0 measurements
+BANK_0_MAP = RegisterMap({
+    "accel_x": Value(ICM20948_ACCEL_XOUT_H, ">h"),
+    "accel_y": Value(ICM20948_ACCEL_XOUT_H + 2, ">h"),
+    "accel_z": Value(ICM20948_ACCEL_XOUT_H + 4, ">h"),
+    "gyro_x": Value(ICM20948_GRYO_XOUT_H, ">h"),
+    "gyro_y": Value(ICM20948_GRYO_XOUT_H + 2, ">h"),
+    "gyro_z": Value(ICM20948_GRYO_XOUT_H + 4, ">h"),
+    "temp": Value(ICM20948_TEMP_OUT_H, ">h"),
+})
+
+# Bank 2 configuration
+BANK_2_MAP = RegisterMap({
+    "gyro_smplrt_div": Field(ICM20948_GYRO_SMPLRT_DIV),
+    "gyro_fchoice": Field(ICM20948_GYRO_CONFIG_1, 0, 1),
+    "gyro_fs_sel": Field(ICM20948_GYRO_CONFIG_1, 1, 2),
+    "gyro_dlpfcfg": Field(ICM20948_GYRO_CONFIG_1, 3, 3),
+    "accel_smplrt_div": Value(ICM20948_ACCEL_SMPLRT_DIV_1, ">H", width=12),
+    "accel_fchoice": Field(ICM20948_ACCEL_CONFIG, 0, 1),
+    "accel_fs_sel": Field(ICM20948_ACCEL_CONFIG, 1, 2),
+    "accel_dlpfcfg": Field(ICM20948_ACCEL_CONFIG, 3, 3),
+})
+
+# The bank 2 registers that start() writes
+BANK_2_CONFIG = (ICM20948_GYRO_SMPLRT_DIV, ICM20948_GYRO_CONFIG_1,
+                 ICM20948_ACCEL_SMPLRT_DIV_1, ICM20948_ACCEL_SMPLRT_DIV_2,
+                 ICM20948_ACCEL_CONFIG)
+
+# Full scale of every fs_sel value, sections 3.1 and 3.2 of the datasheet
+ACCEL_SCALES = (16384.0, 8192.0, 4096.0, 2048.0)     # LSB/g
+GYRO_SCALES = (131, 65.5, 32.8, 16.4)                # LSB/dps
+
+# fs_sel of every full scale, +- g and +- dps
+ACCEL_FS_SEL = {2: 0b00, 4: 0b01, 8: 0b10, 16: 0b11}
+GYRO_FS_SEL = {250: 0b00, 500: 0b01, 1000: 0b10, 2000: 0b11}
+
 AK09916_I2C_ADDR = 0x0c
 
 AK09916_CHIP_ID = 0x09
@@ -65,14 +102,34 @@ AK09916_CNTL2_MODE_CONT4 = 8
 AK09916_CNTL2_MODE_TEST = 16
 AK09916_CNTL3 = 0x32
 
+# Time for the internal i2c master to move a byte to or from the magnetometer
+MAG_SETTLE_TIME = 0.0005
+
 
 class ICM_20948(Sensor):
     """Driver for icm 20948 imu"""
 
-    def __init__(self, bus, i2c_addr=0x69, name="", max_data_length=1):
-        """Constructor"""
+    # Imu samples are time critical, get the bus before other devices.
+    BUS_PRIORITY = 10
+
+    # The gyro rate, low pass mode and full scale and the accelerometer rate,
+    # low pass mode and full scale that start() configures.
+    SETUP = (100, 5, 250, 125, 5, 16)
+
+    def __init__(self, bus, i2c_addr=0x69, name="", max_data_length=1,
+                 data_dtype=None, data_shape=()):
+        """Constructor
+
+        Args:
+            bus (int): The i2c bus.
+            i2c_addr (int): The slave address. Defaults to :data:`0x69`.
+            data_dtype: Optional numpy dtype of the data samples, see
+                :class:`Device`.
+            data_shape (tuple): Optional shape of the data samples.
+        """
 
-        super(ICM_20948, self).__init__(name, max_data_length)
+        super(ICM_20948, self).__init__(name, max_data_length, data_dtype,
+                                        data_shape)
         self._bus = bus
         self._bank = -1
         self._addr = i2c_addr
@@ -93,15 +150,7 @@ class ICM_20948(Sensor):
         self._write(ICM20948_PWR_MGMT_1, 0x01)
         self._write(ICM20948_PWR_MGMT_2, 0x00)
 
-        self.bank(2)
-
-        self.set_gyro_sample_rate(100)
-        self.set_gyro_low_pass(enabled=True, mode=5)
-        self.set_gyro_full_scale(250)
-
-        self.set_accelerometer_sample_rate(125)
-        self.set_accelerometer_low_pass(enabled=True, mode=5)
-        self.set_accelerometer_full_scale(16)
+        self._configure()
 
         self.bank(0)
         self._write(ICM20948_INT_PIN_CFG, 0x30)
@@ -118,7 +167,42 @@ class ICM_20948(Sensor):
         self.mag_write(AK09916_CNTL3, 0x01)
         while self.mag_read(AK09916_CNTL3) == 0x01:
             time.sleep(0.0001)
-    
+
+    def _configure(self):
+        """Write the gyro and accelerometer configuration of :attr:`SETUP`.
+
+        Every register of :data:`BANK_2_CONFIG` is computed from the setup,
+        so they are written in one transaction without reading them.
+        """
+
+        gyro_rate, gyro_mode, gyro_scale, accel_rate, accel_mode, \
+            accel_scale = self.SETUP
+
+        values = {
+            "gyro_smplrt_div": int((1100.0 / gyro_rate) - 1),
+            "gyro_fchoice": 1,
+            "gyro_dlpfcfg": gyro_mode,
+            "gyro_fs_sel": GYRO_FS_SEL[gyro_scale],
+            "accel_fchoice": 1,
+            "accel_dlpfcfg": accel_mode,
+            "accel_fs_sel": ACCEL_FS_SEL[accel_scale],
+        }
+        registers = dict.fromkeys(BANK_2_CONFIG, 0)
+        for name, value in values.items():
+            field = BANK_2_MAP[name]
+            registers[field.address] = field.encode(registers[field.address],
+                                                    value)
+        msb, lsb = BANK_2_MAP["accel_smplrt_div"].pack(
+            int((1125.0 / accel_rate) - 1))
+        registers[ICM20948_ACCEL_SMPLRT_DIV_1] = msb
+        registers[ICM20948_ACCEL_SMPLRT_DIV_2] = lsb
+
+        tx = self._transaction()
+        self._queue_bank(tx, 2)
+        for address in BANK_2_CONFIG:
+            tx.write(address, registers[address])
+        tx.execute()
+
     def read(self, accel_gyro_flag=True, magne_flag=True):
         """Read measurments.
         
@@ -158,39 +242,59 @@ class ICM_20948(Sensor):
                                                         reg,
                                                         length)
 
+    def _transaction(self):
+        """Start an i2c transaction to the sensor."""
+        return self.hardware_interfaces[self._i2c].transaction(self._addr)
+
     def bank(self, value):
         """Switch register self.bank."""
         if not self._bank == value:
             self._write(ICM20948_BANK_SEL, value << 4)
             self._bank = value
 
+    def _queue_bank(self, transaction, value):
+        """Queue a register bank switch to a transaction."""
+        if not self._bank == value:
+            transaction.write(ICM20948_BANK_SEL, value << 4)
+            self._bank = value
+
     def mag_write(self, reg, value):
         """Write a byte to the slave magnetometer."""
-        self.bank(3)
-        self._write(ICM20948_I2C_SLV0_ADDR, AK09916_I2C_ADDR)  # Write one byte
-        self._write(ICM20948_I2C_SLV0_REG, reg)
-        self._write(ICM20948_I2C_SLV0_DO, value)
-        self.bank(0)
+        tx = self._transaction()
+        self._queue_bank(tx, 3)
+        tx.write(ICM20948_I2C_SLV0_ADDR, AK09916_I2C_ADDR)  # Write one byte
+        tx.write(ICM20948_I2C_SLV0_REG, reg)
+        tx.write(ICM20948_I2C_SLV0_DO, value)
+        self._queue_bank(tx, 0)
+        tx.execute()
+        time.sleep(MAG_SETTLE_TIME)
 
     def mag_read(self, reg):
         """Read a byte from the slave magnetometer."""
-        self.bank(3)
-        self._write(ICM20948_I2C_SLV0_CTRL, 0x80 | 1)  # Read 1 byte
-        self._write(ICM20948_I2C_SLV0_ADDR, AK09916_I2C_ADDR | 0x80)
-        self._write(ICM20948_I2C_SLV0_REG, reg)
-        self._write(ICM20948_I2C_SLV0_DO, 0xff)
-        self.bank(0)
-        return self._read(ICM20948_EXT_SLV_SENS_DATA_00)
+        return self._mag_read(reg, 1, 0x80 | 1)[0]  # Read 1 byte
 
     def mag_read_bytes(self, reg, length=1):
         """Read up to 24 bytes from the slave magnetometer."""
-        self.bank(3)
-        self._write(ICM20948_I2C_SLV0_CTRL, 0x80 | 0x08 | length)
-        self._write(ICM20948_I2C_SLV0_ADDR, AK09916_I2C_ADDR | 0x80)
-        self._write(ICM20948_I2C_SLV0_REG, reg)
-        self._write(ICM20948_I2C_SLV0_DO, 0xff)
-        self.bank(0)
-        return self._read_bytes(ICM20948_EXT_SLV_SENS_DATA_00, length)
+        return self._mag_read(reg, length, 0x80 | 0x08 | length)
+
+    def _mag_read(self, reg, length, ctrl):
+        """Set up the slave 0 read and fetch its bytes."""
+        tx = self._transaction()
+        self._queue_bank(tx, 3)
+        tx.write(ICM20948_I2C_SLV0_CTRL, ctrl)
+        tx.write(ICM20948_I2C_SLV0_ADDR, AK09916_I2C_ADDR | 0x80)
+        tx.write(ICM20948_I2C_SLV0_REG, reg)
+        tx.write(ICM20948_I2C_SLV0_DO, 0xff)
+        self._queue_bank(tx, 0)
+        tx.execute()
+
+        # The i2c master fetches the bytes in the background.
+        time.sleep(MAG_SETTLE_TIME)
+
+        data = self._read_bytes(ICM20948_EXT_SLV_SENS_DATA_00, length)
+
+        # One byte reads return the byte, not a list.
+        return data if isinstance(data, list) else [data]
 
     def magnetometer_ready(self):
         """Check the magnetometer status self._ready bit."""
@@ -243,71 +347,71 @@ class ICM_20948(Sensor):
         return degrees
 
     def _read_accelerometer_gyro_data(self):
-        self.bank(0)
-        data = self._read_bytes(ICM20948_ACCEL_XOUT_H, 12)
-
-        ax, ay, az, gx, gy, gz = struct.unpack(">hhhhhh", bytearray(data))
-
-        self.bank(2)
-
-        # Read accelerometer full scale range and
-        # use it to compensate the self._reading to gs
-        scale = (self._read(ICM20948_ACCEL_CONFIG) & 0x06) >> 1
-
-        # scale ranges from section 3.2 of the datasheet
-        gs = [16384.0, 8192.0, 4096.0, 2048.0][scale]
+        # The samples and the full scale configurations in one transaction.
+        samples = BANK_0_MAP.plan(("accel_x", "accel_y", "accel_z",
+                                   "gyro_x", "gyro_y", "gyro_z"))
+        scales = BANK_2_MAP.plan(("accel_fs_sel", "gyro_fs_sel"))
+
+        tx = self._transaction()
+        self._queue_bank(tx, 0)
+        n = samples.queue(tx)
+        self._queue_bank(tx, 2)
+        scales.queue(tx)
+        blocks = tx.execute()
+
+        data = samples.decode(blocks[:n])
+        config = scales.decode(blocks[n:])
+
+        # Compensate the readings to gs and convert to m/s^2
+        gs = ACCEL_SCALES[config["accel_fs_sel"]]
+        ax = data["accel_x"] / gs * self.g_to_ms
+        ay = data["accel_y"] / gs * self.g_to_ms
+        az = data["accel_z"] / gs * self.g_to_ms
+
+        # Compensate the readings to dps and convert to rad/s
+        dps = GYRO_SCALES[config["gyro_fs_sel"]]
+        gx = data["gyro_x"] / dps * self.dps_to_rads
+        gy = data["gyro_y"] / dps * self.dps_to_rads
+        gz = data["gyro_z"] / dps * self.dps_to_rads
 
-        ax /= gs
-        ay /= gs
-        az /= gs
-
-        # Convert to m/s^2
-        ax *= self.g_to_ms
-        ay *= self.g_to_ms
-        az *= self.g_to_ms
+        return ax, ay, az, gx, gy, gz
 
-        # Read back the degrees per second rate and
-        # use it to compensate the self._reading to dps
-        scale = (self._read(ICM20948_GYRO_CONFIG_1) & 0x06) >> 1
+    def _set_fields(self, **values):
+        """Read-modify-write fields of the bank 2 register map.
 
-        # scale ranges from section 3.1 of the datasheet
-        dps = [131, 65.5, 32.8, 16.4][scale]
+        Args:
+            **values: Field name and value pairs, fields of the same
+                register are written together.
+        """
 
-        gx /= dps
-        gy /= dps
-        gz /= dps
+        self.bank(2)
+        registers = {}
+        for name, value in values.items():
+            field = BANK_2_MAP[name]
+            if field.address not in registers:
+                registers[field.address] = self._read(field.address)
+            registers[field.address] = field.encode(registers[field.address],
+                                                    value)
 
-        # Convert to rad/s
-        gx *= self.dps_to_rads
-        gy *= self.dps_to_rads
-        gz *= self.dps_to_rads
-
-        return ax, ay, az, gx, gy, gz
+        for address, value in registers.items():
+            self._write(address, value)
 
     def set_accelerometer_sample_rate(self, rate=125):
         """Set the accelerometer sample rate in Hz."""
         self.bank(2)
         # 125Hz - 1.125 kHz / (1 + rate)
         rate = int((1125.0 / rate) - 1)
-        # TODO maybe use struct to pack and then write_bytes
-        self._write(ICM20948_ACCEL_SMPLRT_DIV_1, (rate >> 8) & 0xff)
-        self._write(ICM20948_ACCEL_SMPLRT_DIV_2, rate & 0xff)
+        msb, lsb = BANK_2_MAP["accel_smplrt_div"].pack(rate)
+        self._write(ICM20948_ACCEL_SMPLRT_DIV_1, msb)
+        self._write(ICM20948_ACCEL_SMPLRT_DIV_2, lsb)
 
     def set_accelerometer_full_scale(self, scale=16):
         """Set the accelerometer fulls cale range to +- the supplied value."""
-        self.bank(2)
-        value = self._read(ICM20948_ACCEL_CONFIG) & 0b11111001
-        value |= {2: 0b00, 4: 0b01, 8: 0b10, 16: 0b11}[scale] << 1
-        self._write(ICM20948_ACCEL_CONFIG, value)
+        self._set_fields(accel_fs_sel=ACCEL_FS_SEL[scale])
 
     def set_accelerometer_low_pass(self, enabled=True, mode=5):
         """Configure the accelerometer low pass filter."""
-        self.bank(2)
-        value = self._read(ICM20948_ACCEL_CONFIG) & 0b10001110
-        if enabled:
-            value |= 0b1
-        value |= (mode & 0x07) << 4
-        self._write(ICM20948_ACCEL_CONFIG, value)
+        self._set_fields(accel_fchoice=int(enabled), accel_dlpfcfg=mode)
 
     def set_gyro_sample_rate(self, rate=100):
         """Set the gyro sample rate in Hz."""
@@ -318,16 +422,8 @@ class ICM_20948(Sensor):
 
     def set_gyro_full_scale(self, scale=250):
         """Set the gyro full scale range to +- supplied value."""
-        self.bank(2)
-        value = self._read(ICM20948_GYRO_CONFIG_1) & 0b11111001
-        value |= {250: 0b00, 500: 0b01, 1000: 0b10, 2000: 0b11}[scale] << 1
-        self._write(ICM20948_GYRO_CONFIG_1, value)
+        self._set_fields(gyro_fs_sel=GYRO_FS_SEL[scale])
 
     def set_gyro_low_pass(self, enabled=True, mode=5):
         """Configure the gyro low pass filter."""
-        self.bank(2)
-        value = self._read(ICM20948_GYRO_CONFIG_1) & 0b10001110
-        if enabled:
-            value |= 0b1
-        value |= (mode & 0x07) << 4
-        self._write(ICM20948_GYRO_CONFIG_1, value)
+        self._set_fields(gyro_fchoice=int(enabled), gyro_dlpfcfg=mode)
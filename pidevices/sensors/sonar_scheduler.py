@@ -0,0 +1,181 @@
+"""sonar_scheduler.py"""
+
+import threading
+import time
+from collections import namedtuple
+from ..stats import RunningStats
+
+# The distance in centimeters, -1 when it was out of range, and the
+# time.time() of the echo.
+SonarReading = namedtuple("SonarReading", ["distance", "timestamp"])
+
+
+class _Sonar(object):
+    """The state of one sonar of the scheduler."""
+
+    def __init__(self, sonar):
+        self.sonar = sonar
+        self.latest = None
+        self.last = None            # perf_counter of the last reading
+        self.readings = 0
+        self.out_of_range = 0
+        self.errors = 0
+        self.last_error = None
+        self.periods = RunningStats()
+
+    def failed(self, error):
+        """Count an exception of the sonar, it doesn't stop the thread."""
+        self.errors += 1
+        self.last_error = error
+
+
+class SonarScheduler(object):
+    """Fires a group of :class:`HcSr04` sonars from one background thread.
+
+    Sonars that hear each other's pings can't measure together, so the
+    thread fires them in slots: every slot triggers the sonars of one group,
+    collects their echoes and lasts at least slot seconds, letting the
+    echoes fade before the next group. Without groups the sonars are fired
+    round robin, one per slot, groups of sonars that face apart can share a
+    slot and raise the rate of everyone.
+
+    The latest reading of every sonar is published as a
+    :class:`SonarReading` that is replaced, never changed, so
+    :meth:`latest` and :meth:`readings` don't block the control loop. The
+    scheduler owns the sonars, they shouldn't be read directly while it
+    runs. An exception of a sonar is counted and kept in its statistics and
+    the thread goes on firing the others.
+
+    Args:
+        sonars (dict): The started sonars with their names as keys.
+        groups (list): Lists of names of sonars fired in the same slot, every
+            sonar should be in one group. Defaults to one sonar per slot.
+        slot (float): The min seconds of a slot. Defaults to :data:`0.04`.
+        name (str): The name of the thread.
+    """
+
+    def __init__(self, sonars, groups=None, slot=0.04,
+                 name="sonar-scheduler"):
+        """Constructor"""
+
+        if groups is None:
+            groups = [[key] for key in sonars]
+        fired = [sonar for group in groups for sonar in group]
+        if sorted(fired) != sorted(sonars):
+            raise ValueError("Every sonar should be in one group.")
+
+        self._sonars = {key: _Sonar(sonar) for key, sonar in sonars.items()}
+        self._groups = [list(group) for group in groups]
+        self.slot = slot
+        self._name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start firing the sonars."""
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop firing, after the current slot."""
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def latest(self, sonar):
+        """The latest reading of a sonar.
+
+        Args:
+            sonar (str): The name of the sonar.
+
+        Returns:
+            :class:`SonarReading`: Or None before the first reading.
+        """
+        return self._sonars[sonar].latest
+
+    def readings(self):
+        """The latest reading of every sonar, see :meth:`latest`."""
+        return {key: state.latest for key, state in self._sonars.items()}
+
+    def statistics(self, sonar=None):
+        """The achieved rate and the readings of the sonars.
+
+        Args:
+            sonar (str): The name of a sonar. Defaults to all.
+
+        Returns:
+            dict: The mean readings per second, the readings, the ones out of
+            range, the failed ones and the last exception of the sonar, or a
+            dict with them for every sonar.
+        """
+
+        if sonar is None:
+            return {key: self.statistics(key) for key in self._sonars}
+
+        state = self._sonars[sonar]
+        mean = state.periods.mean
+
+        return {"rate": 1 / mean if mean else 0.0,
+                "readings": state.readings,
+                "out_of_range": state.out_of_range,
+                "errors": state.errors,
+                "last_error": state.last_error}
+
+    def _run(self):
+        while not self._stop.is_set():
+            for group in self._groups:
+                start = time.perf_counter()
+                self._fire(group, start)
+
+                # Let the echoes fade before the next group.
+                remaining = start + self.slot - time.perf_counter()
+                if self._stop.wait(max(remaining, 0)):
+                    return
+
+    def _fire(self, group, start):
+        """Trigger the sonars of a group together and collect the echoes."""
+
+        triggered = []
+        for key in group:
+            state = self._sonars[key]
+            try:
+                state.sonar.trigger()
+            except Exception as error:
+                state.failed(error)
+            else:
+                triggered.append(state)
+
+        for state in triggered:
+            sonar = state.sonar
+            timeout = start + sonar.ECHO_TIMEOUT - time.perf_counter()
+            try:
+                distance = sonar.collect(max(timeout, 0))
+            except Exception as error:
+                state.failed(error)
+                continue
+
+            now = time.perf_counter()
+            state.latest = SonarReading(distance, time.time())
+            state.readings += 1
+            if distance == -1:
+                state.out_of_range += 1
+            if state.last is not None:
+                state.periods.add(now - state.last)
+            state.last = now
+
+    def close(self):
+        """Stop firing and free the sonars."""
+
+        self.stop()
+        for state in self._sonars.values():
+            state.sonar.stop()
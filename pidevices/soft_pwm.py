@@ -0,0 +1,263 @@
+"""soft_pwm.py"""
+
+import math
+import threading
+import time
+from .stats import RunningStats
+
+
+class _Channel(object):
+    """The state of one software pwm output."""
+
+    def __init__(self, port, mask, period, duty_cycle, start):
+        self.port = port
+        self.mask = mask
+        self.period = period
+        self.duty_cycle = duty_cycle
+        self.start = start          # Scheduled start of the current period
+        self.next = start           # Scheduled time of the next edge
+        self.rising = True          # If the next edge starts a period
+        self.level = 0
+        self.last_start = None      # Actual start of the current period
+        self.missed = 0
+        self.periods = RunningStats()
+        self.jitter = RunningStats()
+
+
+class SoftPWM(object):
+    """One thread that generates software pwm on many outputs.
+
+    The outputs are bits of ports, like the OLATA and OLATB latches of an
+    mcp23017, that are written with write(port, mask, bits). The thread
+    computes the next edge of every output from monotonic deadlines, the
+    period start of an output is always a whole number of periods after its
+    first one, so the frequency doesn't drift with the time of the writes.
+    Outputs start on the period grid of the first output, so outputs of the
+    same or harmonic frequencies have their edges at the same deadlines,
+    whenever they were started. Edges of the same port that are due within
+    tolerance seconds are merged into one write. If the thread falls behind
+    more than a period, the missed periods are skipped and counted.
+
+    Args:
+        write: Function write(port, mask, bits) that sets the bits of mask in
+            port to the values of bits.
+        tolerance (float): Seconds between edges that are written together.
+            Defaults to :data:`0.0001`.
+        name (str): The name of the thread.
+    """
+
+    def __init__(self, write, tolerance=0.0001, name="soft-pwm"):
+        """Constructor"""
+
+        self._write = write
+        self.tolerance = tolerance
+        self._name = name
+        self._condition = threading.Condition()
+        self._channels = {}
+        self._latches = {}
+        self._epoch = None          # The start of the first output
+        self._thread = None
+        self.edges = 0
+        self.writes = 0
+
+    def start(self, key, port, mask, frequency, duty_cycle=0):
+        """Start the pwm of an output, it starts low.
+
+        The first period starts on the next whole number of periods since
+        the start of the first output.
+
+        Args:
+            key: The name of the output.
+            port: The port of the output.
+            mask (int): The bit of the output in its port.
+            frequency (float): The frequency in Hz.
+            duty_cycle (float): The duty cycle in [0, 1]. Defaults to
+                :data:`0`.
+        """
+
+        self._check(frequency, duty_cycle)
+        with self._condition:
+            self._write(port, mask, 0)
+            self._latches[port] = self._latches.get(port, 0) & ~mask
+
+            now = time.perf_counter()
+            if self._epoch is None:
+                self._epoch = now
+            period = 1 / frequency
+            self._channels[key] = _Channel(port, mask, period, duty_cycle,
+                                           self._grid(now, period))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name=self._name, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def set(self, key, frequency=None, duty_cycle=None):
+        """Change the frequency or the duty cycle of an output.
+
+        The change applies to the current period, a new frequency moves it
+        to the period grid of that frequency.
+
+        Args:
+            key: The name of the output.
+            frequency (float): The new frequency in Hz or None to keep it.
+            duty_cycle (float): The new duty cycle or None to keep it.
+        """
+
+        with self._condition:
+            channel = self._channels[key]
+            self._check(frequency or 1 / channel.period,
+                        channel.duty_cycle if duty_cycle is None
+                        else duty_cycle)
+            if frequency is not None:
+                channel.period = 1 / frequency
+                # The current period moves to the grid of the new frequency
+                channel.start = self._grid(time.perf_counter(),
+                                           channel.period) - channel.period
+            if duty_cycle is not None:
+                channel.duty_cycle = duty_cycle
+            if channel.rising:
+                channel.next = channel.start + channel.period
+            else:
+                channel.next = (channel.start
+                                + channel.period * channel.duty_cycle)
+            self._condition.notify_all()
+
+    def stop(self, key):
+        """Stop the pwm of an output and set it low.
+
+        Args:
+            key: The name of the output.
+        """
+
+        with self._condition:
+            channel = self._channels.pop(key, None)
+            if channel is None:
+                return
+            self._latches[channel.port] = (self._latches.get(channel.port, 0)
+                                           & ~channel.mask)
+            self._write(channel.port, channel.mask, 0)
+            self._condition.notify_all()
+
+    def statistics(self, key=None):
+        """Statistics of the pwm.
+
+        Args:
+            key: The name of an output or None for the totals.
+
+        Returns:
+            dict: For an output the achieved "frequency" in Hz, the missed
+            periods and the statistics of the seconds from the deadline to
+            the write of every edge in "jitter", see
+            :meth:`RunningStats.as_dict`. The totals are the number of
+            "edges" and of port "writes".
+        """
+
+        with self._condition:
+            if key is None:
+                return {"edges": self.edges, "writes": self.writes}
+
+            channel = self._channels[key]
+            mean = channel.periods.mean
+            return {"frequency": 1 / mean if mean else None,
+                    "missed": channel.missed,
+                    "jitter": channel.jitter.as_dict()}
+
+    def close(self):
+        """Stop every output."""
+
+        for key in list(self._channels):
+            self.stop(key)
+
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _grid(self, moment, period):
+        """The first period start at or after moment, on the grid of whole
+        periods since the start of the first output."""
+        periods = math.ceil((moment - self._epoch) / period)
+        return self._epoch + periods * period
+
+    @staticmethod
+    def _check(frequency, duty_cycle):
+        if frequency <= 0:
+            raise ValueError("The frequency should be positive.")
+        if not 0 <= duty_cycle <= 1:
+            raise ValueError("The duty cycle should be in [0, 1].")
+
+    def _run(self):
+        clock = time.perf_counter
+        with self._condition:
+            while self._channels:
+                deadline = min(channel.next
+                               for channel in self._channels.values())
+                remaining = deadline - clock()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._fire(clock())
+            self._thread = None
+
+    def _fire(self, now):
+        """Advance the due outputs and write their ports."""
+
+        limit = now + self.tolerance
+        ports = {}
+        for channel in self._channels.values():
+            if channel.next > limit:
+                continue
+            level = channel.level
+            channel.jitter.add(now - channel.next)
+            self._advance(channel, now)
+            if channel.level != level:
+                self.edges += 1
+            ports[channel.port] = ports.get(channel.port, 0) | channel.mask
+
+        for port, mask in ports.items():
+            latch = self._latches.get(port, 0)
+            bits = 0
+            for channel in self._channels.values():
+                if channel.port == port and channel.mask & mask \
+                        and channel.level:
+                    bits |= channel.mask
+            # Only the outputs that changed are written
+            mask &= bits ^ latch
+            if not mask:
+                continue
+            try:
+                self._write(port, mask, bits & mask)
+            except OSError:
+                # The port keeps its old value and is written again with
+                # the next edge.
+                continue
+            self._latches[port] = (latch & ~mask) | (bits & mask)
+            self.writes += 1
+
+    @staticmethod
+    def _advance(channel, now):
+        if not channel.rising:
+            channel.level = 0
+            channel.rising = True
+            channel.next = channel.start + channel.period
+            return
+
+        if channel.last_start is not None:
+            channel.periods.add(now - channel.last_start)
+        channel.last_start = now
+        channel.start = channel.next
+        behind = now - channel.start
+        if behind > channel.period:
+            # Skip the periods that the thread missed
+            skipped = int(behind / channel.period)
+            channel.missed += skipped
+            channel.start += skipped * channel.period
+
+        duty_cycle = channel.duty_cycle
+        if 0 < duty_cycle < 1:
+            channel.level = 1
+            channel.rising = False
+            channel.next = channel.start + channel.period * duty_cycle
+        else:
+            channel.level = 1 if duty_cycle else 0
+            channel.next = channel.start + channel.period
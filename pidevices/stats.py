@@ -0,0 +1,114 @@
+"""stats.py"""
+
+import math
+from collections import deque
+
+
+class RunningStats(object):
+    """Running statistics of a series of measurements.
+
+    Count, mean, standard deviation, min and max are updated in constant
+    time and memory with Welford's algorithm. Percentiles are computed from
+    the last window values.
+
+    Args:
+        window (int): How many of the last values are kept for percentiles.
+            Defaults to :data:`1024`.
+    """
+
+    def __init__(self, window=1024):
+        """Constructor"""
+
+        self._window = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        """Forget every value."""
+
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+        self._window.clear()
+
+    def add(self, value):
+        """Add a new value.
+
+        Args:
+            value (float): The measurement.
+        """
+
+        self._count += 1
+        self._total += value
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+        self._window.append(value)
+
+    @property
+    def count(self):
+        """Number of values."""
+        return self._count
+
+    @property
+    def total(self):
+        """Sum of the values."""
+        return self._total
+
+    @property
+    def mean(self):
+        """Mean of the values."""
+        return self._mean
+
+    @property
+    def std(self):
+        """Standard deviation of the values."""
+        return math.sqrt(self._m2 / self._count) if self._count else 0.0
+
+    @property
+    def min(self):
+        """Min value or None if there aren't any values."""
+        return self._min
+
+    @property
+    def max(self):
+        """Max value or None if there aren't any values."""
+        return self._max
+
+    def percentile(self, p):
+        """Percentile of the last window values.
+
+        Args:
+            p (float): The percentile in [0, 100].
+
+        Returns:
+            float: The value or None if there aren't any values.
+        """
+
+        if not self._window:
+            return None
+
+        values = sorted(self._window)
+        rank = (len(values) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+    def as_dict(self):
+        """A dictionary with the statistics."""
+
+        return {"count": self._count,
+                "total": self._total,
+                "mean": self._mean,
+                "std": self.std,
+                "min": self._min,
+                "max": self._max,
+                "p50": self.percentile(50),
+                "p99": self.percentile(99)}
@@ -0,0 +1,71 @@
+import unittest
+import threading
+import time
+from pidevices.hardware_interfaces.bus_arbiter import BusArbiter
+
+
+class TestBusArbiter(unittest.TestCase):
+
+    def test_priority_order(self):
+        arbiter = BusArbiter()
+        order = []
+
+        def use_bus(client):
+            with client:
+                order.append(client.name)
+
+        holder = arbiter.client(name="holder")
+        holder.__enter__()
+
+        threads = []
+        for priority, name in [(0, "low"), (-5, "lowest"), (10, "imu")]:
+            thread = threading.Thread(target=use_bus,
+                                      args=(arbiter.client(priority, name),))
+            thread.start()
+            threads.append(thread)
+            # Wait the thread to queue so the arrival order is known.
+            while arbiter.waiting < len(threads):
+                time.sleep(0.001)
+
+        holder.__exit__(None, None, None)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ["imu", "low", "lowest"])
+
+    def test_reentrant(self):
+        arbiter = BusArbiter()
+        client = arbiter.client(name="dev")
+        with client:
+            with client:
+                pass
+            self.assertEqual(arbiter.waiting, 0)
+
+        # Released, another thread gets it without waiting.
+        done = threading.Event()
+
+        def use_bus():
+            with arbiter.client():
+                done.set()
+
+        threading.Thread(target=use_bus).start()
+        self.assertTrue(done.wait(1), "The bus should be free")
+
+    def test_statistics(self):
+        arbiter = BusArbiter()
+        client = arbiter.client(name="dev")
+        for _ in range(3):
+            with client:
+                time.sleep(0.001)
+
+        stats = arbiter.statistics()["dev"]
+        self.assertEqual(stats["wait"]["count"], 3, "Should be 3")
+        self.assertEqual(stats["hold"]["count"], 3, "Should be 3")
+        self.assertGreater(stats["hold"]["total"], 0.002)
+
+        arbiter.reset_statistics()
+        self.assertEqual(arbiter.statistics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from pidevices.hardware_interfaces.bus_pool import BusPool
+from pidevices.hardware_interfaces.hardware_interfaces import I2C
+from pidevices.devices import Sensor
+
+
+class CountingI2C(I2C):
+    """I2C implementation that counts opened and closed connections."""
+
+    opened = 0
+    closed = 0
+
+    def __init__(self, bus):
+        self.bus = bus
+        CountingI2C.opened += 1
+
+    def close(self):
+        if BusPool.release(self):
+            CountingI2C.closed += 1
+
+    def _set_bus(self, bus):
+        self._bus = bus
+
+    def _get_bus(self):
+        return self._bus
+
+
+class TestBusPool(unittest.TestCase):
+
+    def setUp(self):
+        CountingI2C.opened = 0
+        CountingI2C.closed = 0
+
+    def test_shared_handles(self):
+        first = BusPool.acquire("i2c", CountingI2C, bus=1)
+        second = BusPool.acquire("I2C", CountingI2C, bus=1)
+        other = BusPool.acquire("I2C", CountingI2C, bus=0)
+
+        self.assertEqual(CountingI2C.opened, 2, "One connection per bus")
+        self.assertIsNot(first, second, "Every device gets its own handle")
+        self.assertIs(first._lock.arbiter, second._lock.arbiter,
+                      "Handles share the bus arbiter")
+        self.assertIsNot(first._lock, second._lock,
+                         "Every handle has its own client")
+        self.assertIsNot(first._lock.arbiter, other._lock.arbiter)
+        self.assertEqual(BusPool.references("I2C", CountingI2C, bus=1), 2)
+
+        first.close()
+        first.close()   # Closing twice doesn't release twice
+        self.assertEqual(CountingI2C.closed, 0, "Bus still in use")
+        second.close()
+        self.assertEqual(CountingI2C.closed, 1, "Closed with the last handle")
+        self.assertEqual(BusPool.references("I2C", CountingI2C, bus=1), 0)
+
+        other.close()
+        self.assertEqual(CountingI2C.closed, 2)
+
+    def test_not_pooled(self):
+        self.assertTrue(BusPool.release(CountingI2C(bus=1)))
+
+    def test_init_interface(self):
+        devices = [Sensor(), Sensor()]
+        handles = [device._create_interface("I2C", CountingI2C, bus=3)
+                   for device in devices]
+
+        self.assertEqual(CountingI2C.opened, 1, "Should be one connection")
+        self.assertEqual(handles[0]._lock.priority, Sensor.BUS_PRIORITY)
+        self.assertEqual(handles[0]._lock.name, "Sensor")
+        for handle in handles:
+            handle.close()
+        self.assertEqual(CountingI2C.closed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
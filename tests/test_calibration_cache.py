@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from pidevices.calibration_cache import CalibrationCache
+from pidevices.devices import Device
+from pidevices.sensors.bme680 import BME680
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache", "calibration.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TestCalibrationCache(CacheTestCase):
+
+    def test_put_get(self):
+        cache = CalibrationCache(self.path)
+        key = cache.key("BME680", 1, 0x77, 0x61)
+        self.assertEqual(key, "BME680:1:0x77:0x61")
+        self.assertIsNone(cache.get(key, [1]))
+
+        cache.put(key, {"par_t1": 1}, [1])
+        self.assertEqual(cache.get(key, [1]), {"par_t1": 1})
+        self.assertIsNone(cache.get(key, [2]), "The check doesn't match")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # Another process loads it from the file.
+        self.assertEqual(CalibrationCache(self.path).get(key, [1]),
+                         {"par_t1": 1})
+
+        cache.invalidate(key)
+        self.assertIsNone(CalibrationCache(self.path).get(key, [1]))
+
+    def test_corrupted_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = CalibrationCache(self.path)
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", 1)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["entries"]["key"]["data"], 1)
+
+    def test_unwritable_path(self):
+        # A file where the directory should be.
+        blocker = os.path.join(self.directory, "file")
+        open(blocker, "w").close()
+        cache = CalibrationCache(os.path.join(blocker, "calibration.json"))
+        cache.put("key", 1)
+        self.assertEqual(cache.get("key"), 1, "Kept in memory")
+
+    def test_resolve(self):
+        cache = CalibrationCache(self.path)
+        self.assertIsNone(CalibrationCache.resolve(None))
+        self.assertIs(CalibrationCache.resolve(cache), cache)
+        self.assertIs(CalibrationCache.resolve(True),
+                      CalibrationCache.default())
+        self.assertEqual(CalibrationCache.resolve(self.path).path, self.path)
+
+
+class TestDriverCaches(CacheTestCase):
+
+    def setUp(self):
+        super(TestDriverCaches, self).setUp()
+        SimI2C.reset()
+        Device.simulate()
+        self.bus = SimI2C.sim_bus(1)
+
+    def tearDown(self):
+        Device.simulate(False)
+        super(TestDriverCaches, self).tearDown()
+
+    def start_bme680(self):
+        self.bus.reset_counters()
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1, calibration_cache=self.path)
+        return bme, self.bus.transfers
+
+    def test_bme680(self):
+        bme, cold = self.start_bme680()
+        expected = bme.read()
+
+        bme, warm = self.start_bme680()
+        self.assertLess(warm, cold)
+        self.assertEqual(bme.read(), expected)
+
+        # Another chip at the address, its par_t1 differs.
+        model = self.bus.device(0x77)
+        struct.pack_into("<H", model.registers, 0xE9, 26000)
+        bme, refresh = self.start_bme680()
+        self.assertEqual(refresh, cold)
+        self.assertEqual(bme._t_calib.par_t1, 26000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import threading
+import unittest
+from pidevices.dispatcher import Dispatcher
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = Dispatcher(workers=2, max_pending=8)
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_order_per_key(self):
+        calls = []
+        for i in range(8):
+            self.dispatcher.submit("A_0", calls.append, i)
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(calls, list(range(8)))
+
+    def test_keys_in_parallel(self):
+        release = threading.Event()
+        started = threading.Event()
+        self.dispatcher.submit("A_0", release.wait, 1)
+        self.dispatcher.submit("B_0", started.set)
+        self.assertTrue(started.wait(1), "B_0 doesn't wait for A_0")
+        release.set()
+        self.assertTrue(self.dispatcher.join(1))
+
+    def test_coalesce(self):
+        dispatcher = Dispatcher(workers=1, max_pending=1)
+        release = threading.Event()
+        running = threading.Event()
+        calls = []
+
+        def handler(i):
+            running.set()
+            release.wait(1)
+            calls.append(i)
+
+        self.assertTrue(dispatcher.submit("A_0", handler, 0))
+        running.wait(1)
+        self.assertTrue(dispatcher.submit("A_0", handler, 1), "Waits")
+        self.assertFalse(dispatcher.submit("A_0", handler, 2), "Coalesced")
+        self.assertEqual(dispatcher.depth, 1)
+        release.set()
+        self.assertTrue(dispatcher.join(1))
+        self.assertEqual(calls, [0, 1])
+
+        stats = dispatcher.statistics()
+        self.assertEqual((stats["submitted"], stats["coalesced"],
+                          stats["completed"], stats["max_depth"]),
+                         (3, 1, 2, 1))
+        dispatcher.close()
+
+    def test_back_pressure(self):
+        dispatcher = Dispatcher(workers=1, max_pending=4, max_queue=2)
+        release = threading.Event()
+        running = threading.Event()
+        dispatcher.submit("A_0", lambda: (running.set(), release.wait(1)))
+        running.wait(1)
+        results = [dispatcher.submit(key, lambda: None)
+                   for key in ("A_1", "A_2", "A_3")]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(dispatcher.statistics()["rejected"], 1)
+        release.set()
+        dispatcher.close()
+
+    def test_errors(self):
+        def fail():
+            raise RuntimeError("handler error")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.dispatcher.submit("A_0", fail)
+            self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(self.dispatcher.statistics()["errors"], 1)
+
+        calls = []
+        self.dispatcher.submit("A_0", calls.append, 1)
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(calls, [1], "Workers survive errors")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from pidevices.edge_queue import EdgeQueue
+from pidevices.hardware_interfaces import gpio_implementations
+
+
+class FakePi(object):
+    """The calls of the pigpio daemon that PiGPIO makes for input pins."""
+
+    connected = True
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def set_mode(self, pin, mode):
+        pass
+
+    def set_pull_up_down(self, pin, pull):
+        pass
+
+    def callback(self, pin, edge, func):
+        self.callbacks[pin] = func
+        return mock.Mock()
+
+
+class TestEdgeQueue(unittest.TestCase):
+
+    def test_drain(self):
+        queue = EdgeQueue(capacity=4)
+        queue.push(17, 1, 100)
+        queue.push(17, 0, 250)
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.drain(), [(1, 100), (0, 250)])
+        self.assertEqual(queue.drain(), [])
+
+        for tick in range(6):
+            queue.push(17, tick & 1, tick)
+        self.assertEqual(queue.drain(2), [(0, 0), (1, 1)])
+        self.assertEqual(queue.drain(), [(0, 2), (1, 3)])
+        self.assertEqual(queue.statistics()["overflows"], 2)
+
+    def test_debounce_wraps(self):
+        queue = EdgeQueue(bounce=1000)
+        queue.push(17, 1, 0xFFFFFF00)
+        queue.push(17, 0, 0x00000100)       # 512us later, wrapped
+        queue.push(17, 0, 0x00000400)       # 1280us after the first
+        self.assertEqual(queue.drain(), [(1, 0xFFFFFF00), (0, 0x400)])
+        self.assertEqual(queue.statistics()["debounced"], 1)
+
+    def test_consumer_thread(self):
+        queue = EdgeQueue(capacity=1024)
+        received = []
+
+        def consume():
+            while queue.wait():
+                received.extend(queue.drain())
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for tick in range(1000):
+            queue.push(17, tick & 1, tick)
+        queue.close()
+        consumer.join(1)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual([tick for _, tick in received], list(range(1000)))
+
+    def test_wait_timeout(self):
+        queue = EdgeQueue()
+        self.assertFalse(queue.wait(0.01))
+        threading.Timer(0.01, queue.push, (17, 1, 5)).start()
+        self.assertTrue(queue.wait(1))
+
+    def test_wait_async(self):
+        queue = EdgeQueue()
+
+        async def consume():
+            threading.Timer(0.01, queue.push, (17, 1, 5)).start()
+            self.assertTrue(await queue.wait_async())
+            return queue.drain()
+
+        self.assertEqual(asyncio.run(consume()), [(1, 5)])
+
+
+class TestPiGPIOQueue(unittest.TestCase):
+
+    def setUp(self):
+        pigpio = mock.Mock(pi=FakePi)
+        patcher = mock.patch.object(gpio_implementations, "PIGPIO", pigpio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.gpio = gpio_implementations.PiGPIO(button=4)
+        self.gpio.init_input("button", "up")
+
+    def test_bounce_change(self):
+        queue = self.gpio.edge_queue("button")
+        push = self.gpio.gpio.callbacks[4]
+        push(4, 1, 0)
+        push(4, 0, 2000)
+        self.assertEqual(len(queue.drain()), 2)
+
+        self.gpio.set_pin_bounce("button", 5)
+        self.assertEqual(queue.bounce, 5000)
+        push(4, 1, 4000)
+        push(4, 0, 10000)
+        self.assertEqual(queue.drain(), [(0, 10000)])
+
+
+if __name__ == "__main__":
+    unittest.main()
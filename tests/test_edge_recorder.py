@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+import unittest
+from pidevices.edge_recorder import EdgeBatch, EdgeRecorder
+from pidevices.exceptions import NotInputPin
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestEdgeRecorder(unittest.TestCase):
+
+    def test_read_wraps(self):
+        recorder = EdgeRecorder(capacity=4)
+        for tick in range(3):
+            recorder.record(5, tick & 1, tick)
+        self.assertEqual(list(recorder.read(2).tick), [0, 1])
+
+        for tick in range(3, 8):
+            recorder.record(6, tick & 1, tick)
+        batch = recorder.read()
+        self.assertEqual(list(batch.tick), [2, 3, 4, 5])
+        self.assertEqual(list(batch.gpio), [5, 6, 6, 6])
+        self.assertEqual(list(batch.level), [0, 1, 0, 1])
+        self.assertEqual(recorder.statistics()["overflows"], 2)
+
+    def test_stream(self):
+        recorder = EdgeRecorder(capacity=1024)
+
+        def produce():
+            for tick in range(1000):
+                recorder.record(17, tick & 1, tick)
+            recorder.close()
+
+        threading.Thread(target=produce).start()
+        ticks = []
+        for batch in recorder.stream(batch_size=64):
+            self.assertLessEqual(len(batch), 64)
+            ticks.extend(batch.tick)
+        self.assertEqual(ticks, list(range(1000)))
+
+    def test_save_load(self):
+        recorder = EdgeRecorder()
+        recorder.record(4, 1, 0xFFFFFFF0)
+        recorder.record(4, 0, 0x10)
+        batch = recorder.read()
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            batch.save(path)
+            loaded = EdgeBatch.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual([list(c) for c in loaded], [list(c) for c in batch])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_to_numpy(self):
+        recorder = EdgeRecorder()
+        recorder.record(4, 1, 100)
+        recorder.record(9, 0, 350)
+        edges = recorder.read().to_numpy()
+        self.assertEqual(list(edges["gpio"]), [4, 9])
+        self.assertEqual(list(numpy.diff(edges["tick"])), [250])
+
+    def test_sim_gpio(self):
+        SimGPIO.reset()
+        gpio = SimGPIO(a=20, b=21, out=22)
+        gpio.init_input("a", "down")
+        gpio.init_input("b", "down")
+        gpio.init_output("out", 0)
+        with self.assertRaises(NotInputPin):
+            gpio.record_edges(["out"])
+
+        recorder = gpio.record_edges(["a", "b"])
+        SimGPIO.set_level(20, 1)
+        SimGPIO.set_level(21, 1)
+        SimGPIO.set_level(20, 0)
+        batch = recorder.read()
+        self.assertEqual(list(zip(batch.gpio, batch.level)),
+                         [(20, 1), (21, 1), (20, 0)])
+
+        recorder.close()
+        SimGPIO.set_level(21, 0)
+        self.assertEqual(len(recorder), 0)
+        gpio.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
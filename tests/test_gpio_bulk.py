@@ -0,0 +1,100 @@
+import unittest
+from pidevices.devices import Device
+from pidevices.exceptions import NotInputPin, NotOutputPin
+from pidevices.sensors.cytron_line_sensor_lss05 import CytronLfLSS05Mcp23017
+from pidevices.hardware_interfaces.gpio_implementations import (Mcp23017GPIO,
+                                                                SimGPIO)
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+
+class TestSimGPIOBulk(unittest.TestCase):
+    """The per pin fallback of the GPIO class."""
+
+    def setUp(self):
+        SimGPIO.reset()
+        self.gpio = SimGPIO(a=5, b=6, c=13)
+        for pin in ("a", "b", "c"):
+            self.gpio.init_input(pin, "down")
+
+    def test_read_many(self):
+        SimGPIO.set_level(6, 1)
+        self.assertEqual(self.gpio.read_many(["a", "b", "c"]), [0, 1, 0])
+        self.assertEqual(self.gpio.read_mask(["b", "a", "c"]), 0b001)
+
+    def test_write_mask(self):
+        out = SimGPIO(x=20, y=21)
+        out.init_output("x", 0)
+        out.init_output("y", 0)
+        out.write_mask(["x", "y"], 0b10)
+        self.assertEqual((SimGPIO.get_level(20), SimGPIO.get_level(21)),
+                         (0, 1))
+        with self.assertRaises(NotOutputPin):
+            self.gpio.write_many({"a": 1})
+
+
+class TestMcp23017Bulk(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        Device.simulate()
+        self.bus = SimI2C.sim_bus(1)
+        self.model = self.bus.device(0x20)
+
+    def tearDown(self):
+        Device.simulate(False)
+
+    def test_read_many(self):
+        pins = {"a0": "A_0", "a3": "A_3", "b1": "B_1", "b7": "B_7"}
+        gpio = Mcp23017GPIO(**pins)
+        for name in pins:
+            gpio.init_input(name, "down")
+        self.model.set_pin("A_3", 1)
+        self.model.set_pin("B_7", 1)
+
+        self.bus.reset_counters()
+        self.assertEqual(gpio.read_many(["a0", "a3", "b1", "b7"]),
+                         [0, 1, 0, 1])
+        self.assertEqual(self.bus.transfers, 1, "Both ports in one read")
+        both = self.bus.bytes
+
+        self.bus.reset_counters()
+        self.assertEqual(gpio.read_mask(["a3", "a0"]), 0b01)
+        self.assertEqual(self.bus.transfers, 1)
+        self.assertEqual(self.bus.bytes, both - 1, "Only port A")
+
+        with self.assertRaises(NotInputPin):
+            gpio.add_pins(out="A_5")
+            gpio.init_output("out", 0)
+            gpio.read_many(["a0", "out"])
+        gpio.close()
+
+    def test_write_many(self):
+        pins = {"a1": "A_1", "a2": "A_2", "b0": "B_0", "b4": "B_4"}
+        gpio = Mcp23017GPIO(cache_registers=True, **pins)
+        for name in pins:
+            gpio.init_output(name, 0)
+
+        self.bus.reset_counters()
+        gpio.write_many({"a1": 1, "a2": 1, "b0": 0, "b4": 1})
+        self.assertEqual([self.model.get_pin(p) for p in pins.values()],
+                         [1, 1, 0, 1])
+        self.assertEqual(self.bus.transfers, 2, "One latch write per port")
+
+        gpio.write_mask(["a1", "a2", "b4"], 0b010)
+        self.assertEqual([self.model.get_pin(p) for p in pins.values()],
+                         [0, 1, 0, 0])
+        gpio.close()
+
+    def test_line_sensor(self):
+        sensor = CytronLfLSS05Mcp23017("A_0", "A_1", "A_2", "A_3", "A_4",
+                                       address=0x20)
+        self.model.set_pin("A_2", 1)
+
+        self.bus.reset_counters()
+        self.assertEqual(tuple(sensor.read()), (0, 0, 1, 0, 0))
+        self.assertEqual(self.bus.transfers, 1)
+        sensor.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from pidevices.devices import Device
+from pidevices.exceptions import NotInputPin, NotOutputPin, StalePinHandle
+from pidevices.hardware_interfaces.gpio_implementations import (Mcp23017GPIO,
+                                                                SimGPIO)
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+
+class TestPinHandle(unittest.TestCase):
+
+    def setUp(self):
+        SimGPIO.reset()
+        self.gpio = SimGPIO(out=20, inp=21)
+        self.gpio.init_output("out", 0)
+        self.gpio.init_input("inp", "down")
+
+    def test_read_write(self):
+        out = self.gpio.handle("out")
+        out.write(1)
+        self.assertEqual(SimGPIO.get_level(20), 1)
+        out.write(0)
+        self.assertEqual(SimGPIO.get_level(20), 0)
+
+        inp = self.gpio.handle("inp")
+        SimGPIO.set_level(21, 1)
+        self.assertEqual(inp.read(), 1)
+        self.assertIs(self.gpio.handle("inp"), inp, "One handle per pin")
+
+    def test_wrong_function(self):
+        with self.assertRaises(NotInputPin):
+            self.gpio.handle("out").read()
+        with self.assertRaises(NotOutputPin):
+            self.gpio.handle("inp").write(1)
+
+    def test_invalidated(self):
+        out = self.gpio.handle("out")
+        self.gpio.set_pin_function("out", "input")
+        with self.assertRaises(StalePinHandle):
+            out.write(1)
+        self.assertEqual(self.gpio.handle("out").read(), 0)
+
+        inp = self.gpio.handle("inp")
+        self.gpio.remove_pins("inp")
+        with self.assertRaises(StalePinHandle):
+            inp.read()
+
+    def test_pwm(self):
+        out = self.gpio.handle("out")
+        self.gpio.set_pin_pwm("out", True)
+        with self.assertRaises(StalePinHandle):
+            out.write(1)
+        self.gpio.handle("out").write(0.5)
+        self.assertEqual(self.gpio.get_pin_duty_cycle("out"), 0.5)
+
+
+class TestMcp23017PinHandle(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        Device.simulate()
+        self.model = SimI2C.sim_bus(1).device(0x20)
+
+    def tearDown(self):
+        Device.simulate(False)
+
+    def test_read_write(self):
+        gpio = Mcp23017GPIO(out="B_2", inp="A_4")
+        gpio.init_output("out", 0)
+        gpio.init_input("inp", "down")
+
+        gpio.handle("out").write(1)
+        self.assertEqual(self.model.get_pin("B_2"), 1)
+        self.model.set_pin("A_4", 1)
+        self.assertEqual(gpio.handle("inp").read(), 1)
+        gpio.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.edge_recorder import tick_us
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.sensors.hc_sr04 import HcSr04RPiGPIO
+
+TRIGGER_PIN, ECHO_PIN = 5, 6
+
+
+class TestHcSr04Sim(unittest.TestCase):
+
+    def setUp(self):
+        SimGPIO.reset()
+        Device.simulate()
+        self.echo_duration = 2900       # us, an obstacle at 48cm
+
+        # The sensor answers the falling edge of the trigger with an echo,
+        # its edges carry ticks so the load of the machine doesn't stretch
+        # it.
+        self.responder = SimGPIO(trigger=TRIGGER_PIN)
+        self.responder.init_input("trigger", "down")
+        self.responder.set_pin_edge("trigger", "falling")
+
+        def echo():
+            rise = (tick_us() + 500) & 0xFFFFFFFF
+            SimGPIO.set_level(ECHO_PIN, 1, tick=rise)
+            SimGPIO.set_level(ECHO_PIN, 0,
+                              tick=(rise + self.echo_duration) & 0xFFFFFFFF)
+
+        self.responder.set_pin_event("trigger", echo)
+
+        self.sonar = HcSr04RPiGPIO(TRIGGER_PIN, ECHO_PIN)
+        self.sonar.start()
+
+    def tearDown(self):
+        self.sonar.stop()
+        self.responder.close()
+        Device.simulate(False)
+
+    def test_read(self):
+        start = time.perf_counter()
+        distance = self.sonar.read(SAVE=True)
+        elapsed = time.perf_counter() - start
+        self.assertAlmostEqual(distance, 48, delta=0.1)
+        self.assertLess(elapsed, 0.02, "Waits only for the echo")
+        self.assertEqual(len(self.sonar.data), 1)
+
+    def test_trigger_collect(self):
+        self.sonar.trigger()
+        self.assertGreater(self.sonar.collect(), 0)
+        self.assertGreater(self.sonar.read(), 0, "Old edges are dropped")
+
+    def test_out_of_range(self):
+        self.echo_duration = 25000          # Beyond 4m
+        self.assertEqual(self.sonar.read(SAVE=True), -1)
+        self.assertEqual(len(self.sonar.data), 0)
+
+        self.responder.set_pin_event("trigger", lambda: None)
+        self.assertEqual(self.sonar.read(), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from pidevices.hardware_interfaces.hardware_interfaces import I2C
+from pidevices.hardware_interfaces.i2c_implementations import SMBus2
+from pidevices.hardware_interfaces.bus_arbiter import BusArbiter
+
+
+class RegisterI2C(I2C):
+    """I2C implementation over a dictionary of registers."""
+
+    def __init__(self):
+        self.registers = {}
+        self.calls = 0
+
+    def read(self, address, register, byte_num=1):
+        self.calls += 1
+        data = [self.registers.get(register + i, 0) for i in range(byte_num)]
+        return data if byte_num > 1 else data[0]
+
+    def write(self, address, register, data):
+        self.calls += 1
+        data = data if isinstance(data, list) else [data]
+        for i, byte in enumerate(data):
+            self.registers[register + i] = byte
+
+
+class RecordingSMBus(object):
+    """Stand in for smbus2.SMBus that records i2c_rdwr calls."""
+
+    def __init__(self):
+        self.ioctls = []
+
+    def i2c_rdwr(self, *msgs):
+        self.ioctls.append(msgs)
+        for i, msg in enumerate(msgs):
+            if msg.flags:     # Read, return the register address + offset
+                register = msgs[i - 1].buf[0][0]
+                for j in range(msg.len):
+                    msg.buf[j] = bytes([register + j])
+
+
+class TestI2CTransaction(unittest.TestCase):
+
+    def test_fallback(self):
+        i2c = RegisterI2C()
+        results = i2c.transaction(0x40)\
+            .write(0x10, 7)\
+            .write(0x20, [1, 2, 3])\
+            .read(0x10)\
+            .read(0x20, 3)\
+            .execute()
+
+        self.assertEqual(results, [[7], [1, 2, 3]])
+        self.assertEqual(i2c.calls, 4)
+
+    def test_queue_is_reset(self):
+        i2c = RegisterI2C()
+        tx = i2c.transaction(0x40).write(0x00, 1)
+        self.assertEqual(len(tx), 1)
+        tx.execute()
+        self.assertEqual(len(tx), 0)
+        self.assertEqual(tx.execute(), [])
+
+    def test_smbus2_rdwr(self):
+        i2c = SMBus2.__new__(SMBus2)
+        i2c._smbus = RecordingSMBus()
+        i2c._lock = BusArbiter().client()
+
+        tx = i2c.transaction(0x69)
+        for i in range(41):
+            tx.write(i, i)
+        tx.read(0x2D, 12).read(0x14)
+        results = tx.execute()
+
+        self.assertEqual(results, [list(range(0x2D, 0x2D + 12)), [0x14]])
+
+        ioctls = i2c._smbus.ioctls
+        self.assertEqual(sum(len(msgs) for msgs in ioctls), 45)
+        self.assertEqual([len(msgs) for msgs in ioctls], [41, 4])
+        # The register write of a read is never split from the read
+        for msgs in ioctls:
+            self.assertFalse(msgs[0].flags)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that only specific drivers need.
+HEAVY_MODULES = ["alsaaudio", "cv2", "picamera", "pygame", "scipy", "numpy",
+                 "evdev", "RPi", "pigpio", "smbus2", "spidev", "periphery",
+                 "Adafruit_ADS1x15", "rpi_ws281x"]
+
+
+def run(code):
+    """Run code in a fresh interpreter and return its stdout lines."""
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True)
+    return out.stdout.split()
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_import_loads_no_drivers(self):
+        loaded = run("import sys, pidevices\n"
+                     "print(' '.join(sorted(sys.modules)))")
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, loaded,
+                             "{} imported by pidevices".format(module))
+
+        drivers = [m for m in loaded if m.startswith("pidevices.sensors.")
+                   or m.startswith("pidevices.actuators.")
+                   or m.endswith("_implementations")]
+        self.assertEqual(drivers, [], "No driver module should be imported")
+
+    def test_access_imports_only_its_module(self):
+        loaded = run("import sys, pidevices\n"
+                     "pidevices.HcSr04\n"
+                     "print(' '.join(m for m in sorted(sys.modules) "
+                     "if m.startswith('pidevices.sensors.')))")
+
+        self.assertIn("pidevices.sensors.hc_sr04", loaded)
+        self.assertNotIn("pidevices.sensors.bme680", loaded)
+
+    def test_bus_modules_load_no_models(self):
+        loaded = run("import sys\n"
+                     "from pidevices.hardware_interfaces import (\n"
+                     "    i2c_implementations, spi_implementations)\n"
+                     "print(' '.join(sorted(sys.modules)))")
+        self.assertNotIn("pidevices.hardware_interfaces.sim_devices", loaded)
+
+    def test_exported_names(self):
+        import pidevices
+        from pidevices import sensors, actuators, hardware_interfaces
+
+        self.assertIn("BME680", dir(pidevices))
+        self.assertIn("CV2Camera", sensors.__all__)
+        self.assertIn("PCA9685", actuators.__all__)
+        self.assertIn("SMBus2", hardware_interfaces.__all__)
+        self.assertIs(pidevices.Device, pidevices.devices.Device)
+
+        with self.assertRaises(AttributeError):
+            pidevices.NotADriver
+
+    def test_import_time(self):
+        # Compared with importing every driver module in the same
+        # interpreter, not a fixed bound, so a slow machine doesn't fail it.
+        # Drivers whose libraries aren't installed count up to the error.
+        lazy, eager = run("import time\n"
+                          "t = time.perf_counter()\n"
+                          "import pidevices\n"
+                          "lazy = time.perf_counter() - t\n"
+                          "t = time.perf_counter()\n"
+                          "for name in pidevices.__all__:\n"
+                          "    try:\n"
+                          "        getattr(pidevices, name)\n"
+                          "    except Exception:\n"
+                          "        pass\n"
+                          "print(lazy, time.perf_counter() - t)")
+        self.assertLess(float(lazy), float(eager))
+
+    def test_icm20948_constants(self):
+        import pidevices
+        from pidevices.sensors import icm_20948_imu
+
+        self.assertEqual(pidevices.ICM20948_WHO_AM_I,
+                         icm_20948_imu.ICM20948_WHO_AM_I)
+        self.assertEqual(pidevices.AK09916_CHIP_ID, 0x09)
+        self.assertEqual(pidevices.CHIP_ID, 0xEA)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import threading
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.mcp23017 import MCP23017
+from pidevices.int_poller import IntPoller
+from pidevices.hardware_interfaces.gpio_implementations import (Mcp23017GPIO,
+                                                                SimGPIO)
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+INTA, INTB = 17, 27
+
+
+class IntLineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        SimGPIO.reset()
+        Device.simulate()
+        self.bus = SimI2C.sim_bus(1)
+        self.model = self.bus.device(0x20)
+        self.mirror = True
+
+        def wire(port, level):
+            SimGPIO.set_level(INTB if port and not self.mirror else INTA,
+                              level)
+
+        self.model.on_interrupt = wire
+        self.called = threading.Semaphore(0)
+        self.events = []
+
+    def tearDown(self):
+        Device.simulate(False)
+
+    def handler(self, *args):
+        self.events.append(args)
+        self.called.release()
+
+
+class TestIntLines(IntLineTestCase):
+
+    def start(self, mcp, pins):
+        for pin in pins:
+            mcp.set_pin_dir(pin, 1)
+            mcp.set_pin_int(pin, 1)
+            mcp.set_pin_debounce(pin, 0)
+            mcp.set_int_handl_func(pin, self.handler, pin)
+        mcp.poll_int_async(pins)
+
+    def test_mirrored(self):
+        mcp = MCP23017(1, 0x20)
+        mcp.set_int_lines(INTA)
+        self.assertEqual(mcp.get_mirror(), 1)
+        self.start(mcp, ["A_0", "B_1"])
+
+        self.model.set_pin("B_1", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.model.set_pin("A_0", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.assertEqual(self.events, [("B_1",), ("A_0",)])
+        self.assertEqual(SimGPIO.get_level(INTA), 0, "Released")
+        self.assertEqual(mcp.int_statistics()["submitted"], 2)
+
+        mcp.stop()
+
+    def test_separate_lines(self):
+        self.mirror = False
+        mcp = MCP23017(1, 0x20)
+        mcp.set_int_lines(INTA, INTB)
+        self.assertEqual(mcp.get_mirror(), 0)
+        self.start(mcp, ["B_2"])
+
+        self.model.set_pin("B_2", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.assertEqual(self.events, [("B_2",)])
+        mcp.stop()
+
+    def test_idle_bus(self):
+        mcp = MCP23017(1, 0x20)
+        mcp.set_int_lines(INTA)
+        self.start(mcp, ["A_0"])
+        time.sleep(0.01)
+
+        self.bus.reset_counters()
+        time.sleep(0.05)
+        self.assertEqual(self.bus.transfers, 0, "No polling between edges")
+
+        self.model.set_pin("A_0", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        mcp.stop()
+
+    def test_gpio_implementation(self):
+        gpio = Mcp23017GPIO(int_a=INTA, echo="A_1")
+        gpio.init_input("echo", "down")
+        gpio.set_pin_edge("echo", "rising")
+        gpio.set_pin_event("echo", self.handler)
+        gpio.start_polling("echo")
+
+        self.model.set_pin("A_1", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.assertEqual(self.events, [("A_1", 1)])
+        gpio.stop_polling()
+        gpio.close()
+
+
+class TestAdaptivePolling(IntLineTestCase):
+
+    def configure(self, mcp, pin):
+        mcp.set_pin_dir(pin, 1)
+        mcp.set_pin_int(pin, 1)
+        mcp.set_pin_debounce(pin, 0)
+        mcp.set_int_handl_func(pin, self.handler, mcp.address, pin)
+
+    def test_shared_poller(self):
+        first, second = MCP23017(1, 0x20), MCP23017(1, 0x21)
+        self.configure(first, "A_0")
+        self.configure(second, "B_3")
+        first.poll_int_async(["A_0"])
+        second.poll_int_async(["B_3"])
+
+        self.bus.device(0x21).set_pin("B_3", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.model.set_pin("A_0", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.assertEqual(self.events, [(0x21, "B_3"), (0x20, "A_0")])
+        threads = [t for t in threading.enumerate()
+                   if t.name == "mcp23017-poller"]
+        self.assertEqual(len(threads), 1, "One polling thread per bus")
+
+        first.stop()
+        second.stop()
+
+    def test_backoff(self):
+        mcp = MCP23017(1, 0x20)
+        mcp.poll_latency = 0.005
+        self.configure(mcp, "A_0")
+        mcp.poll_int_async(["A_0"])
+        time.sleep(0.05)
+
+        self.bus.reset_counters()
+        time.sleep(0.1)
+        self.assertLess(self.bus.transfers, 40, "About one poll per 5ms")
+        poller = IntPoller.shared(1)
+        self.assertGreater(poller.statistics()["interval"], 0.003)
+
+        start = time.perf_counter()
+        self.model.set_pin("A_0", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+        self.assertLess(time.perf_counter() - start, 0.05)
+        mcp.stop()
+
+    def test_bus_errors(self):
+        poller = IntPoller()
+        good, lost = MCP23017(1, 0x20), MCP23017(1, 0x21)
+        good.set_pin_dir("A_0", 1)
+        good.set_pin_int("A_0", 1)
+        subscription = poller.add(lost, ["A_0"], self.handler, 0.01)
+        poller.add(good, ["A_0"], lambda pin: self.called.release(), 0.01)
+        model = self.bus.device(0x21)
+        start = time.perf_counter()
+        self.bus.detach(0x21)
+        time.sleep(0.1)
+
+        stats = poller.statistics(subscription)
+        elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(stats["errors"], poller.ERROR_BACKOFF)
+        self.assertLessEqual(stats["errors"],
+                             poller.ERROR_BACKOFF + elapsed / 0.01 + 1,
+                             "One read per 10ms after the backoff")
+        self.assertIsInstance(stats["last_error"], OSError)
+        self.assertEqual(poller.statistics()["errors"], stats["errors"])
+
+        self.model.set_pin("A_0", 1)
+        self.assertTrue(self.called.acquire(timeout=1))
+
+        self.bus.attach(0x21, model)
+        time.sleep(0.05)
+        self.assertEqual(poller.statistics(subscription)
+                         ["consecutive_errors"], 0)
+        for sub in list(poller._subscriptions):
+            poller.remove(sub)
+        good.stop()
+        lost.stop()
+
+    def test_wait_pin_for_edge(self):
+        mcp = MCP23017(1, 0x20)
+        mcp.set_pin_dir("A_2", 1)
+        timer = threading.Timer(0.01, self.model.set_pin, ("A_2", 1))
+        timer.start()
+        self.assertEqual(mcp.wait_pin_for_edge("A_2", timeout=1000), 1)
+        self.assertEqual(mcp.wait_pin_for_edge("A_2", timeout=20), 0)
+        self.assertEqual(mcp.get_pin_int("A_2"), 0, "Disabled again")
+        timer.join()
+        mcp.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import math
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.odometry import DifferentialOdometry
+from pidevices.sensors.df_robot_wheel_encoders import DfRobotWheelEncoderRpiGPIO
+
+WHEEL_BASE, WHEEL_RADIUS = 0.2, 0.05
+# Meters of a pulse, the encoders have 10 pulses per revolution.
+PULSE = 2 * math.pi * WHEEL_RADIUS / 10
+
+
+class Motors(object):
+    directions = (1, 1)
+
+
+class TestDifferentialOdometry(unittest.TestCase):
+
+    def setUp(self):
+        SimGPIO.reset()
+        Device.simulate()
+        self.left = DfRobotWheelEncoderRpiGPIO(17)
+        self.right = DfRobotWheelEncoderRpiGPIO(27)
+        self.motors = Motors()
+        self.odometry = DifferentialOdometry.from_config(
+            self.left, self.right,
+            {"wheel_base": WHEEL_BASE, "wheel_radius": WHEEL_RADIUS,
+             "rate": 200},
+            motors=self.motors)
+
+    def tearDown(self):
+        self.odometry.close()
+        self.left.stop()
+        self.right.stop()
+        Device.simulate(False)
+
+    def pulses(self, left, right):
+        for _ in range(left):
+            self.left._cbf()
+        for _ in range(right):
+            self.right._cbf()
+
+    def test_straight(self):
+        self.pulses(10, 10)
+        self.odometry.step()
+        state = self.odometry.state()
+        self.assertAlmostEqual(state.x, 10 * PULSE)
+        self.assertAlmostEqual(state.y, 0)
+        self.assertAlmostEqual(state.theta, 0)
+
+        self.motors.directions = (-1, -1)
+        self.pulses(10, 10)
+        self.odometry.step()
+        self.assertAlmostEqual(self.odometry.state().x, 0)
+
+    def test_turn_in_place(self):
+        self.motors.directions = (-1, 1)
+        self.pulses(5, 5)
+        self.odometry.step()
+        state = self.odometry.state()
+        self.assertAlmostEqual(state.x, 0)
+        self.assertAlmostEqual(state.theta, 10 * PULSE / WHEEL_BASE)
+
+    def test_reset(self):
+        self.pulses(10, 10)
+        self.odometry.step()
+        self.odometry.reset(1, 2, math.pi / 2)
+        self.pulses(10, 10)
+        self.odometry.step()
+        state = self.odometry.state()
+        self.assertAlmostEqual(state.x, 1)
+        self.assertAlmostEqual(state.y, 2 + 10 * PULSE)
+
+    def test_thread(self):
+        self.pulses(3, 3)
+        self.odometry.start()
+        self.pulses(10, 10)
+        time.sleep(0.2)
+        self.odometry.stop()
+
+        state = self.odometry.state()
+        self.assertAlmostEqual(state.x, 10 * PULSE, msg="Started after 3")
+        self.assertLessEqual(state.timestamp, time.time())
+        stats = self.odometry.statistics()
+        self.assertGreater(stats["steps"], 10)
+        self.assertAlmostEqual(stats["rate"], 200, delta=60)
+        self.assertGreaterEqual(stats["jitter"]["min"], 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            DifferentialOdometry(self.left, self.right, 0, WHEEL_RADIUS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+from pidevices.devices import Device
+from pidevices.register_cache import RegisterCache
+from pidevices.mcp23x17 import MCP23x17
+from pidevices.mcp23017 import MCP23017
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+
+class RegisterMCP(MCP23x17):
+    """MCP23x17 over a dictionary of registers that counts bus accesses."""
+
+    def __init__(self, cache=False):
+        super(RegisterMCP, self).__init__()
+        self.registers = {}
+        self.reads = 0
+        self.writes = 0
+        if cache:
+            self._cache = RegisterCache(volatile=self._volatile_registers())
+
+    def _read_interface(self, address):
+        self.reads += 1
+        return self.registers.get(address, 0)
+
+    def _write_interface(self, address, value):
+        self.writes += 1
+        self.registers[address] = value
+
+
+class TestRegisterCache(unittest.TestCase):
+
+    def test_get_put(self):
+        cache = RegisterCache(volatile=[0x10])
+        self.assertIsNone(cache.get(0x00))
+        cache.put(0x00, 0)
+        cache.put(0x10, 5)
+        self.assertEqual(cache.get(0x00), 0)
+        self.assertIsNone(cache.get(0x10), "Volatile registers aren't cached")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_invalidate_resync(self):
+        cache = RegisterCache()
+        cache.put(0x00, 1)
+        cache.put(0x01, 2)
+        cache.invalidate([0x00])
+        self.assertNotIn(0x00, cache)
+        cache.resync(lambda register: register + 10)
+        self.assertEqual(cache.peek(0x01), 11)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_shared(self):
+        bus = object()
+        first = RegisterCache.shared(bus, 0x20)
+        second = RegisterCache.shared(bus, 0x20)
+        other = RegisterCache.shared(bus, 0x21)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+        RegisterCache.release(first)
+        self.assertIs(RegisterCache.shared(bus, 0x20), second)
+        RegisterCache.release(second)
+        RegisterCache.release(second)
+        self.assertIsNot(RegisterCache.shared(bus, 0x20), first,
+                         "Dropped with the last user")
+
+
+class TestMCP23x17Cache(unittest.TestCase):
+
+    def configure(self, mcp):
+        for pin in range(8):
+            mcp.set_pin_dir("A_{}".format(pin), 1)
+            mcp.set_pin_pull_up("A_{}".format(pin), 1)
+
+    def test_same_registers(self):
+        plain, cached = RegisterMCP(), RegisterMCP(cache=True)
+        self.configure(plain)
+        self.configure(cached)
+        self.assertEqual(plain.registers, cached.registers)
+
+    def test_fewer_bus_accesses(self):
+        plain, cached = RegisterMCP(), RegisterMCP(cache=True)
+        self.configure(plain)
+        self.configure(cached)
+        self.assertEqual((plain.reads, plain.writes), (16, 16))
+        self.assertEqual((cached.reads, cached.writes), (2, 16))
+
+        cached.set_pin_dir("A_0", 1)     # No change, no write
+        self.assertEqual(cached.get_pin_dir("A_0"), 1)
+        self.assertEqual((cached.reads, cached.writes), (2, 16))
+
+    def test_volatile_port(self):
+        mcp = RegisterMCP(cache=True)
+        mcp.registers[mcp.GPIOA] = 0x01
+        self.assertEqual(mcp.read("A_0"), 1)
+        mcp.registers[mcp.GPIOA] = 0x00
+        self.assertEqual(mcp.read("A_0"), 0, "The port is always read")
+
+        mcp.write("A_3", 1)
+        self.assertEqual(mcp.register_cache.peek(mcp.OLATA), 0x08,
+                         "A port write is a latch write")
+
+    def test_bank_change(self):
+        mcp = RegisterMCP(cache=True)
+        mcp.set_pin_dir("A_0", 1)
+        mcp.set_bank(1)
+        self.assertEqual(len(mcp.register_cache), 0,
+                         "Other addresses after a bank change")
+        self.assertIn(mcp.INTFA, mcp.register_cache.volatile)
+
+
+class TestMixedDrivers(unittest.TestCase):
+    """A cached and an uncached driver of the same chip."""
+
+    def setUp(self):
+        SimI2C.reset()
+        Device.simulate()
+        self.model = SimI2C.sim_bus(1).device(0x20)
+        self.cached = MCP23017(1, 0x20, cache_registers=True)
+        self.plain = MCP23017(1, 0x20)
+
+    def tearDown(self):
+        self.plain.stop()
+        self.cached.stop()
+        Device.simulate(False)
+
+    def test_writes(self):
+        self.cached.write_olat("A_0", 1)
+        self.plain.write_olat("A_1", 1)
+        self.assertEqual(self.cached.register_cache.peek(self.cached.OLATA),
+                         0b11, "The uncached write updates the cache")
+
+        self.cached.write_olat("A_2", 1)
+        self.assertEqual(self.model.read_register(self.cached.OLATA), 0b111)
+
+        self.plain.set_pin_dir("A_0", 0)
+        self.assertEqual(self.cached.get_pin_dir("A_0"), 0)
+
+    def test_reads(self):
+        self.cached.set_pin_dir("A_0", 0)
+        # Behind the back of both drivers, the uncached read refreshes it.
+        self.model.write_register(self.cached.IODIRA, 0xFF)
+        self.assertEqual(self.plain.get_pin_dir("A_0"), 1)
+        self.assertEqual(self.cached.get_pin_dir("A_0"), 1)
+
+    def test_without_cache(self):
+        self.cached.stop()
+        self.plain.write_olat("A_1", 1)
+        self.assertIsNone(RegisterCache.lookup(
+            self.plain.hardware_interfaces[self.plain._i2c], 0x20))
+
+
+if __name__ == "__main__":
+    unittest.main()
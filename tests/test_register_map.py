@@ -0,0 +1,95 @@
+import unittest
+from pidevices.register_map import RegisterMap, Field, Value
+from pidevices.hardware_interfaces.hardware_interfaces import I2C
+from pidevices.sensors.bme680 import BME680
+
+
+class RegisterI2C(I2C):
+    """I2C implementation over a dictionary of registers."""
+
+    def __init__(self, registers):
+        self.registers = registers
+        self.reads = []
+
+    def read(self, address, register, byte_num=1):
+        self.reads.append((register, byte_num))
+        data = [self.registers.get(register + i, 0) for i in range(byte_num)]
+        return data if byte_num > 1 else data[0]
+
+
+class TestField(unittest.TestCase):
+
+    def test_decode_encode(self):
+        field = Field(0x14, shift=1, width=2)
+        self.assertEqual(field.mask, 0b110)
+        self.assertEqual(field.decode(0b11111101), 0b10)
+        self.assertEqual(field.encode(0b11111111, 0b01), 0b11111011)
+        self.assertEqual(field.encode(0, 0b111), 0b110, "Value is masked")
+
+    def test_signed(self):
+        field = Field(0x04, shift=4, width=4, signed=True)
+        self.assertEqual(field.decode(0xF0), -1)
+        self.assertEqual(field.decode(0x70), 7)
+
+    def test_out_of_register(self):
+        with self.assertRaises(ValueError):
+            Field(0x00, shift=6, width=3)
+
+
+class TestValue(unittest.TestCase):
+
+    def test_struct(self):
+        self.assertEqual(Value(0, "<h").unpack(b"\x00\xfe\xff", 1), -2)
+        self.assertEqual(Value(0, ">H").unpack(b"\x12\x34"), 0x1234)
+        self.assertEqual(Value(0, ">H").pack(0x1234), [0x12, 0x34])
+
+    def test_partial(self):
+        # 20 bit adc value, msb lsb and the high nibble of xlsb
+        adc = Value(0x22, ">3", shift=4, width=20)
+        self.assertEqual(adc.size, 3)
+        self.assertEqual(adc.unpack(bytes([0x12, 0x34, 0x5F])), 0x12345)
+
+        signed = Value(0x00, ">H", shift=4, width=12, signed=True)
+        self.assertEqual(signed.unpack(bytes([0xFF, 0xF0])), -1)
+
+
+class TestRegisterMap(unittest.TestCase):
+
+    def setUp(self):
+        self.map = RegisterMap({
+            "a": Value(0x00, "<H"),
+            "b": Field(0x03, 0, 4),
+            "c": Value(0x20, "b"),
+            "d": Field(0x03, 4, 4),
+        })
+
+    def test_plan(self):
+        plan = self.map.plan(["a", "b", "c", "d"])
+        self.assertEqual(plan.blocks, [(0x00, 4), (0x20, 1)])
+        self.assertIs(plan, self.map.plan(["a", "b", "c", "d"]), "Cached")
+
+    def test_read(self):
+        i2c = RegisterI2C({0x00: 0x34, 0x01: 0x12, 0x03: 0xA5, 0x20: 0xFF})
+        values = self.map.read(i2c, 0x40, self.map)
+        self.assertEqual(values, {"a": 0x1234, "b": 0x5, "c": -1, "d": 0xA})
+        self.assertEqual(i2c.reads, [(0x00, 4), (0x20, 1)])
+
+    def test_bme680_calibration(self):
+        registers = {BME680.PAR_T1_l: 0x6E, BME680.PAR_T1_l + 1: 0x66,
+                     BME680.PAR_T3: 0x03,
+                     BME680.PAR_H2_h: 0x3F, BME680.PAR_H1_l: 0x4A,
+                     BME680.PAR_H1_h: 0x2D,
+                     BME680.RES_HEAT_RANGE: 0x16}
+        i2c = RegisterI2C(registers)
+        pars = BME680.CALIBRATION_MAP.read(i2c, 0x77, BME680.CALIBRATION_MAP)
+
+        self.assertEqual(len(i2c.reads), 3, "Three calibration blocks")
+        self.assertEqual(pars["par_t1"], 0x666E)
+        self.assertEqual(pars["par_t3"], 3)
+        self.assertEqual((pars["par_h1_msb"] << 4) | pars["par_h1_lsb"], 0x2DA)
+        self.assertEqual((pars["par_h2_msb"] << 4) | pars["par_h2_lsb"], 0x3F4)
+        self.assertEqual(pars["res_heat_range"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import numpy
+from pidevices.ring_buffer import ArrayRingBuffer
+from pidevices.devices import Device, Sensor
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.sensors.bme680 import BME680
+from pidevices.sensors.icm_20948_imu import ICM_20948
+from pidevices.sensors.df_robot_wheel_encoders import \
+    DfRobotWheelEncoderRpiGPIO
+
+
+class TestArrayRingBuffer(unittest.TestCase):
+
+    def test_append_wrap(self):
+        ring = ArrayRingBuffer(4, "f8")
+        for i in range(6):
+            ring.append(i)
+
+        self.assertEqual(len(ring), 4, "Should be 4")
+        self.assertEqual(list(ring.last()), [2, 3, 4, 5])
+        self.assertEqual(list(ring.last(2)), [4, 5])
+        self.assertEqual(ring[-1], 5, "Should be 5")
+        self.assertEqual(ring[0], 2, "Should be 2")
+
+    def test_window_is_view(self):
+        ring = ArrayRingBuffer(3, "i4")
+        for i in range(5):
+            ring.append(i)
+
+        window = ring.window(0, 3)
+        self.assertEqual(list(window), [2, 3, 4])
+        self.assertFalse(window.flags.owndata, "Should be a view")
+        with self.assertRaises(ValueError):
+            window[0] = 10
+        with self.assertRaises(IndexError):
+            ring.window(2, 1)
+
+    def test_record_dtype(self):
+        ring = ArrayRingBuffer(2, [("x", "f4"), ("y", "f4")])
+        ring.append((1, 2))
+        ring.append((3, 4))
+        ring.append((5, 6))
+        self.assertEqual(list(ring.last()["x"]), [3, 5])
+
+    def test_vector_shape(self):
+        ring = ArrayRingBuffer(2, "f4", shape=(3,))
+        ring.append([1, 2, 3])
+        self.assertTrue(numpy.array_equal(ring[-1], [1, 2, 3]))
+
+    def test_device_data(self):
+        sensor = Sensor(max_data_length=3, data_dtype="f8")
+        for i in range(4):
+            sensor.update_data(i)
+        self.assertEqual(list(sensor.get_data(0, -1)), [1, 2, 3])
+        self.assertEqual(list(sensor.get_data(-2, -1)), [2, 3])
+
+        sensor = Sensor(max_data_length=3)
+        sensor.update_data(1)
+        self.assertEqual(sensor.data[-1], 1, "Should be 1")
+
+
+class TestDriverData(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        SimGPIO.reset()
+        Device.simulate()
+
+    def tearDown(self):
+        Device.simulate(False)
+
+    def test_drivers(self):
+        imu = ICM_20948(1, max_data_length=8, data_dtype="f4",
+                        data_shape=(3, 3))
+        bme = BME680(1, 1, max_data_length=8, data_dtype="f8",
+                     data_shape=(4,))
+        encoder = DfRobotWheelEncoderRpiGPIO(5, max_data_length=8,
+                                            data_dtype="f8")
+        for sensor in (imu, bme, encoder):
+            self.assertIsInstance(sensor.data, ArrayRingBuffer)
+
+        imu.update_data(numpy.ones((3, 3)))
+        self.assertEqual(imu.get_data(-1, -1).shape, (1, 3, 3))
+        bme.update_data(list(bme.read()))
+        self.assertEqual(len(bme.data), 1)
+
+        imu.stop()
+        bme.stop()
+        encoder.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
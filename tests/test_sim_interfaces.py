@@ -0,0 +1,219 @@
+import errno
+import threading
+import unittest
+from pidevices.devices import Device
+from pidevices.mcp23017 import MCP23017
+from pidevices.actuators.pca9685 import PCA9685
+from pidevices.sensors.bme680 import BME680
+from pidevices.sensors.icm_20948_imu import ICM_20948
+from pidevices.sensors.mcp3002 import Mcp3002
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+from pidevices.hardware_interfaces.spi_implementations import SimSPI
+from pidevices.hardware_interfaces.hpwm_implementations import SimHPWM
+from pidevices.hardware_interfaces.sim_devices import BusLatency
+
+
+class SimTestCase(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        SimSPI.reset()
+        SimGPIO.reset()
+        Device.simulate()
+        self.bus = SimI2C.sim_bus(1)
+
+    def tearDown(self):
+        Device.simulate(False)
+
+
+class TestSelection(SimTestCase):
+
+    def test_named_implementations_are_replaced(self):
+        device = Device()
+        gpio = device.hardware_interfaces[
+            device.init_interface("gpio", impl="RPiGPIO", echo=5)]
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=1)]
+        pwm = device.hardware_interfaces[
+            device.init_interface("hpwm", impl="HPWMPeriphery", pin=12)]
+        self.assertIsInstance(gpio, SimGPIO)
+        self.assertIsInstance(i2c, SimI2C)
+        self.assertIsInstance(pwm, SimHPWM)
+        i2c.close()
+
+    def test_missing_device(self):
+        i2c = SimI2C(3)
+        with self.assertRaises(OSError) as cm:
+            i2c.read(0x50, 0x00)
+        self.assertEqual(cm.exception.errno, errno.ENXIO)
+
+
+class TestSimI2C(SimTestCase):
+
+    def test_transaction_counts_ioctls(self):
+        i2c = SimI2C(1)
+        tx = i2c.transaction(0x40)
+        for i in range(41):
+            tx.write(0x06 + i, i)
+        tx.read(0x06, 4).read(0x0A, 1)
+        self.bus.reset_counters()
+        self.assertEqual(tx.execute(), [[0, 1, 2, 3], [4]])
+        self.assertEqual(self.bus.transfers, 2, "Like SMBus2, 41 + 4 msgs")
+
+    def test_readinto(self):
+        i2c = SimI2C(1)
+        buf = bytearray(6)
+        i2c.write(0x40, 0x06, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(i2c.readinto(0x40, 0x06, buf), 6)
+        self.assertEqual(buf, bytearray([1, 2, 3, 4, 5, 6]))
+
+    def test_latency(self):
+        latency = BusLatency.for_clock(100e3, per_transfer=0)
+        self.assertAlmostEqual(latency.duration(10), 9e-4)
+        self.assertAlmostEqual(BusLatency(1e-3, 0).duration(0, 3), 3e-3)
+
+
+class TestDrivers(SimTestCase):
+
+    def test_mcp23017(self):
+        mcp = MCP23017(1, 0x20)
+        model = self.bus.device(0x20)
+
+        mcp.set_pin_dir("A_0", 1)
+        mcp.set_pin_pull_up("A_0", 1)
+        self.assertEqual(mcp.read("A_0"), 1, "Pulled up")
+        model.set_pin("A_0", 0)
+        self.assertEqual(mcp.read("A_0"), 0)
+
+        mcp.set_pin_dir("B_1", 0)
+        mcp.write("B_1", 1)
+        self.assertEqual(model.get_pin("B_1"), 1)
+
+        mcp.set_pin_int("A_0", 1)
+        model.set_pin("A_0", 1)
+        self.assertEqual(mcp.get_intf("A_0"), 1)
+        self.assertEqual(model.interrupt(0), 0, "Active low output")
+        self.assertEqual(mcp.get_intcap("A_0"), 1)
+        self.assertEqual(mcp.get_intf("A_0"), 0, "Cleared by INTCAP")
+        mcp.stop()
+
+    def test_mcp23017_byte_mode(self):
+        mcp = MCP23017(1, 0x21)
+        mcp.set_pin_dir("A_2", 1)
+        mcp.set_pin_int("A_2", 1)
+        self.bus.device(0x21).set_pin("A_2", 1)
+        mcp.set_seqop(1)
+        mcp.set_bank(1)
+        i2c = mcp.hardware_interfaces[mcp._i2c]
+        self.assertEqual(i2c.read(0x21, mcp.INTFA, 4), [0x04] * 4)
+        mcp.stop()
+
+    def test_pca9685(self):
+        pca = PCA9685(1, frequency=50)
+        model = self.bus.device(0x40)
+        pca.write([0, 1], [0.5, 0.25])
+        self.assertAlmostEqual(model.frequency, 50, places=0)
+        self.assertEqual(model.duty_cycle(0), 0.5)
+        self.assertEqual(model.duty_cycle(1), 0.25)
+        self.assertEqual(pca.frequency, 50)
+
+    def test_pca9685_settle_releases_bus(self):
+        pca = PCA9685(1)
+        arbiter = pca.hardware_interfaces[pca._i2c].lock.arbiter
+        owners = []
+        pca._settle_osc = lambda: owners.append(arbiter._owner)
+        pca.frequency = 50
+        self.assertEqual(owners, [None])
+        self.assertAlmostEqual(self.bus.device(0x40).frequency, 50, places=0)
+
+    def test_bme680(self):
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        data = bme.read()
+        self.assertAlmostEqual(data.temp, 25.0, places=1)
+        self.assertAlmostEqual(data.pres, 1000.0, delta=0.1)
+        self.assertAlmostEqual(data.hum, 40.0, delta=0.1)
+        self.assertGreater(data.gas, 0)
+
+    def test_bme680_burst_read(self):
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        model = self.bus.device(0x77)
+        model.conversion_time = bme.measurement_duration() + 0.005
+        self.bus.reset_counters()
+        data = bme.read()
+        self.assertAlmostEqual(data.temp, 25.0, places=1)
+        self.assertGreater(data.gas, 0)
+        # The ctrl_meas write and a field 0 read, then polls of it.
+        self.assertLessEqual(self.bus.transfers, 2 + 2 * 10)
+
+        model.conversion_time = 0
+        self.bus.reset_counters()
+        bme.read()
+        self.assertEqual(self.bus.transfers, 2)
+
+    def test_icm_20948(self):
+        icm = ICM_20948(1)
+        model = self.bus.device(0x69)
+        model.set_sample((2048, 0, 0), (0, 131 * 8, 0))
+        model.magnetometer.field = (10, 20, -30)
+
+        data = icm.read()
+        self.assertAlmostEqual(data.accel.x, icm.g_to_ms)
+        self.assertAlmostEqual(data.gyro.y, 8 * icm.dps_to_rads)
+        self.assertAlmostEqual(data.magne.z, -4.5)
+
+    def test_icm_20948_start(self):
+        model = self.bus.device(0x69)
+        model.set_sample((0, 0, 2048), (131, 0, 0))
+        self.bus.reset_counters()
+        icm = ICM_20948(1)
+        # gyro fchoice, dlpf 5 and fs 250, accel fchoice, dlpf 5 and fs 16
+        self.assertEqual(model.bank_register(2, 0x01), 0x29)
+        self.assertEqual(model.bank_register(2, 0x14), 0x2F)
+        self.assertEqual(model.bank_register(2, 0x00), 10)
+        self.assertEqual(model.bank_register(2, 0x11), 8)
+        self.assertAlmostEqual(icm.read().gyro.x, icm.dps_to_rads)
+
+        # Without a magnetometer behind the i2c master
+        model.magnetometer.registers[0x01] = 0
+        with self.assertRaises(RuntimeError):
+            ICM_20948(1)
+
+    def test_mcp3002(self):
+        adc = Mcp3002(port=0, device=1)
+        adc._AVERAGES = 1
+        SimSPI.sim_bus(0, 1).device(0).set_voltage(1, 1.65)
+        self.assertAlmostEqual(adc.read(1), 1.65, places=2)
+        self.assertEqual(adc.read(0), 0)
+
+
+class TestSimGPIO(SimTestCase):
+
+    def test_events_and_loopback(self):
+        out = SimGPIO(trigger=5)
+        inp = SimGPIO(echo=5)
+        out.init_output("trigger", 0)
+        inp.init_input("echo", "down")
+
+        events = []
+        inp.set_pin_edge("echo", "rising")
+        inp.set_pin_event("echo", events.append, "rise")
+        out.write("trigger", 1)
+        out.write("trigger", 0)
+        self.assertEqual(events, ["rise"])
+        self.assertEqual(inp.read("echo"), 0)
+
+    def test_wait_for_edge(self):
+        gpio = SimGPIO(echo=6)
+        gpio.init_input("echo", "down")
+        gpio.set_pin_edge("echo", "rising")
+        timer = threading.Timer(0.01, SimGPIO.set_level, (6, 1))
+        timer.start()
+        self.assertTrue(gpio.wait_pin_for_edge("echo", timeout=1000))
+        self.assertFalse(gpio.wait_pin_for_edge("echo", timeout=10))
+        timer.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
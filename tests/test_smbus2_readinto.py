@@ -0,0 +1,74 @@
+import unittest
+from ctypes import memmove
+from pidevices.hardware_interfaces.i2c_implementations import SMBus2
+from pidevices.hardware_interfaces.bus_arbiter import BusArbiter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class CounterSMBus(object):
+    """Stand in for smbus2.SMBus, reads return an incrementing counter."""
+
+    def __init__(self):
+        self.ioctls = []
+        self.counter = 0
+
+    def i2c_rdwr(self, *msgs):
+        self.ioctls.append([(msg.flags, msg.len) for msg in msgs])
+        for msg in msgs:
+            if msg.flags:
+                data = bytes((self.counter + i) & 0xFF
+                             for i in range(msg.len))
+                memmove(msg.buf, data, msg.len)
+                self.counter += msg.len
+
+
+def make_smbus2():
+    i2c = SMBus2.__new__(SMBus2)
+    i2c._smbus = CounterSMBus()
+    i2c._lock = BusArbiter().client()
+    return i2c
+
+
+class TestSMBus2Readinto(unittest.TestCase):
+
+    def test_readinto_bytearray(self):
+        i2c = make_smbus2()
+        buf = bytearray(20000)
+        self.assertEqual(i2c.readinto(0x69, 0x72, buf), 20000)
+        self.assertEqual(buf, bytearray(i & 0xFF for i in range(20000)))
+
+        # One register write and the read split in messages
+        self.assertEqual(i2c._smbus.ioctls,
+                         [[(0, 1), (1, 8192), (1, 8192), (1, 3616)]])
+
+    def test_readinto_memoryview_slice(self):
+        i2c = make_smbus2()
+        buf = bytearray(10)
+        i2c.readinto(0x69, 0x00, memoryview(buf)[2:6])
+        self.assertEqual(buf, bytearray([0, 0, 0, 1, 2, 3, 0, 0, 0, 0]))
+
+    def test_readonly_buffer(self):
+        i2c = make_smbus2()
+        with self.assertRaises(TypeError):
+            i2c.readinto(0x69, 0x00, bytes(4))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_readinto_numpy(self):
+        i2c = make_smbus2()
+        samples = numpy.zeros(4, dtype=">i2")
+        i2c.readinto(0x69, 0x2D, samples)
+        self.assertEqual(samples.tolist(), [0x0001, 0x0203, 0x0405, 0x0607])
+
+    def test_large_read(self):
+        i2c = make_smbus2()
+        self.assertEqual(i2c.read(0x69, 0x72, 100), list(range(100)))
+        self.assertEqual(i2c.read_i2c(0x69, 3), [100, 101, 102])
+        self.assertEqual(i2c.read_write(0x69, 0x10, [1], 2), [103, 104])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import threading
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.soft_pwm import SoftPWM
+from pidevices.hardware_interfaces.gpio_implementations import Mcp23017GPIO
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+
+OLATA = 0x14
+
+
+def aligned(pwm):
+    """Wait until the edges of every output of pwm are due together.
+
+    Returns:
+        dict: The statistics at that time.
+    """
+
+    deadline = time.perf_counter() + 1
+    while time.perf_counter() < deadline:
+        with pwm._condition:
+            due = [channel.next for channel in pwm._channels.values()]
+            if max(due) - min(due) < pwm.tolerance:
+                return pwm.statistics()
+        time.sleep(0.001)
+    raise AssertionError("The outputs never aligned")
+
+
+class TestSoftPWM(unittest.TestCase):
+
+    def setUp(self):
+        self.writes = []
+        self.pwm = SoftPWM(self.write)
+
+    def tearDown(self):
+        self.pwm.close()
+
+    def write(self, port, mask, bits):
+        self.writes.append((time.perf_counter(), port, mask, bits))
+
+    def test_merged_edges(self):
+        # Started in separate calls, the outputs share the period grid.
+        for bit in range(3):
+            self.pwm.start(bit, 0, 1 << bit, 100, 0.5)
+            time.sleep(0.003)
+        before = aligned(self.pwm)
+        time.sleep(0.2)
+        self.pwm.stop(0)
+
+        stats = self.pwm.statistics()
+        edges = stats["edges"] - before["edges"]
+        self.assertGreater(edges, 0)
+        self.assertEqual((stats["writes"] - before["writes"]) * 3, edges,
+                         "Edges of the same time share a port write")
+        self.assertGreaterEqual(self.pwm.statistics(1)["jitter"]["min"], 0)
+
+    def test_harmonic_grid(self):
+        self.pwm.start("slow", 0, 0x01, 50, 0.5)
+        time.sleep(0.005)
+        self.pwm.start("fast", 0, 0x02, 100, 0.5)
+        slow, fast = self.pwm._channels["slow"], self.pwm._channels["fast"]
+        periods = (fast.next - slow.next) / fast.period
+        self.assertAlmostEqual(periods, round(periods))
+
+    def test_duty_cycle_limits(self):
+        self.pwm.start("low", 0, 0x01, 200, 0)
+        self.pwm.start("high", 1, 0x01, 200, 1)
+        time.sleep(0.05)
+        self.assertEqual([w[1:] for w in self.writes[2:]], [(1, 0x01, 0x01)],
+                         "Only the high output is written once")
+
+    def test_stop(self):
+        self.pwm.start("a", 0, 0x04, 100, 0.5)
+        time.sleep(0.02)
+        self.pwm.stop("a")
+        count = len(self.writes)
+        self.assertEqual(self.writes[-1][1:], (0, 0x04, 0))
+        time.sleep(0.03)
+        self.assertEqual(len(self.writes), count)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.pwm.start("a", 0, 0x01, 0)
+        self.pwm.start("a", 0, 0x01, 100)
+        with self.assertRaises(ValueError):
+            self.pwm.set("a", duty_cycle=1.5)
+
+
+class TestMcp23017SoftPWM(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        Device.simulate()
+        self.bus = SimI2C.sim_bus(1)
+        self.model = self.bus.device(0x20)
+        self.latches = []
+        self.lock = lock = threading.Lock()
+        write_register = self.model.write_register
+
+        def record(register, value):
+            if register == OLATA:
+                with lock:
+                    self.latches.append((time.perf_counter(), value))
+            write_register(register, value)
+
+        self.model.write_register = record
+
+    def tearDown(self):
+        Device.simulate(False)
+
+    def test_port_writes(self):
+        pins = {"a": "A_0", "b": "A_1", "c": "A_2"}
+        gpio = Mcp23017GPIO(cache_registers=True, **pins)
+        for name, duty in (("a", 0.25), ("b", 0.5), ("c", 0.75)):
+            gpio.init_pwm(name, 50, duty)
+
+        aligned(gpio._soft_pwm)
+        with self.lock:
+            del self.latches[:]
+        time.sleep(0.2)
+
+        # The pins rise together and fall in the order of their duty cycle.
+        values = {value for _, value in self.latches}
+        self.assertLessEqual(values, {0b000, 0b100, 0b110, 0b111})
+        self.assertLessEqual({0b000, 0b111}, values)
+
+        stats = gpio.pwm_statistics()
+        self.assertLess(stats["writes"], stats["edges"],
+                        "Rising edges of the pins are one write")
+
+        gpio.set_pin_pwm("b", False)
+        self.assertEqual(self.model.get_pin("A_1"), 0)
+        gpio.close()
+        self.assertEqual(self.model.get_pin("A_0"), 0)
+
+    def test_other_driver_writes(self):
+        # The PWM edges read OLATA, so a pin another driver of the chip
+        # writes isn't cleared by the next edge.
+        gpio = Mcp23017GPIO(a="A_0")
+        self.addCleanup(gpio.close)
+        gpio.init_pwm("a", 100, 0.5)
+        time.sleep(0.02)
+
+        other = Mcp23017GPIO(b="A_1")
+        self.addCleanup(other.close)
+        other.init_output("b", 1)
+        with self.lock:
+            del self.latches[:]
+        time.sleep(0.05)
+
+        with self.lock:
+            values = [value for _, value in self.latches]
+        self.assertGreater(len(values), 4)
+        self.assertEqual({value & 0b10 for value in values}, {0b10})
+
+
+if __name__ == "__main__":
+    unittest.main()
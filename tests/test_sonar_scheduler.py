@@ -0,0 +1,115 @@
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.edge_recorder import tick_us
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.sensors.hc_sr04 import HcSr04RPiGPIO
+from pidevices.sensors.sonar_scheduler import SonarScheduler
+
+# name: (trigger, echo, echo duration in us), None never answers.
+SONARS = {"front": (5, 6, 2900), "left": (13, 19, 1200),
+          "back": (20, 21, None)}
+
+
+class TestSonarScheduler(unittest.TestCase):
+
+    def setUp(self):
+        SimGPIO.reset()
+        Device.simulate()
+        self.responder = SimGPIO(**{key: pins[0]
+                                    for key, pins in SONARS.items()})
+        self.fired = []
+        self.sonars = {}
+        for key, (trigger, echo, duration) in SONARS.items():
+            self.responder.init_input(key, "down")
+            self.responder.set_pin_edge(key, "falling")
+            self.responder.set_pin_event(key, self._respond, key, echo,
+                                         duration)
+            self.sonars[key] = HcSr04RPiGPIO(trigger, echo)
+            self.sonars[key].start()
+
+    def tearDown(self):
+        self.scheduler.close()
+        self.responder.close()
+        Device.simulate(False)
+
+    def _respond(self, key, echo, duration):
+        self.fired.append((key, time.perf_counter()))
+        if duration is None:
+            return
+
+        # The echo edges carry their ticks, the load doesn't stretch them.
+        rise = (tick_us() + 500) & 0xFFFFFFFF
+        SimGPIO.set_level(echo, 1, tick=rise)
+        SimGPIO.set_level(echo, 0, tick=(rise + duration) & 0xFFFFFFFF)
+
+    def test_round_robin(self):
+        self.scheduler = SonarScheduler(self.sonars, slot=0.035)
+        self.assertIsNone(self.scheduler.latest("front"))
+        self.scheduler.start()
+        time.sleep(0.4)
+        self.scheduler.stop()
+
+        front = self.scheduler.latest("front")
+        self.assertAlmostEqual(front.distance, 48, delta=0.1)
+        self.assertLessEqual(front.timestamp, time.time())
+        self.assertEqual(self.scheduler.latest("back").distance, -1)
+
+        # One sonar per slot, in order.
+        order = [key for key, _ in self.fired]
+        self.assertGreaterEqual(len(order), 6)
+        self.assertEqual(order, (["front", "left", "back"] * len(order))[
+            :len(order)])
+
+        stats = self.scheduler.statistics()
+        for key in SONARS:
+            self.assertEqual(stats[key]["readings"], order.count(key))
+        self.assertEqual(stats["back"]["out_of_range"],
+                         stats["back"]["readings"])
+        self.assertEqual(stats["front"]["out_of_range"], 0)
+        # A sonar fires once every 3 slots and a slot never ends early.
+        max_rate = 1 / (3 * self.scheduler.slot)
+        self.assertGreater(stats["front"]["rate"], 0)
+        self.assertLessEqual(stats["front"]["rate"], max_rate * 1.5)
+
+    def test_sonar_exception(self):
+        def collect(timeout):
+            raise RuntimeError("broken sonar")
+
+        self.sonars["left"].collect = collect
+        self.scheduler = SonarScheduler(self.sonars, slot=0.02)
+        self.scheduler.start()
+        time.sleep(0.2)
+
+        stats = self.scheduler.statistics()
+        self.assertTrue(self.scheduler._thread.is_alive())
+        self.assertGreater(stats["left"]["errors"], 0)
+        self.assertIsInstance(stats["left"]["last_error"], RuntimeError)
+        self.assertEqual(stats["left"]["readings"], 0)
+        self.assertGreater(stats["front"]["readings"], 1,
+                           "The other sonars keep updating")
+        self.assertIsNone(stats["front"]["last_error"])
+
+    def test_groups(self):
+        self.scheduler = SonarScheduler(self.sonars,
+                                        groups=[["front", "back"], ["left"]],
+                                        slot=0.035)
+        self.scheduler.start()
+        time.sleep(0.3)
+        self.scheduler.stop()
+
+        order = [key for key, _ in self.fired]
+        self.assertEqual(set(order[:2]), {"front", "back"})
+        self.assertEqual(order[2], "left")
+        stats = self.scheduler.statistics()
+        self.assertEqual(stats["front"]["readings"], stats["back"]["readings"])
+        self.assertGreaterEqual(stats["left"]["readings"], 2)
+
+    def test_invalid_groups(self):
+        self.scheduler = SonarScheduler(self.sonars)
+        with self.assertRaises(ValueError):
+            SonarScheduler(self.sonars, groups=[["front", "left"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pidevices.devices import Device
+from pidevices.exceptions import ReplayError
+from pidevices.sensors.bme680 import BME680
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.hardware_interfaces.i2c_implementations import SimI2C
+from pidevices.hardware_interfaces.sim_devices import BusLatency
+from pidevices.hardware_interfaces.trace import (TraceReader, CALL, CHANNEL,
+                                                 EVENT, RAISE)
+
+
+class TraceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        SimI2C.reset()
+        SimGPIO.reset()
+        Device.simulate()
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "session.trace")
+
+    def tearDown(self):
+        Device.record(None)
+        Device.replay(None)
+        Device.simulate(False)
+        shutil.rmtree(self.dir)
+
+    def record_bme680(self):
+        Device.record(self.path)
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        data = [bme.read(), bme.read()]
+        bme.stop()
+        Device.record(None)
+        return data
+
+
+class TestRecord(TraceTestCase):
+
+    def test_records(self):
+        self.record_bme680()
+        records = list(TraceReader(self.path))
+        self.assertEqual(records[0].kind, CHANNEL)
+        self.assertEqual(records[0].payload[:3],
+                         ("I2C", SimI2C.__module__, "SimI2C"))
+        calls = [r for r in records if r.kind == CALL]
+        self.assertTrue(all(r.channel == 1 for r in calls))
+        self.assertIn("_execute", {r.name for r in calls},
+                      "Transactions are recorded")
+        self.assertTrue(all(r.duration >= 0 for r in calls))
+
+    def test_exception(self):
+        Device.record(self.path)
+        device = Device()
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=3)]
+        with self.assertRaises(OSError):
+            i2c.read(0x50, 0x00)
+        Device.record(None)
+
+        Device.replay(self.path)
+        device = Device()
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=3)]
+        with self.assertRaises(OSError) as cm:
+            i2c.read(0x50, 0x00)
+        self.assertEqual(cm.exception.errno, 6)
+        self.assertEqual([r.kind for r in TraceReader(self.path)][-1], RAISE)
+
+
+class TestReplay(TraceTestCase):
+
+    def test_same_results(self):
+        recorded = self.record_bme680()
+        SimI2C.reset()
+        bus = SimI2C.sim_bus(1)
+
+        Device.replay(self.path)
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        self.assertEqual([bme.read(), bme.read()], recorded)
+        bme.stop()
+        self.assertEqual(bus.transfers, 0, "No bus access")
+        self.assertEqual(Device._replay.remaining(), 0)
+
+    def test_readinto(self):
+        Device.record(self.path)
+        device = Device()
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=1)]
+        i2c.write(0x40, 0x06, [1, 2, 3, 4])
+        i2c.readinto(0x40, 0x06, bytearray(4))
+        Device.record(None)
+
+        Device.replay(self.path, strict=True)
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=1)]
+        i2c.write(0x40, 0x06, [1, 2, 3, 4])
+        buf = bytearray(4)
+        self.assertEqual(i2c.readinto(0x40, 0x06, buf), 4)
+        self.assertEqual(buf, bytearray([1, 2, 3, 4]))
+
+    def test_mismatch(self):
+        self.record_bme680()
+        Device.replay(self.path, strict=True)
+        device = Device()
+        i2c = device.hardware_interfaces[device.init_interface("i2c", bus=1)]
+        with self.assertRaises(ReplayError):
+            i2c.write(0x77, 0xE0, 0xB6)
+        with self.assertRaises(ReplayError):
+            device.init_interface("i2c", bus=2)
+
+    def test_original_timing(self):
+        SimI2C.sim_bus(1).latency = BusLatency(per_transfer=0.01)
+        self.record_bme680()
+
+        start = time.perf_counter()
+        Device.replay(self.path)
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        bme.read()
+        fast = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Device.replay(self.path, speed=1.0)
+        bme = BME680(1, 1, t_oversample=2, p_oversample=2, h_oversample=2,
+                     iir_coef=3, gas_status=1)
+        bme.read()
+        timed = time.perf_counter() - start
+        self.assertLess(fast, 0.05)
+        self.assertGreater(timed, 0.1)
+
+    def test_events(self):
+        Device.record(self.path)
+        device = Device()
+        gpio = device.hardware_interfaces[
+            device.init_interface("gpio", echo=6)]
+        gpio.init_input("echo", "down")
+        gpio.set_pin_edge("echo", "both")
+        events = []
+        gpio.set_pin_event("echo", events.append, "edge")
+        SimGPIO.set_level(6, 1)
+        gpio.read("echo")
+        Device.record(None)
+        self.assertIn(EVENT, [r.kind for r in TraceReader(self.path)])
+
+        Device.replay(self.path)
+        device = Device()
+        gpio = device.hardware_interfaces[
+            device.init_interface("gpio", echo=6)]
+        gpio.init_input("echo", "down")
+        gpio.set_pin_edge("echo", "both")
+        replayed = []
+        done = threading.Event()
+        gpio.set_pin_event("echo", lambda tag: (replayed.append(tag),
+                                                done.set()), "edge")
+        self.assertEqual(gpio.read("echo"), 1)
+        self.assertTrue(done.wait(1))
+        self.assertEqual(replayed, ["edge"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import math
+import unittest
+from pidevices.devices import Device
+from pidevices.hardware_interfaces.gpio_implementations import SimGPIO
+from pidevices.sensors.df_robot_wheel_encoders import DfRobotWheelEncoderRpiGPIO
+
+SIGNAL_PIN = 17
+
+
+class TestWheelEncoderVelocity(unittest.TestCase):
+
+    def setUp(self):
+        SimGPIO.reset()
+        Device.simulate()
+        self.encoder = DfRobotWheelEncoderRpiGPIO(SIGNAL_PIN)
+        self.now = 0
+
+    def tearDown(self):
+        self.encoder.stop()
+        Device.simulate(False)
+
+    def pulses(self, start, period, count):
+        """Feed pulses to the callback and stop the clock at the last."""
+
+        for i in range(count):
+            self.now = (start + i * period) & 0xFFFFFFFF
+            self.encoder._cbf(SIGNAL_PIN, 1, self.now)
+        self.encoder._now = lambda: self.now
+
+    def test_steady(self):
+        self.pulses(0, 10000, 30)
+        self.assertAlmostEqual(self.encoder.velocity(), 2 * math.pi / 0.1)
+        self.assertEqual(self.encoder.counts, 30)
+        self.assertEqual(self.encoder.read()["rps"], self.encoder.velocity())
+
+    def test_tick_wrap(self):
+        self.pulses(0xFFFFFFFF - 25000, 10000, 6)
+        self.assertAlmostEqual(self.encoder.velocity(), 2 * math.pi / 0.1)
+
+    def test_decay_and_stop(self):
+        self.pulses(0, 10000, 11)
+        self.now += 50000
+        self.assertAlmostEqual(self.encoder.velocity(), 2 * math.pi / 0.5)
+        self.now += 500000
+        self.assertEqual(self.encoder.velocity(), 0)
+
+    def test_windows(self):
+        # Slow then fast, the time window sees only the fast pulses.
+        self.pulses(0, 40000, 5)
+        self.pulses(self.now + 10000, 10000, 10)
+        self.encoder.window = 0.05
+        self.assertAlmostEqual(self.encoder.velocity(), 2 * math.pi / 0.1)
+
+        self.encoder.window_counts = 12
+        period = (2 * 40000 + 10 * 10000) / 12e6
+        self.assertAlmostEqual(self.encoder.velocity(),
+                               2 * math.pi / (10 * period))
+
+        self.encoder.reset()
+        self.assertEqual(self.encoder.velocity(), 0)
+
+    def test_sim_edges(self):
+        for level in (1, 0) * 4:
+            SimGPIO.set_level(SIGNAL_PIN, level)
+        self.assertEqual(self.encoder.counts, 4)
+        self.assertEqual(len(self.encoder.ticks()), 4)
+        self.assertGreater(self.encoder.velocity(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()